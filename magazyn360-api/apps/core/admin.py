@@ -1,16 +1,60 @@
 import logging
 
 from django.contrib import admin
+from django.contrib.admin.utils import lookup_spawns_duplicates
 from django.contrib.auth.admin import UserAdmin
 from django.utils.translation import gettext_lazy as _
 
+from apps.core.admin_filters import (
+    AddressCityFilter,
+    AddressCountryFilter,
+    CachedCountChoicesFilter,
+    CityInputFilter,
+    CompanyInputFilter,
+)
 from apps.core.models import Address, Company, CustomUser
+from apps.core.pagination import EstimatedCountPaginator
+from apps.core.search import MIN_TERM_LENGTH, search_condition
 
 logger = logging.getLogger(__name__)
 
 
+class ScalableChangeListMixin:
+    """
+    Keeps changelists cheap on large tables.
+
+    The total row count and per-filter facet counts are not queried, and the
+    count of unfiltered pages is estimated.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+
+
+class TrigramSearchMixin:
+    """
+    Searches ``search_fields`` through their trigram indexes, tolerating typos.
+
+    Terms too short for the indexes use the default admin search.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if len(term) < MIN_TERM_LENGTH:
+            return super().get_search_results(request, queryset, search_term)
+
+        may_have_duplicates = any(
+            lookup_spawns_duplicates(self.opts, field) for field in self.search_fields
+        )
+        return (
+            queryset.filter(search_condition(self.search_fields, term)),
+            may_have_duplicates,
+        )
+
+
 @admin.register(CustomUser)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(ScalableChangeListMixin, TrigramSearchMixin, UserAdmin):
     """
     Custom admin interface for managing users with role-based access control.
     """
@@ -24,10 +68,23 @@ class CustomUserAdmin(UserAdmin):
         "is_active",
         "last_login",
     )
-    list_filter = ("role", "company", "is_active", "is_staff")
-    search_fields = ("email", "first_name", "last_name", "phone_number", "position")
+    list_filter = (
+        CachedCountChoicesFilter.for_field("role"),
+        CompanyInputFilter,
+        "is_active",
+        "is_staff",
+    )
+    search_fields = (
+        "username",
+        "email",
+        "first_name",
+        "last_name",
+        "phone_number",
+        "position",
+    )
     ordering = ("email",)
     autocomplete_fields = ["company"]
+    list_select_related = ("company",)
     readonly_fields = ("last_login", "date_joined")
 
     fieldsets = (
@@ -75,22 +132,24 @@ class CustomUserAdmin(UserAdmin):
 
     def save_related(self, request, form, formsets, change):
         super().save_related(request, form, formsets, change)
-        form.instance.sync_group_with_role()
-        form.instance.save()
+        # New users are assigned their group by the post_save signal.
+        if change:
+            form.instance.sync_group_with_role()
 
 
 @admin.register(Company)
-class CompanyAdmin(admin.ModelAdmin):
+class CompanyAdmin(ScalableChangeListMixin, TrigramSearchMixin, admin.ModelAdmin):
     """
     Admin interface for managing companies and their addresses.
     """
 
     list_display = ("name", "tax_id", "email", "phone", "primary_address_city", "owner")
-    list_filter = ("addresses__city", "addresses__country")
+    list_filter = (AddressCityFilter, AddressCountryFilter)
     search_fields = ("name", "tax_id", "email", "owner__email", "addresses__city")
     ordering = ("name",)
     autocomplete_fields = ["owner"]
     readonly_fields = ("created_at", "updated_at")
+    list_select_related = ("owner",)
 
     fieldsets = (
         (_("General"), {"fields": ("name", "email", "phone", "website")}),
@@ -108,24 +167,34 @@ class CompanyAdmin(admin.ModelAdmin):
         ),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_addresses()
+
     def primary_address_city(self, obj):
         """
         Returns the city of the primary address for display in the admin list view.
         """
-        return obj.primary_address.name if obj.primary_address else None
+        address = obj.primary_address
+        return address.name if address else None
 
 
 @admin.register(Address)
-class AddressAdmin(admin.ModelAdmin):
+class AddressAdmin(ScalableChangeListMixin, TrigramSearchMixin, admin.ModelAdmin):
     """
     Admin interface for managing company addresses.
     """
 
     list_display = ("name", "type", "company", "city", "postal_code", "country")
-    list_filter = ("type", "city", "country", "company")
+    list_filter = (
+        CachedCountChoicesFilter.for_field("type"),
+        CityInputFilter,
+        CachedCountChoicesFilter.for_field("country"),
+        CompanyInputFilter,
+    )
     search_fields = ("name", "company__name", "street", "city", "postal_code")
     ordering = ("company", "type")
     autocomplete_fields = ["company"]
+    list_select_related = ("company",)
     readonly_fields = ("created_at", "updated_at")
 
     fieldsets = (
@@ -0,0 +1,164 @@
+"""Admin list filters whose sidebar does not grow with the table.
+
+The default related and ``AllValues`` filters load every company or every
+distinct city on each changelist. Open ended values are filtered through a
+text box instead, and fixed choices show counts cached for a few minutes.
+"""
+
+import uuid
+
+from django.contrib import admin
+from django.core.cache import cache
+from django.db.models import Count, Exists, OuterRef
+from django.utils.translation import gettext_lazy as _
+
+from apps.core.enums import Countries
+from apps.core.models import Address, Company
+
+
+class InputFilter(admin.SimpleListFilter):
+    """Filters the changelist by the text typed into the sidebar.
+
+    Subclasses override ``filter``, which is only called for non-empty values.
+    """
+
+    template = "admin/core/input_filter.html"
+
+    def lookups(self, request, model_admin):
+        # Filters without lookups are not displayed.
+        return (("", ""),)
+
+    def queryset(self, request, queryset):
+        value = (self.value() or "").strip()
+        return self.filter(queryset, value) if value else queryset
+
+    def filter(self, queryset, value):
+        """Returns ``queryset`` narrowed down to the rows matching ``value``."""
+        raise NotImplementedError(f"{type(self).__name__} must implement filter()")
+
+    def choices(self, changelist):
+        yield {
+            "value": self.value() or "",
+            "hidden_params": [
+                (key, value)
+                for key, values in changelist.filter_params.items()
+                if key != self.parameter_name
+                for value in values
+            ],
+            "reset_query_string": changelist.get_query_string(
+                remove=[self.parameter_name]
+            ),
+        }
+
+
+class CompanyInputFilter(InputFilter):
+    """Filters by the company id or a part of its name.
+
+    Names are matched in an ``IN`` subquery rather than a join on every row.
+    """
+
+    title = _("company")
+    parameter_name = "company"
+
+    def filter(self, queryset, value):
+        try:
+            return queryset.filter(company_id=uuid.UUID(value))
+        except ValueError:
+            companies = Company.objects.filter(name__icontains=value)
+            return queryset.filter(company__in=companies.values("pk"))
+
+
+class CityInputFilter(InputFilter):
+    """Filters addresses by a part of their city."""
+
+    title = _("city")
+    parameter_name = "city"
+
+    def filter(self, queryset, value):
+        return queryset.filter(city__icontains=value)
+
+
+class AddressCityFilter(InputFilter):
+    """Filters companies having an address in a matching city.
+
+    ``EXISTS`` keeps one row per company without a ``DISTINCT`` join.
+    """
+
+    title = _("address city")
+    parameter_name = "address_city"
+
+    def filter(self, queryset, value):
+        addresses = Address.objects.filter(
+            company=OuterRef("pk"), city__icontains=value
+        )
+        return queryset.filter(Exists(addresses))
+
+
+class AddressCountryFilter(admin.SimpleListFilter):
+    """Filters companies having an address in the chosen country."""
+
+    title = _("address country")
+    parameter_name = "address_country"
+
+    def lookups(self, request, model_admin):
+        return Countries.choices
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        addresses = Address.objects.filter(company=OuterRef("pk"), country=self.value())
+        return queryset.filter(Exists(addresses))
+
+
+class CachedCountChoicesFilter(admin.SimpleListFilter):
+    """Filters by the choices of ``field_name``, labelled with cached counts.
+
+    The counts cover the whole table rather than the current results, they
+    are read with one ``GROUP BY`` query every ``cache_timeout`` seconds.
+
+    Attributes:
+        field_name: Model field with choices to filter by
+        cache_timeout: Seconds the counts are cached for
+    """
+
+    field_name = None
+    cache_timeout = 300
+
+    def __init__(self, request, params, model, model_admin):
+        self.field = model._meta.get_field(self.field_name)
+        self.title = self.field.verbose_name
+        # Same parameter as the default field filter, existing links still work.
+        self.parameter_name = f"{self.field_name}__exact"
+        super().__init__(request, params, model, model_admin)
+
+    @classmethod
+    def for_field(cls, field_name):
+        """Returns the filter class for ``field_name``."""
+        return type(
+            f"{field_name.title()}CountFilter", (cls,), {"field_name": field_name}
+        )
+
+    def get_counts(self):
+        model = self.field.model
+        key = f"core:admin-facets:{model._meta.label_lower}:{self.field_name}"
+        return cache.get_or_set(
+            key,
+            lambda: dict(
+                model._default_manager.order_by()
+                .values_list(self.field_name)
+                .annotate(count=Count("pk"))
+            ),
+            self.cache_timeout,
+        )
+
+    def lookups(self, request, model_admin):
+        counts = self.get_counts()
+        return [
+            (value, f"{label} ({counts.get(value, 0)})")
+            for value, label in self.field.flatchoices
+        ]
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        return queryset.filter(**{self.field_name: self.value()})
@@ -7,4 +7,8 @@ class CoreConfig(AppConfig):
     label = "core"
 
     def ready(self):
+        import apps.core.checks  # noqa: F401
         import apps.core.signals  # noqa: F401
+        from apps.core.permission_matrix import permission_matrix
+
+        permission_matrix.get()
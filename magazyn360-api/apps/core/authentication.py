@@ -0,0 +1,198 @@
+"""JWT authentication serving the requesting user from access token claims."""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.crypto import salted_hmac
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.core.models import CustomUser
+
+STAMP_CLAIM = "stamp"
+# Changing any of these fields revokes the tokens issued before the change.
+STAMP_FIELDS = (
+    "is_active",
+    "is_superuser",
+    "is_staff",
+    "role",
+    "company_id",
+    "password",
+)
+
+# Stamp of inactive and deleted users. Not hexadecimal, so no token stamp
+# computed for an active user can match it.
+_REVOKED = "revoked"
+
+
+def _stamp_cache():
+    return caches[settings.JWT_STAMP_CACHE]
+
+
+def _stamp_key(user_id):
+    return f"core:auth-stamp:{user_id}"
+
+
+def compute_auth_stamp(values):
+    """Returns the stamp of a user from its ``STAMP_FIELDS`` values."""
+    if not values["is_active"]:
+        return _REVOKED
+    message = "|".join(str(values[field]) for field in STAMP_FIELDS)
+    return salted_hmac("apps.core.authentication", message).hexdigest()[:20]
+
+
+def get_auth_stamp(user_id):
+    """Returns the current stamp of a user, served from the local stamp cache."""
+    key = _stamp_key(user_id)
+    stamp = _stamp_cache().get(key)
+    if stamp is None:
+        values = CustomUser.objects.filter(pk=user_id).values(*STAMP_FIELDS).first()
+        stamp = compute_auth_stamp(values) if values else _REVOKED
+        _stamp_cache().set(key, stamp)
+    return stamp
+
+
+def update_auth_stamp(user):
+    """Stores the stamp of a saved user so revoked tokens are rejected at once."""
+    values = {field: getattr(user, field) for field in STAMP_FIELDS}
+    _stamp_cache().set(_stamp_key(user.pk), compute_auth_stamp(values))
+
+
+def revoke_auth_stamp(user_id):
+    _stamp_cache().set(_stamp_key(user_id), _REVOKED)
+
+
+def add_user_claims(token, user):
+    """Embeds the claims ``ClaimsUser`` is built from into ``token``."""
+    token["role"] = user.role
+    token["company_id"] = str(user.company_id) if user.company_id else None
+    token["is_superuser"] = user.is_superuser
+    token["is_staff"] = user.is_staff
+    token[STAMP_CLAIM] = compute_auth_stamp(
+        {field: getattr(user, field) for field in STAMP_FIELDS}
+    )
+    return token
+
+
+class ClaimsUser:
+    """User backed by access token claims.
+
+    ``pk``, ``role``, ``company_id`` and the staff flags come from the token.
+    Any other attribute loads the ``CustomUser`` row once and is read from it.
+    """
+
+    is_active = True
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token):
+        pk_field = CustomUser._meta.pk
+        self.token = token
+        self.pk = self.id = pk_field.to_python(token[api_settings.USER_ID_CLAIM])
+        self.role = token["role"]
+        self.company_id = CustomUser._meta.get_field("company").to_python(
+            token["company_id"]
+        )
+        self.is_superuser = token["is_superuser"]
+        self.is_staff = token["is_staff"]
+
+    def __str__(self):
+        return str(self.user)
+
+    def __eq__(self, other):
+        if not isinstance(other, ClaimsUser | CustomUser):
+            return NotImplemented
+        return self.pk == other.pk
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __getattr__(self, name):
+        # Only reached for attributes not served from the claims.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+    @cached_property
+    def user(self):
+        """The ``CustomUser`` row, loaded on first access."""
+        return CustomUser.objects.get(pk=self.pk)
+
+    def has_perm(self, perm, obj=None):
+        return self.user.has_perm(perm, obj)
+
+    def has_perms(self, perm_list, obj=None):
+        return self.user.has_perms(perm_list, obj)
+
+    def has_module_perms(self, app_label):
+        return self.user.has_module_perms(app_label)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT authentication which does not select the user on every request.
+
+    The token stamp is checked against the local stamp cache, the database is
+    only queried on a cache miss. Tokens issued without claims fall back to
+    loading the user.
+
+    The stamp cache is kept per process. A change to a user is seen at once by
+    the worker which saved it, other workers keep accepting the user's old
+    tokens until their cached stamp expires (``JWT_STAMP_CACHE_SECONDS``, 60
+    by default).
+    """
+
+    def get_user(self, validated_token):
+        if STAMP_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as exc:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from exc
+
+        stamp = get_auth_stamp(user_id)
+        if stamp == _REVOKED or stamp != validated_token[STAMP_CLAIM]:
+            raise AuthenticationFailed(
+                _("Token has been revoked."), code="token_revoked"
+            )
+        return ClaimsUser(validated_token)
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token whose claims are restamped when it is read back.
+
+    Access tokens copy the refresh token's claims, restamping keeps them in
+    line with the user's current role, company and stamp.
+    """
+
+    def __init__(self, token=None, verify=True):
+        super().__init__(token, verify)
+        if token is None:
+            return
+        user_id = self.payload.get(api_settings.USER_ID_CLAIM)
+        user = CustomUser.objects.filter(pk=user_id).first()
+        if user is not None:
+            add_user_claims(self, user)
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refreshes access tokens with the user's current claims."""
+
+    token_class = ClaimsRefreshToken
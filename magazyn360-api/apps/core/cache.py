@@ -0,0 +1,60 @@
+"""Process-local caches invalidated through a version kept in the Django cache."""
+
+import time
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# Backends keeping (or dropping) the entries in the memory of each process.
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+def is_cache_shared(alias=DEFAULT_CACHE_ALIAS):
+    """Returns whether the processes share the entries of the cache ``alias``."""
+    return not isinstance(caches[alias], PROCESS_LOCAL_BACKENDS)
+
+
+class VersionedCache:
+    """Caches a computed value in process memory until its version changes.
+
+    The version lives in the Django cache, so with a shared cache backend an
+    invalidation in one worker makes every worker reload the value. With a
+    per-process backend other workers only reload it after ``timeout``.
+
+    Attributes:
+        key: Django cache key holding the version
+        loader: Callable computing the value
+        timeout: Seconds the value is kept at most, None for no limit
+    """
+
+    def __init__(self, key, loader, timeout=None):
+        self.key = key
+        self.loader = loader
+        self.timeout = timeout
+        self._version = None
+        self._value = None
+        self._loaded_at = float("-inf")
+
+    @property
+    def version(self):
+        return cache.get(self.key, 0)
+
+    def get(self):
+        """Returns the value, reloading it when the version changed or it
+        expired."""
+        version = self.version
+        now = time.monotonic()
+        expired = self.timeout is not None and now - self._loaded_at >= self.timeout
+        if version != self._version or expired:
+            self._value = self.loader()
+            self._version = version
+            self._loaded_at = now
+        return self._value
+
+    def invalidate(self):
+        """Bumps the version, all processes reload the value on next access."""
+        try:
+            cache.incr(self.key)
+        except ValueError:
+            cache.set(self.key, 1, timeout=None)
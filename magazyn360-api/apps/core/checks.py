@@ -0,0 +1,37 @@
+"""System checks of the deployment settings, run by ``manage.py check`` and
+before the management commands."""
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from apps.core.cache import is_cache_shared
+
+
+@register(Tags.security)
+def check_metrics_token(app_configs, **kwargs):
+    """Warns that /metrics is not served, without a token outside of DEBUG."""
+    if settings.METRICS_TOKEN or settings.DEBUG:
+        return []
+    return [
+        Warning(
+            "METRICS_TOKEN is not set, /metrics answers 404.",
+            hint="Set METRICS_TOKEN and scrape with that bearer token.",
+            id="core.W001",
+        )
+    ]
+
+
+@register(Tags.caches, Tags.database)
+def check_replica_pin_cache(app_configs, **kwargs):
+    """Warns that with read replicas, clients which wrote are only pinned to
+    the primary within the worker that handled the write."""
+    if not settings.REPLICA_DATABASES or is_cache_shared():
+        return []
+    return [
+        Warning(
+            "REPLICA_DATABASES is set, but the default cache is not shared by "
+            "the workers. Clients may not read their own writes.",
+            hint="Point CACHE_URL at a shared cache, e.g. redis://.",
+            id="core.W002",
+        )
+    ]
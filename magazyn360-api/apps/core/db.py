@@ -0,0 +1,48 @@
+"""Connection pools of the database aliases, see DATABASES in settings."""
+
+from django.db import connections
+
+# Statistics reported for each pool, by their psycopg_pool name. Counters
+# accumulate since the pool was opened.
+POOL_STATS = {
+    "size": "pool_size",
+    "available": "pool_available",
+    "checkouts": "requests_num",
+    "waits": "requests_queued",
+    "wait_ms": "requests_wait_ms",
+    "timeouts": "requests_errors",
+    "opened": "connections_num",
+    "lost": "connections_lost",
+}
+
+
+def get_pool(alias):
+    """Returns the connection pool of ``alias``, None if it is not pooled."""
+    return getattr(connections[alias], "pool", None)
+
+
+def get_pool_stats(pool):
+    """Returns the ``POOL_STATS`` of ``pool``."""
+    values = pool.get_stats()
+    return {name: values.get(key, 0) for name, key in POOL_STATS.items()}
+
+
+def pool_stats():
+    """Returns the statistics of the pools of this process, by alias."""
+    stats = {}
+    for alias in connections:
+        pool = get_pool(alias)
+        if pool is not None:
+            stats[alias] = get_pool_stats(pool)
+    return stats
+
+
+def close_pools():
+    """Closes the connections and pools of this process, e.g. before forking.
+
+    A pool is reopened when a connection is next needed.
+    """
+    connections.close_all()
+    for alias in connections:
+        if get_pool(alias) is not None:
+            connections[alias].close_pool()
@@ -0,0 +1,131 @@
+"""API documentation: the OpenAPI schema and its Swagger UI and ReDoc pages.
+
+The schema is generated once per code version, at build time by the
+``generate_schema`` command or else on the first request of a worker, and is
+served from memory with an ``ETag``. drf_yasg is only imported then, so it
+costs no startup time or worker memory while nobody reads the documentation.
+"""
+
+import functools
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.utils.text import get_valid_filename
+from django.views.decorators.http import require_safe
+
+SCHEMA_INFO = {
+    "title": "Magazyn360 API",
+    "default_version": "v1",
+    "description": "Dokumentacja API Magazyn360",
+}
+SCHEMA_FORMATS = {"json": "application/json", "yaml": "application/yaml"}
+SOURCE_DIRS = ("apps", "magazyn360")
+UI_RENDERERS = {"swagger": "SwaggerUIRenderer", "redoc": "ReDocRenderer"}
+
+
+@dataclass(frozen=True)
+class SchemaDocument:
+    """The schema encoded in one format.
+
+    Attributes:
+        content: Encoded schema
+        content_type: Media type of the encoding
+        etag: Quoted entity tag of the content
+    """
+
+    content: bytes
+    content_type: str
+    etag: str
+
+    @classmethod
+    def from_content(cls, content, format):
+        digest = hashlib.md5(content, usedforsecurity=False).hexdigest()
+        return cls(content, SCHEMA_FORMATS[format], quote_etag(digest))
+
+
+@functools.cache
+def get_code_version():
+    """Returns BUILD_VERSION, or a digest of the source files without it."""
+    if settings.BUILD_VERSION:
+        return settings.BUILD_VERSION
+    digest = hashlib.md5(usedforsecurity=False)
+    for directory in SOURCE_DIRS:
+        root = Path(settings.BASE_DIR, directory)
+        for path in sorted(root.rglob("*.py")):
+            digest.update(str(path.relative_to(root)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def get_schema_path(format):
+    """Returns the path of the build artifact of the schema in ``format``."""
+    name = get_valid_filename(f"schema-{get_code_version()}.{format}")
+    return Path(settings.OPENAPI_SCHEMA_DIR, name)
+
+
+def generate_schemas():
+    """Generates the schema of the URLconf, returns it encoded by format."""
+    from drf_yasg import openapi
+    from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    generator = OpenAPISchemaGenerator(openapi.Info(**SCHEMA_INFO))
+    # Without a request the schema has no host, clients use the one serving it.
+    schema = generator.get_schema(request=None, public=True)
+    return {
+        "json": OpenAPICodecJson(validators=[]).encode(schema),
+        "yaml": OpenAPICodecYaml(validators=[]).encode(schema),
+    }
+
+
+@functools.cache
+def get_schema_documents():
+    """Returns the schema documents by format, from the build artifacts of the
+    code version if they exist."""
+    paths = {format: get_schema_path(format) for format in SCHEMA_FORMATS}
+    if all(path.is_file() for path in paths.values()):
+        contents = {format: path.read_bytes() for format, path in paths.items()}
+    else:
+        contents = generate_schemas()
+    return {
+        format: SchemaDocument.from_content(content, format)
+        for format, content in contents.items()
+    }
+
+
+@require_safe
+def schema_view(request, format):
+    """Serves the schema, ``304 Not Modified`` if the client has it already."""
+    document = get_schema_documents()[format]
+    response = get_conditional_response(request, etag=document.etag)
+    if response is None:
+        response = HttpResponse(document.content, content_type=document.content_type)
+    response["ETag"] = document.etag
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+@require_safe
+def docs_view(request, ui):
+    """Renders the Swagger UI or ReDoc page, which fetch the schema from
+    ``schema_view`` (SPEC_URL in settings).
+
+    ``?format=openapi``, the schema URL of drf_yasg's own views, still serves
+    the schema.
+    """
+    if request.GET.get("format") == "openapi":
+        return schema_view(request, "json")
+
+    from drf_yasg import renderers
+
+    renderer = getattr(renderers, UI_RENDERERS[ui])()
+    context = {"request": request}
+    renderer.set_context(context)
+    context.update(title=SCHEMA_INFO["title"], version=SCHEMA_INFO["default_version"])
+    return HttpResponse(render_to_string(renderer.template, context, request))
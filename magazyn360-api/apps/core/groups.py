@@ -0,0 +1,46 @@
+"""Groups users are assigned to according to their role."""
+
+from django.contrib.auth.models import Group
+
+from apps.core.cache import VersionedCache
+from apps.core.enums import Role
+
+ROLE_GROUPS = {
+    Role.ADMIN: "Admin",
+    Role.MANAGER: "Manager",
+    Role.WORKER: "Worker",
+    Role.VIEWER: "Viewer",
+    Role.OWNER: "Owner",
+}
+
+
+def _load_role_group_ids():
+    group_ids = dict(
+        Group.objects.filter(name__in=ROLE_GROUPS.values()).values_list("name", "id")
+    )
+    return {
+        role: group_ids[name] for role, name in ROLE_GROUPS.items() if name in group_ids
+    }
+
+
+# Invalidated once group changes are committed, see apps.core.signals. A
+# group deleted through another worker fails the memberships given by this
+# one (on commit) until the ids expire, unless the default cache is shared.
+role_group_ids = VersionedCache(
+    "core:role-group-ids:version", _load_role_group_ids, timeout=60
+)
+
+
+def get_role_group_id(role):
+    """Returns the id of the group matching ``role``, or None for unknown roles.
+
+    Missing groups are created, they are cached once the creating
+    transaction commits.
+    """
+    group_name = ROLE_GROUPS.get(role)
+    if group_name is None:
+        return None
+    group_id = role_group_ids.get().get(role)
+    if group_id is None:
+        group_id = Group.objects.get_or_create(name=group_name)[0].pk
+    return group_id
@@ -0,0 +1,377 @@
+"""Streaming import of companies and addresses from legacy CSV or JSON Lines dumps.
+
+Rows are read one at a time and handled in batches: each batch resolves its
+references with one query, is validated with the model field validators, is
+checked against the unique constraints with one query and is inserted with
+one ``bulk_create`` in its own transaction. The number of the last committed
+row is saved to an ``ImportCheckpoint`` in the same transaction, so an
+interrupted import resumes after it without inserting any row twice. Only the
+rejects of the interrupted batch may be written to the rejects file twice.
+"""
+
+import csv
+import itertools
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import orjson
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+
+from apps.core.enums import AddressTypes, Countries
+from apps.core.models import Address, Company, CustomUser, ImportCheckpoint
+from apps.core.validators import (
+    NIPValidator,
+    PolishPostalCodeValidator,
+    REGONValidator,
+)
+
+BATCH_SIZE = 1000
+FORMATS = ("csv", "jsonl")
+
+
+SUFFIX_FORMATS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".json": "jsonl",
+}
+
+
+def guess_format(path):
+    """Returns the format of ``path`` from its extension, or None."""
+    return SUFFIX_FORMATS.get(Path(path).suffix.lower())
+
+
+def is_json_array(path):
+    """Returns whether the file at ``path`` holds a JSON array, not JSON Lines."""
+    with open(path, "rb") as file:
+        for line in file:
+            if line.strip():
+                return line.lstrip().startswith(b"[")
+    return False
+
+
+def read_rows(path, file_format):
+    """Yields ``(number, row, error)`` for each record of the file.
+
+    Records are numbered from 1, ``row`` is None when the record could not be
+    parsed and ``error`` describes why.
+    """
+    if file_format == "csv":
+        with open(path, newline="", encoding="utf-8-sig") as file:
+            for number, row in enumerate(csv.DictReader(file), start=1):
+                yield number, row, None
+        return
+
+    with open(path, "rb") as file:
+        lines = (line for line in file if line.strip())
+        for number, line in enumerate(lines, start=1):
+            try:
+                row = orjson.loads(line)
+            except orjson.JSONDecodeError as error:
+                yield number, None, str(error)
+                continue
+            if isinstance(row, dict):
+                yield number, row, None
+            else:
+                yield number, None, "Expected a JSON object."
+
+
+@dataclass
+class ImportStats:
+    """Counters of an import run.
+
+    Attributes:
+        imported: Rows inserted
+        rejected: Rows written to the rejects file
+        last_row: Number of the last committed row
+        seconds: Time spent importing
+    """
+
+    imported: int = 0
+    rejected: int = 0
+    last_row: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        rows = self.imported + self.rejected
+        return rows / self.seconds if self.seconds else 0.0
+
+
+class Importer:
+    """Validates and inserts the rows of ``model`` in batches.
+
+    Attributes:
+        model: Model the rows are inserted as
+        fields: Columns copied to the model fields of the same name
+        reference: Column holding the natural key of the related row
+        reference_field: Foreign key field set from the resolved reference
+        reference_model: Model the reference is resolved against
+        reference_key: Natural key field of ``reference_model``
+        column_validators: Validators checking a whole column of the batch at
+            once, by field
+    """
+
+    model = None
+    fields = ()
+    reference = None
+    reference_field = None
+    reference_model = None
+    reference_key = None
+    column_validators = {}
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        # Natural key -> primary key of the referenced rows seen so far.
+        self.references = {}
+
+    def resolve_references(self, keys):
+        """Loads the primary keys of ``keys`` missing from the key map."""
+        missing = {key for key in keys if key and key not in self.references}
+        if missing:
+            self.references.update(
+                self.reference_model.objects.filter(
+                    **{f"{self.reference_key}__in": missing}
+                ).values_list(self.reference_key, "pk")
+            )
+
+    @staticmethod
+    def column_value(row, name):
+        value = row.get(name)
+        return value.strip() if isinstance(value, str) else value
+
+    def build(self, row, invalid_columns=()):
+        """Returns the validated instance of ``row``, raises ``ValidationError``.
+
+        Args:
+            row: Mapping of column names to values
+            invalid_columns: Columns already rejected by ``column_validators``
+        """
+        values = {}
+        for name in self.fields:
+            value = self.column_value(row, name)
+            if value not in (None, ""):
+                values[name] = value
+        instance = self.model(**values)
+
+        errors = {
+            name: [self.column_validators[name].message] for name in invalid_columns
+        }
+        key = str(row.get(self.reference) or "").strip()
+        if key not in self.references:
+            errors[self.reference] = [f"Unknown {self.reference} {key!r}."]
+        else:
+            setattr(instance, self.reference_field, self.references[key])
+        try:
+            instance.clean_fields(
+                exclude=[
+                    self.reference_field.removesuffix("_id"),
+                    *self.column_validators,
+                ]
+            )
+            self.validate(instance)
+        except ValidationError as error:
+            for name, messages in error.message_dict.items():
+                errors.setdefault(name, []).extend(messages)
+        if errors:
+            raise ValidationError(errors)
+        return instance
+
+    def validate(self, instance):
+        """Hook for checks beyond the model fields."""
+
+    def unique_keys(self, instance):
+        """Returns the keys of ``instance`` which must be unique."""
+        return []
+
+    def existing_keys(self, instances):
+        """Returns the keys of ``instances`` already taken in the database."""
+        return set()
+
+    def import_batch(self, batch, record=None):
+        """Inserts the valid rows of ``batch``, returns their number and the
+        rejected rows.
+
+        Args:
+            batch: List of ``(number, row, error)`` tuples from ``read_rows``
+            record: Callable receiving the batch, the number of inserted rows and
+                the rejected rows, called in the transaction of the insert
+        """
+        self.resolve_references(
+            str(row.get(self.reference) or "").strip()
+            for _, row, error in batch
+            if error is None
+        )
+        parsed = [row for _, row, error in batch if error is None]
+        columns = {
+            name: iter(
+                validator.validate_many(
+                    [self.column_value(row, name) for row in parsed]
+                )
+            )
+            for name, validator in self.column_validators.items()
+        }
+        rejected, valid = [], []
+        for number, row, error in batch:
+            if error is not None:
+                rejected.append((number, row, {"__all__": [error]}))
+                continue
+            invalid = [name for name, results in columns.items() if not next(results)]
+            try:
+                valid.append((number, row, self.build(row, invalid)))
+            except ValidationError as error:
+                rejected.append((number, row, error.message_dict))
+
+        taken = self.existing_keys([instance for _, _, instance in valid])
+        instances = []
+        for number, row, instance in valid:
+            keys = self.unique_keys(instance)
+            duplicates = sorted(
+                {name for name, value in keys if (name, value) in taken}
+            )
+            if duplicates:
+                errors = {name: ["Already exists."] for name in duplicates}
+                rejected.append((number, row, errors))
+                continue
+            taken.update(keys)
+            instances.append(instance)
+
+        imported = len(instances)
+        rejected.sort(key=lambda item: item[0])
+        with transaction.atomic():
+            self.model.objects.bulk_create(instances, batch_size=self.batch_size)
+            if record:
+                record(batch, imported, rejected)
+        return imported, rejected
+
+    def run(self, rows, source, rejects_file, resume=False, progress=None):
+        """Imports ``rows``, checkpointing with each batch.
+
+        Args:
+            rows: Iterable of ``(number, row, error)`` tuples from ``read_rows``
+            source: Key of the ``ImportCheckpoint`` of the import
+            rejects_file: Binary file the rejected rows are written to
+            resume: Whether to skip the rows committed by a previous run
+            progress: Callable receiving the ``ImportStats`` after each batch
+        """
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(source=source)
+        stats = ImportStats()
+        if resume:
+            stats = ImportStats(
+                **{name: getattr(checkpoint, name) for name in asdict(stats)}
+            )
+        done = stats.last_row
+        rows = (item for item in rows if item[0] > done)
+
+        start = time.perf_counter()
+        elapsed = stats.seconds
+
+        def record(batch, imported, rejected):
+            for number, row, errors in rejected:
+                rejects_file.write(
+                    orjson.dumps(
+                        {"row": number, "data": row, "errors": errors},
+                        default=str,
+                        option=orjson.OPT_APPEND_NEWLINE,
+                    )
+                )
+            rejects_file.flush()
+            stats.imported += imported
+            stats.rejected += len(rejected)
+            stats.last_row = batch[-1][0]
+            stats.seconds = elapsed + time.perf_counter() - start
+            ImportCheckpoint.objects.filter(pk=checkpoint.pk).update(**asdict(stats))
+
+        while batch := list(itertools.islice(rows, self.batch_size)):
+            self.import_batch(batch, record)
+            if progress:
+                progress(stats)
+        return stats
+
+
+class CompanyImporter(Importer):
+    """Imports companies, referencing their owner by email."""
+
+    model = Company
+    fields = (
+        "name",
+        "tax_id",
+        "statistical_number",
+        "national_court_register",
+        "email",
+        "phone",
+        "website",
+    )
+    reference = "owner"
+    reference_field = "owner_id"
+    reference_model = CustomUser
+    reference_key = "email"
+    column_validators = {
+        "tax_id": NIPValidator(),
+        "statistical_number": REGONValidator(),
+    }
+    unique_fields = ("tax_id", "email", "national_court_register")
+
+    def unique_keys(self, instance):
+        return [(name, getattr(instance, name)) for name in self.unique_fields]
+
+    def existing_keys(self, instances):
+        if not instances:
+            return set()
+        condition = Q()
+        for name in self.unique_fields:
+            values = {getattr(instance, name) for instance in instances}
+            condition |= Q(**{f"{name}__in": values})
+        return {
+            (name, value)
+            for row in Company.objects.filter(condition).values_list(
+                *self.unique_fields
+            )
+            for name, value in zip(self.unique_fields, row, strict=True)
+        }
+
+
+class AddressImporter(Importer):
+    """Imports addresses, referencing their company by tax id (NIP)."""
+
+    model = Address
+    fields = ("type", "name", "street", "city", "postal_code", "country")
+    reference = "company"
+    reference_field = "company_id"
+    reference_model = Company
+    reference_key = "tax_id"
+
+    def validate(self, instance):
+        if instance.country == Countries.POLAND:
+            try:
+                PolishPostalCodeValidator()(instance.postal_code)
+            except ValidationError as error:
+                raise ValidationError({"postal_code": error.messages}) from error
+
+    def unique_keys(self, instance):
+        # A company has a single billing address.
+        if instance.type == AddressTypes.BILLING:
+            return [("type", instance.company_id)]
+        return []
+
+    def existing_keys(self, instances):
+        companies = {
+            instance.company_id
+            for instance in instances
+            if instance.type == AddressTypes.BILLING
+        }
+        if not companies:
+            return set()
+        return {
+            ("type", company_id)
+            for company_id in Address.objects.filter(
+                type=AddressTypes.BILLING, company_id__in=companies
+            ).values_list("company_id", flat=True)
+        }
+
+
+IMPORTERS = {"companies": CompanyImporter, "addresses": AddressImporter}
@@ -0,0 +1,96 @@
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from apps.core.db import get_pool, get_pool_stats
+
+"""
+Command comparing the per-request cost of opening a new database connection
+with the connection reuse configured in settings (the pool, or CONN_MAX_AGE).
+Request threads each run a query on the default database and release the
+connection as at the end of a request, the pool statistics are reported.
+"""
+
+
+class Command(BaseCommand):
+    help = "Benchmark new database connections against the configured pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--threads", type=int, default=4)
+
+    def handle(self, *args, **options):
+        connection = connections[DEFAULT_DB_ALIAS]
+        # Loads the per-alias type handlers, see django.contrib.postgres.
+        connection.ensure_connection()
+        connection.close()
+
+        backend = type(connection)
+        settings_dict = {
+            **connection.settings_dict,
+            "CONN_MAX_AGE": 0,
+            "OPTIONS": {
+                key: value
+                for key, value in connection.settings_dict["OPTIONS"].items()
+                if key != "pool"
+            },
+        }
+        pool = get_pool(DEFAULT_DB_ALIAS)
+        if pool is not None:
+            pool.open(wait=True)
+            pool.pop_stats()
+
+        for label, get_connection in (
+            ("new", lambda: backend(settings_dict, DEFAULT_DB_ALIAS)),
+            ("configured", lambda: connections[DEFAULT_DB_ALIAS]),
+        ):
+            latencies, seconds = self.run(
+                get_connection, options["requests"], options["threads"]
+            )
+            self.report(label, latencies, seconds)
+
+        if pool is not None:
+            for name, value in get_pool_stats(pool).items():
+                self.stdout.write(f" {name:<10} {value:>12,}")
+
+    @staticmethod
+    def run(get_connection, count, threads):
+        """Runs ``count`` requests over ``threads``, returns their timings."""
+        latencies, errors = [], []
+
+        def requests(count):
+            connection = get_connection()
+            try:
+                for _ in range(count):
+                    start = time.perf_counter()
+                    with connection.cursor() as cursor:
+                        cursor.execute("SELECT 1")
+                    connection.close_if_unusable_or_obsolete()
+                    latencies.append(time.perf_counter() - start)
+            except DatabaseError as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        workers = [
+            threading.Thread(target=requests, args=(count // threads,))
+            for _ in range(threads)
+        ]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        if errors:
+            raise CommandError(f"Requests failed: {errors[0]}")
+        return latencies, time.perf_counter() - start
+
+    def report(self, label, latencies, seconds):
+        quantiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(self.style.MIGRATE_HEADING(f" {label} connections "))
+        self.stdout.write(f" throughput {len(latencies) / seconds:>12,.0f} req/s")
+        self.stdout.write(f" p50        {quantiles[49] * 1000:>12.2f} ms")
+        self.stdout.write(f" p95        {quantiles[94] * 1000:>12.2f} ms")
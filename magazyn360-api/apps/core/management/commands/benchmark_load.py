@@ -0,0 +1,110 @@
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.authentication import ClaimsTokenObtainPairSerializer
+from apps.core.models import CustomUser
+
+"""
+Command measuring the concurrent read throughput of running deployments.
+Each base URL (e.g. a WSGI and an ASGI deployment of the same database) gets
+the same number of GET requests from concurrent clients, authenticated with
+an access token of the given user, and reports requests/sec and latencies.
+See bin/benchmark_load.sh, which starts both deployments.
+"""
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrent reads against running WSGI and ASGI deployments"
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="+", help="Base URLs of the deployments")
+        parser.add_argument("--username", required=True)
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Endpoint to read, may be repeated (default: the core lists).",
+        )
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=50)
+
+    def handle(self, *args, **options):
+        user = CustomUser.objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"User {options['username']} does not exist.")
+        token = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+        paths = options["paths"] or [
+            "/api/core/me/",
+            "/api/core/companies/",
+            "/api/core/addresses/",
+            "/api/core/users/",
+        ]
+
+        for url in options["urls"]:
+            latencies, errors, seconds = asyncio.run(
+                self.load(
+                    url, paths, str(token), options["requests"], options["concurrency"]
+                )
+            )
+            self.report(url, latencies, errors, seconds)
+
+    async def load(self, url, paths, token, count, concurrency):
+        parts = urlsplit(url)
+        host, port = parts.hostname, parts.port or 80
+        prefix = parts.path.rstrip("/")
+        latencies, errors = [], []
+        queue = asyncio.Queue()
+        for i in range(count):
+            queue.put_nowait(prefix + paths[i % len(paths)])
+
+        async def client():
+            while not queue.empty():
+                path = queue.get_nowait()
+                start = time.perf_counter()
+                try:
+                    status = await self.get(host, port, path, token)
+                except OSError as error:
+                    status = str(error)
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    errors.append(status)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return latencies, errors, time.perf_counter() - start
+
+    @staticmethod
+    async def get(host, port, path, token):
+        """Sends a GET request on a new connection, returns the status code."""
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            writer.write(
+                (
+                    f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+                    f"Authorization: Bearer {token}\r\n"
+                    "Accept: application/json\r\nConnection: close\r\n\r\n"
+                ).encode()
+            )
+            await writer.drain()
+            status_line = await reader.readline()
+            await reader.read()
+        finally:
+            writer.close()
+        return int(status_line.split()[1]) if status_line else None
+
+    def report(self, url, latencies, errors, seconds):
+        latencies = sorted(latencies)
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else []
+        self.stdout.write(self.style.MIGRATE_HEADING(f" {url} "))
+        self.stdout.write(f" requests   {len(latencies):>12,}")
+        self.stdout.write(f" errors     {len(errors):>12,}")
+        self.stdout.write(f" throughput {len(latencies) / seconds:>12,.0f} req/s")
+        if quantiles:
+            self.stdout.write(f" p50        {quantiles[49] * 1000:>12.1f} ms")
+            self.stdout.write(f" p95        {quantiles[94] * 1000:>12.1f} ms")
+        if errors:
+            self.stdout.write(self.style.WARNING(f" first error: {errors[0]}"))
@@ -0,0 +1,115 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from apps.core.enums import AddressTypes
+from apps.core.models import Address, Company, CustomUser
+from apps.core.serializers import (
+    AddressSerializer,
+    CompiledReader,
+    UserListSerializer,
+)
+
+"""
+Command comparing the rows/sec of the serializer and compiled read paths.
+Sample users and addresses are created in a transaction which is rolled back,
+both paths read them from the database and render them as JSON.
+"""
+
+
+class Command(BaseCommand):
+    help = "Benchmark the serializer and compiled read paths of the list endpoints"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            company = self.create_rows(options["rows"])
+            cases = [
+                (
+                    "users",
+                    UserListSerializer,
+                    CustomUser.objects.select_related("company").filter(
+                        company=company
+                    ),
+                ),
+                ("addresses", AddressSerializer, company.addresses.all()),
+            ]
+            for name, serializer_class, queryset in cases:
+                self.benchmark(name, serializer_class, queryset, options["repeat"])
+            transaction.set_rollback(True)
+
+    def create_rows(self, count):
+        owner = CustomUser.objects.create(
+            username=f"bench-{uuid.uuid4().hex}", email="bench@example.com"
+        )
+        company = Company.objects.create(
+            name="Benchmark",
+            tax_id=uuid.uuid4().hex[:10],
+            statistical_number="123456789",
+            national_court_register=uuid.uuid4().hex[:10],
+            email="bench@example.com",
+            phone="+48123456789",
+            owner=owner,
+        )
+        CustomUser.objects.bulk_create(
+            CustomUser(
+                username=f"bench-{uuid.uuid4().hex}",
+                email=f"user{i}@example.com",
+                first_name="First",
+                last_name="Last",
+                company=company,
+            )
+            for i in range(count)
+        )
+        Address.objects.bulk_create(
+            Address(
+                company=company,
+                type=AddressTypes.WAREHOUSE,
+                name=f"Warehouse {i}",
+                street="Street 1",
+                city="City",
+                postal_code="00-000",
+            )
+            for i in range(count)
+        )
+        return company
+
+    def benchmark(self, name, serializer_class, queryset, repeat):
+        queryset = queryset.order_by("created_at", "id")
+        reader = CompiledReader.for_serializer(serializer_class)
+        renderer = JSONRenderer()
+
+        def serialize():
+            return renderer.render(serializer_class(queryset, many=True).data)
+
+        def compiled():
+            rows = queryset.values(*reader.lookups)
+            return renderer.render([reader.to_representation(row) for row in rows])
+
+        if serialize() != compiled():
+            raise CommandError(f"The compiled {name} output differs.")
+
+        rows = queryset.count()
+        self.stdout.write(self.style.MIGRATE_HEADING(f" {name} ({rows} rows) "))
+        rates = {}
+        for label, read in (("serializer", serialize), ("compiled", compiled)):
+            best = min(self.measure(read) for _ in range(repeat))
+            rates[label] = rows / best
+            self.stdout.write(f" {label:<10} {rates[label]:>12,.0f} rows/s")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f" speedup    {rates['compiled'] / rates['serializer']:>12.1f}x"
+            )
+        )
+
+    @staticmethod
+    def measure(read):
+        start = time.perf_counter()
+        read()
+        return time.perf_counter() - start
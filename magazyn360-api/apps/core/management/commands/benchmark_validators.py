@@ -0,0 +1,80 @@
+import random
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.validators import NIPValidator, REGONValidator
+
+"""
+Command comparing the identifiers/sec of the single-value and batch paths of
+the checksum validators. Random identifiers are generated, half of them with a
+valid check digit, and both paths must agree on which ones are valid.
+"""
+
+
+class Command(BaseCommand):
+    help = "Benchmark the NIP and REGON checksum validators"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=1_000_000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        cases = [
+            ("NIP", NIPValidator(), 10),
+            ("REGON", REGONValidator(), 9),
+            ("REGON-14", REGONValidator(), 14),
+        ]
+        for name, validator, length in cases:
+            values = self.generate(rng, validator, length, options["count"])
+            self.benchmark(name, validator, values)
+
+    @staticmethod
+    def generate(rng, validator, length, count):
+        values = []
+        for i in range(count):
+            digits = "".join(rng.choices("0123456789", k=length - 1))
+            check_digit = validator.check_digit(digits)
+            if i % 2 or check_digit is None:
+                check_digit = rng.randrange(10)
+            values.append(f"{digits}{check_digit}")
+        return values
+
+    def benchmark(self, name, validator, values):
+        def single():
+            results = []
+            for value in values:
+                try:
+                    validator(value)
+                except ValidationError:
+                    results.append(False)
+                else:
+                    results.append(True)
+            return results
+
+        results = {}
+        timings = {}
+        for label, validate in (
+            ("single", single),
+            ("batch", lambda: validator.validate_many(values)),
+        ):
+            start = time.perf_counter()
+            results[label] = validate()
+            timings[label] = time.perf_counter() - start
+
+        if results["single"] != results["batch"]:
+            raise CommandError(f"The {name} validation paths disagree.")
+
+        valid = sum(results["batch"])
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(f" {name} ({len(values)} ids, {valid} valid) ")
+        )
+        for label, seconds in timings.items():
+            self.stdout.write(f" {label:<10} {len(values) / seconds:>12,.0f} ids/s")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f" speedup    {timings['single'] / timings['batch']:>12.1f}x"
+            )
+        )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.docs import generate_schemas, get_code_version, get_schema_path
+
+"""
+Command writing the OpenAPI schema of the current code version to
+OPENAPI_SCHEMA_DIR, run at image build time. Workers serve these files instead
+of generating the schema, see apps.core.docs.
+"""
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema files of the current code version"
+
+    def handle(self, *args, **options):
+        for format, content in generate_schemas().items():
+            path = get_schema_path(format)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+            self.stdout.write(f"Wrote {path} ({len(content)} bytes)")
+        self.stdout.write(
+            self.style.SUCCESS(f"Schema of version {get_code_version()} generated.")
+        )
@@ -0,0 +1,95 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.importers import (
+    BATCH_SIZE,
+    FORMATS,
+    IMPORTERS,
+    guess_format,
+    is_json_array,
+    read_rows,
+)
+from apps.core.models import ImportCheckpoint
+
+"""
+Command importing companies or addresses from a legacy CSV or JSON Lines dump.
+Columns are named after the model fields. Companies reference their owner by
+the `owner` email, addresses reference their company by the `company` tax id.
+JSON dumps must hold one object per line, a JSON array is refused. Rejected
+rows are written with their errors to a JSON Lines file, and progress is
+checkpointed in the database with each batch so `--resume` continues an
+interrupted import.
+"""
+
+
+class Command(BaseCommand):
+    help = "Import companies or addresses from a CSV or JSON Lines file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(IMPORTERS))
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Format of the file, guessed from its extension by default.",
+        )
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            "--rejects",
+            help="File the rejected rows are written to (default: PATH.rejects.jsonl).",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Skip the rows committed by a previous interrupted run.",
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        path = options["path"]
+        if not os.path.isfile(path):
+            raise CommandError(f"File {path} does not exist.")
+        file_format = options["format"] or guess_format(path)
+        if file_format is None:
+            raise CommandError("Unknown file format, pass --format.")
+        if file_format == "jsonl" and is_json_array(path):
+            raise CommandError(
+                f"{path} holds a JSON array. Convert it to JSON Lines, one object "
+                f"per line, e.g. with: jq -c '.[]' {path}"
+            )
+        source = f"{options['kind']}:{os.path.abspath(path)}"
+        checkpoints = ImportCheckpoint.objects.filter(source=source)
+        rejects_path = options["rejects"] or f"{path}.rejects.jsonl"
+        resume = options["resume"] and checkpoints.exists()
+        if options["resume"] and not resume:
+            self.stdout.write("No checkpoint found, importing from the start.")
+
+        importer = IMPORTERS[options["kind"]](batch_size=options["batch_size"])
+        with open(rejects_path, "ab" if resume else "wb") as rejects_file:
+            stats = importer.run(
+                read_rows(path, file_format),
+                source,
+                rejects_file,
+                resume=resume,
+                progress=self.report_progress,
+            )
+        # The import is complete, a later run starts from scratch.
+        checkpoints.delete()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {stats.imported} {options['kind']}, rejected "
+                f"{stats.rejected} rows in {stats.seconds:.1f}s "
+                f"({stats.rows_per_second:,.0f} rows/s)."
+            )
+        )
+        if stats.rejected:
+            self.stdout.write(f"Rejected rows were written to {rejects_path}.")
+
+    def report_progress(self, stats):
+        if self.verbosity > 1:
+            self.stdout.write(
+                f" row {stats.last_row}: {stats.imported} imported, "
+                f"{stats.rejected} rejected ({stats.rows_per_second:,.0f} rows/s)"
+            )
@@ -1,9 +1,12 @@
-import importlib
-
 from django.apps import apps
 from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.core.cache import is_cache_shared
+from apps.core.groups import role_group_ids
+from apps.core.permission_matrix import iter_permission_configs, permission_matrix
 
 """
 Command to initialize permissions for all apps in the project.
@@ -18,29 +21,133 @@ The `GROUP_MODEL_PERMISSIONS` dictionary should be structured as follows:
 }
 Where `model_name` is the name of the model, `role_enum` is an enumeration value representing a user role,
 and `action` is the action to be performed (e.g., "add", "change", "delete", "view").
-The command will create groups based on the role enums and assign the corresponding permissions to each group.
+The command will create groups based on the role enums and grant them the configured
+permissions of the configured models. Other permissions the groups hold on these models,
+e.g. granted by hand, are listed and only removed with --prune. Permissions of other
+models are left untouched.
+It runs a fixed number of queries: the configured state is diffed against the database
+and only the differences are written, in one transaction.
+Running workers reload the permission matrix once the command bumps its version in the
+default cache, which must therefore be shared (CACHE_URL), e.g. Redis. With the default
+per-process cache they keep the previous permissions until they restart.
 """
 
+GroupPermission = Group.permissions.through
+
 
 class Command(BaseCommand):
     help = "Initialize permissions for all apps"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Print the changes without applying them.",
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Remove the permissions of the configured models which are not "
+            "configured, instead of listing them.",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Exit with a non-zero status if the permissions are not up to date.",
+        )
+
     def handle(self, *args, **options):
-        for app_config in apps.get_app_configs():
-            try:
-                permissions_module = importlib.import_module(
-                    f"{app_config.name}.permissions_config"
+        desired, content_types = self.get_desired_permissions()
+        permissions = {
+            (content_type_id, codename): (permission_id, f"{app_label}.{codename}")
+            for permission_id, content_type_id, codename, app_label in (
+                Permission.objects.filter(content_type__in=content_types).values_list(
+                    "id", "content_type_id", "codename", "content_type__app_label"
+                )
+            )
+        }
+        groups = dict(Group.objects.filter(name__in=desired).values_list("name", "id"))
+        current = set(
+            GroupPermission.objects.filter(
+                group_id__in=groups.values(),
+                permission__content_type__in=content_types,
+            ).values_list("group_id", "permission_id")
+        )
+
+        for content_type_id, codename in sorted(set().union(*desired.values())):
+            if (content_type_id, codename) not in permissions:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f" Permission {codename} does not exist "
+                        f"(content type {content_type_id})."
+                    )
                 )
-            except ModuleNotFoundError:
-                continue
 
-            if not hasattr(permissions_module, "GROUP_MODEL_PERMISSIONS"):
-                continue
+        missing_groups = [name for name in desired if name not in groups]
+        to_add, to_remove = {}, {}
+        for group_name, wanted in desired.items():
+            wanted_ids = {permissions[key][0] for key in wanted if key in permissions}
+            group_id = groups.get(group_name)
+            held = {perm for group, perm in current if group == group_id}
+            if wanted_ids - held:
+                to_add[group_name] = wanted_ids - held
+            if group_id is not None and held - wanted_ids:
+                to_remove[group_name] = held - wanted_ids
+
+        labels = {perm_id: label for perm_id, label in permissions.values()}
+        if not options["prune"]:
+            self.report_unconfigured(to_remove, labels)
+            to_remove = {}
 
-            self.stdout.write(self.style.MIGRATE_HEADING(f" App: {app_config.label} "))
+        if not (missing_groups or to_add or to_remove):
+            self.stdout.write(self.style.SUCCESS(" Permissions are up to date."))
+            return
 
-            model_perms = permissions_module.GROUP_MODEL_PERMISSIONS
+        self.report(missing_groups, to_add, to_remove, labels)
+        if options["check"]:
+            raise CommandError("Permissions are out of date, run init_permissions.")
+        if options["dry_run"]:
+            return
 
+        with transaction.atomic():
+            created = Group.objects.bulk_create(
+                [Group(name=name) for name in missing_groups]
+            )
+            groups.update((group.name, group.pk) for group in created)
+            GroupPermission.objects.bulk_create(
+                [
+                    GroupPermission(group_id=groups[name], permission_id=perm_id)
+                    for name, perm_ids in to_add.items()
+                    for perm_id in perm_ids
+                ],
+                ignore_conflicts=True,
+            )
+            for name, perm_ids in to_remove.items():
+                GroupPermission.objects.filter(
+                    group_id=groups[name], permission_id__in=perm_ids
+                ).delete()
+            # Bulk operations send no signals, bump the cached state ourselves.
+            transaction.on_commit(permission_matrix.invalidate)
+            transaction.on_commit(role_group_ids.invalidate)
+
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(" All permissions initialized successfully! ")
+        )
+        if not is_cache_shared():
+            self.stdout.write(
+                self.style.WARNING(
+                    " The default cache is per process: running workers keep the "
+                    "previous permissions until restarted. Set CACHE_URL to a "
+                    "shared cache."
+                )
+            )
+
+    def get_desired_permissions(self):
+        """Returns the configured ``(content type id, codename)`` pairs per group
+        name, and the content types of the configured models."""
+        models = {}
+        configured = []
+        for app_config, model_perms in iter_permission_configs():
             for model_name, group_map in model_perms.items():
                 try:
                     model = apps.get_model(app_config.label, model_name)
@@ -51,32 +158,41 @@ class Command(BaseCommand):
                         )
                     )
                     continue
+                models[model._meta.label] = model
+                configured.append((model, group_map))
 
-                ct = ContentType.objects.get_for_model(model)
-
-                for role_enum, actions in group_map.items():
-                    group_name = str(role_enum.value).capitalize()
-                    group, _ = Group.objects.get_or_create(name=group_name)
-
-                    for action in actions:
-                        codename = f"{action}_{model._meta.model_name}"
-                        try:
-                            perm = Permission.objects.get(
-                                content_type=ct, codename=codename
-                            )
-                            group.permissions.add(perm)
-                            self.stdout.write(
-                                self.style.SUCCESS(
-                                    f" Added permission: {codename} ({app_config.label}.{model_name}) to group: {group_name}"
-                                )
-                            )
-                        except Permission.DoesNotExist:
-                            self.stdout.write(
-                                self.style.WARNING(
-                                    f" Permission {codename} does not exist for model {model_name} in {app_config.label} app."
-                                )
-                            )
+        content_types = ContentType.objects.get_for_models(*models.values())
+        desired = {}
+        for model, group_map in configured:
+            content_type_id = content_types[model].pk
+            for role_enum, actions in group_map.items():
+                group_name = str(role_enum.value).capitalize()
+                desired.setdefault(group_name, set()).update(
+                    (content_type_id, f"{action}_{model._meta.model_name}")
+                    for action in actions
+                )
+        return desired, list(content_types.values())
 
-        self.stdout.write(
-            self.style.MIGRATE_HEADING(" All permissions initialized successfully! ")
-        )
+    def report_unconfigured(self, unconfigured, labels):
+        """Lists the held permissions which are kept without ``--prune``."""
+        for name, perm_ids in sorted(unconfigured.items()):
+            for label in sorted(
+                labels.get(perm_id, str(perm_id)) for perm_id in perm_ids
+            ):
+                self.stdout.write(
+                    self.style.NOTICE(f" ? {name}: {label} (not configured, kept)")
+                )
+        if unconfigured:
+            self.stdout.write(self.style.NOTICE(" Run with --prune to remove them."))
+
+    def report(self, missing_groups, to_add, to_remove, labels):
+        for name in missing_groups:
+            self.stdout.write(self.style.SUCCESS(f" + group {name}"))
+        for name, perm_ids in sorted(to_add.items()):
+            for label in sorted(labels[perm_id] for perm_id in perm_ids):
+                self.stdout.write(self.style.SUCCESS(f" + {name}: {label}"))
+        for name, perm_ids in sorted(to_remove.items()):
+            for label in sorted(
+                labels.get(perm_id, str(perm_id)) for perm_id in perm_ids
+            ):
+                self.stdout.write(self.style.WARNING(f" - {name}: {label}"))
@@ -0,0 +1,34 @@
+import math
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.core.routers import ReplicaMonitor, measure_lag
+
+"""
+Command reporting the replication lag of each read replica and whether it is
+in rotation, i.e. receives the reads of safe requests, see apps.core.routers.
+"""
+
+
+class Command(BaseCommand):
+    help = "Show the replication lag of the read replicas"
+
+    def handle(self, *args, **options):
+        if not settings.REPLICA_DATABASES:
+            self.stdout.write("No read replicas are configured.")
+            return
+
+        for alias in settings.REPLICA_DATABASES:
+            lag = measure_lag(alias)
+            if ReplicaMonitor.is_lag_acceptable(lag):
+                status = self.style.SUCCESS("in rotation")
+            else:
+                status = self.style.WARNING("out of rotation")
+            if lag is None:
+                lag = "unreachable"
+            elif math.isinf(lag):
+                lag = "lag unknown"
+            else:
+                lag = f"{lag:.1f}s behind"
+            self.stdout.write(f"{alias}: {lag}, {status}")
@@ -0,0 +1,166 @@
+"""Request metrics in the Prometheus format, recorded by MetricsMiddleware.
+
+Requests are labelled with the name of the resolved URL pattern and the view
+action. Under Gunicorn every worker writes its metrics to files in
+PROMETHEUS_MULTIPROC_DIR (see bin/magazyn360_start_gunicorn.sh) and the
+metrics view sums up the files of all workers. The files of exited workers
+are folded into archive files by the master.
+"""
+
+import os
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.mmap_dict import MmapedDict
+
+ARCHIVED_TYPES = ("counter", "histogram")
+LABELS = ("view", "action")
+METHODS = {"get", "head", "options", "post", "put", "patch", "delete"}
+SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+request_duration = Histogram(
+    "magazyn360_http_request_duration_seconds",
+    "Time spent handling requests",
+    LABELS,
+    buckets=SECONDS,
+)
+request_queries = Histogram(
+    "magazyn360_http_request_queries",
+    "SQL queries run per request",
+    LABELS,
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+request_db_duration = Histogram(
+    "magazyn360_http_request_db_duration_seconds",
+    "Time spent in SQL queries per request",
+    LABELS,
+    buckets=SECONDS,
+)
+response_size = Histogram(
+    "magazyn360_http_response_size_bytes",
+    "Size of the response bodies, streamed responses excluded",
+    LABELS,
+    buckets=tuple(4**exponent for exponent in range(4, 12)),
+)
+responses = Counter(
+    "magazyn360_http_responses",
+    "Responses by status code",
+    LABELS + ("status",),
+)
+
+
+# QueryCounter of the current request, set by MetricsMiddleware. Unlike a
+# wrapper added to the connections of the middleware's thread, it also counts
+# the queries async views run in sync_to_async threads.
+request_query_counter = ContextVar("request_query_counter", default=None)
+
+
+def count_request_query(execute, sql, params, many, context):
+    """Database execute wrapper of every connection (see apps.core.signals),
+    reporting to the QueryCounter of the current request."""
+    counter = request_query_counter.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    return counter(execute, sql, params, many, context)
+
+
+def get_labels(request):
+    """Returns the URL pattern name and the view action of ``request``.
+
+    The action of a viewset comes from its method mapping, other views (and
+    unresolved requests) are labelled with the lowercase HTTP method.
+    """
+    method = request.method.lower()
+    if method not in METHODS:
+        method = "other"
+    match = request.resolver_match
+    if match is None:
+        return "unresolved", method
+    actions = getattr(match.func, "actions", None) or {}
+    return match.view_name, actions.get(method, method)
+
+
+def record_request(request, response, duration, queries):
+    """Records a handled request.
+
+    Args:
+        request: Handled request
+        response: Its response
+        duration: Seconds it took
+        queries: QueryCounter of the SQL queries it ran
+    """
+    labels = get_labels(request)
+    request_duration.labels(*labels).observe(duration)
+    request_queries.labels(*labels).observe(queries.count)
+    request_db_duration.labels(*labels).observe(queries.duration)
+    if not response.streaming:
+        response_size.labels(*labels).observe(len(response.content))
+    responses.labels(*labels, response.status_code).inc()
+
+
+def get_registry():
+    """Returns the registry of the metrics of every worker."""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def archive_worker_metrics(pid, directory=None):
+    """Folds the metrics files of an exited worker into the archive files of
+    the metrics directory and removes them.
+
+    Run by the Gunicorn master (see child_exit in magazyn360/gunicorn_config.py)
+    so that the directory only grows with the number of live workers, however
+    often they are recycled.
+
+    Args:
+        pid: Process ID of the worker
+        directory: Metrics directory, PROMETHEUS_MULTIPROC_DIR by default
+    """
+    directory = Path(directory or os.environ["PROMETHEUS_MULTIPROC_DIR"])
+    multiprocess.mark_process_dead(pid, directory)
+    for type in ARCHIVED_TYPES:
+        path = directory / f"{type}_{pid}.db"
+        if not path.exists():
+            continue
+        archive = MmapedDict(directory / f"{type}_archive.db")
+        try:
+            for key, value, timestamp, _ in MmapedDict.read_all_values_from_file(path):
+                archived, _ = archive.read_value(key)
+                archive.write_value(key, archived + value, timestamp)
+        finally:
+            archive.close()
+        path.unlink()
+
+
+def metrics_view(request):
+    """Serves the metrics to Prometheus, which authenticates with
+    ``Bearer <METRICS_TOKEN>``.
+
+    Without a token the metrics are only served in DEBUG, see the
+    ``core.W001`` check.
+    """
+    if not settings.METRICS_TOKEN:
+        if not settings.DEBUG:
+            raise Http404
+    elif not constant_time_compare(
+        request.headers.get("Authorization", ""), f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+    )
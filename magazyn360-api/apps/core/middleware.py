@@ -0,0 +1,128 @@
+import hashlib
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.metrics import record_request, request_query_counter
+from apps.core.mixins import QueryCounter
+from apps.core.routers import RoutingState, routing_state
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class ReplicaRoutingMiddleware:
+    """Lets safe requests read from the replicas, see ``apps.core.routers``.
+
+    A client which wrote is pinned to the primary for READ_YOUR_WRITES_SECONDS
+    so that it reads its own writes, replicas may not have replayed them yet.
+    Clients are told apart by their credentials (the Authorization header or
+    the session cookie), pins are shared by workers through the default
+    cache.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = self.get_routing_state(request)
+        token = routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        self.pin_writer(request, state)
+        return response
+
+    async def __acall__(self, request):
+        state = await self.aget_routing_state(request)
+        token = routing_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        await self.apin_writer(request, state)
+        return response
+
+    @staticmethod
+    def get_pin_key(request):
+        credentials = request.headers.get("Authorization") or request.COOKIES.get(
+            settings.SESSION_COOKIE_NAME
+        )
+        if not credentials:
+            return None
+        digest = hashlib.sha256(credentials.encode()).hexdigest()
+        return f"core:primary-pin:{digest}"
+
+    def get_routing_state(self, request):
+        if not settings.REPLICA_DATABASES or request.method not in SAFE_METHODS:
+            return RoutingState()
+        key = self.get_pin_key(request)
+        return RoutingState(use_replicas=key is None or not cache.get(key))
+
+    async def aget_routing_state(self, request):
+        if not settings.REPLICA_DATABASES or request.method not in SAFE_METHODS:
+            return RoutingState()
+        key = self.get_pin_key(request)
+        return RoutingState(use_replicas=key is None or not await cache.aget(key))
+
+    def pin_writer(self, request, state):
+        key = self.get_pin_key(request)
+        if settings.REPLICA_DATABASES and state.wrote and key is not None:
+            cache.set(key, True, timeout=settings.READ_YOUR_WRITES_SECONDS)
+
+    async def apin_writer(self, request, state):
+        key = self.get_pin_key(request)
+        if settings.REPLICA_DATABASES and state.wrote and key is not None:
+            await cache.aset(key, True, timeout=settings.READ_YOUR_WRITES_SECONDS)
+
+
+class MetricsMiddleware:
+    """Records the latency, SQL queries and response of every request, see
+    ``apps.core.metrics``.
+
+    It comes first in MIDDLEWARE so that the latency includes every other
+    middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        queries = QueryCounter()
+        token = request_query_counter.set(queries)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_query_counter.reset(token)
+        record_request(request, response, time.perf_counter() - started, queries)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        queries = QueryCounter()
+        token = request_query_counter.set(queries)
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_query_counter.reset(token)
+        record_request(request, response, time.perf_counter() - started, queries)
+        return response
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("core", "0002_alter_address_name_alter_address_type_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="address",
+            index=models.Index(
+                fields=["created_at", "id"], name="core_addres_created_3f4eac_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="company",
+            index=models.Index(
+                fields=["created_at", "id"], name="core_compan_created_a2aa1e_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="customuser",
+            index=models.Index(
+                fields=["created_at", "id"], name="core_custom_created_d429c3_idx"
+            ),
+        ),
+    ]
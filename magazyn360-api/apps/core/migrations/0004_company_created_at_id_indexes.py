@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("core", "0003_created_at_id_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="address",
+            index=models.Index(
+                fields=["company", "created_at", "id"],
+                name="core_addres_company_f56034_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="customuser",
+            index=models.Index(
+                fields=["company", "created_at", "id"],
+                name="core_custom_company_35b432_idx",
+            ),
+        ),
+    ]
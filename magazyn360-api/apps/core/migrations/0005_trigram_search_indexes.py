@@ -0,0 +1,144 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:32
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # The indexes are built without locking writes to the tables, which
+    # cannot be done in a transaction.
+    atomic = False
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("core", "0004_company_created_at_id_indexes"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="address",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                name="core_address_name_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="address",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("street"), name="gin_trgm_ops"
+                ),
+                name="core_address_street_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="address",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("city"), name="gin_trgm_ops"
+                ),
+                name="core_address_city_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="address",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("postal_code"),
+                    name="gin_trgm_ops",
+                ),
+                name="core_address_postal_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="company",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                name="core_company_name_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="company",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("tax_id"), name="gin_trgm_ops"
+                ),
+                name="core_company_tax_id_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="company",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("email"), name="gin_trgm_ops"
+                ),
+                name="core_company_email_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="customuser",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("username"),
+                    name="gin_trgm_ops",
+                ),
+                name="core_user_username_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="customuser",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("email"), name="gin_trgm_ops"
+                ),
+                name="core_user_email_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="customuser",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("first_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="core_user_first_name_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="customuser",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("last_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="core_user_last_name_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="customuser",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("phone_number"),
+                    name="gin_trgm_ops",
+                ),
+                name="core_user_phone_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="customuser",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("position"),
+                    name="gin_trgm_ops",
+                ),
+                name="core_user_position_trgm",
+            ),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_trigram_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "source",
+                    models.CharField(
+                        max_length=1024, unique=True, verbose_name="Source"
+                    ),
+                ),
+                (
+                    "imported",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Imported Rows"
+                    ),
+                ),
+                (
+                    "rejected",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Rejected Rows"
+                    ),
+                ),
+                (
+                    "last_row",
+                    models.PositiveIntegerField(default=0, verbose_name="Last Row"),
+                ),
+                ("seconds", models.FloatField(default=0.0, verbose_name="Seconds")),
+            ],
+            options={
+                "verbose_name": "Import Checkpoint",
+                "verbose_name_plural": "Import Checkpoints",
+            },
+        ),
+    ]
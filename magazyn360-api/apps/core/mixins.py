@@ -0,0 +1,565 @@
+import csv
+import hashlib
+import logging
+import time
+import uuid
+from contextlib import ExitStack
+from itertools import islice
+from types import SimpleNamespace
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Count, Max
+from django.http import Http404, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError as APIValidationError
+from rest_framework.response import Response
+
+from apps.core.renderers import CSVRenderer, NDJSONRenderer
+from apps.core.serializers import CompiledReader
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """Database execute wrapper counting the queries run on connections and
+    the seconds they took."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+
+
+class QueryBudgetMixin:
+    """Reports view actions issuing more SQL queries than they declare.
+
+    Queries needed to authenticate the request are not counted against the
+    budget. Checking is enabled with the ``QUERY_BUDGET_ENFORCE`` setting.
+
+    Attributes:
+        query_budgets: Maximum number of queries per action (or lowercase
+            HTTP method for views which are not viewsets). Lists paginated by
+            offset, which count their rows before loading the page, are
+            checked against ``offset_list``.
+    """
+
+    query_budgets = {}
+
+    def get_query_budget(self):
+        action = getattr(self, "action", None) or self.request.method.lower()
+        paginator = getattr(self, "_paginator", None)
+        if (
+            action == "list"
+            and getattr(paginator, "offset_pagination", None) is not None
+        ):
+            action = "offset_list"
+        return self.query_budgets.get(action)
+
+    def dispatch(self, request, *args, **kwargs):
+        if not settings.QUERY_BUDGET_ENFORCE:
+            return super().dispatch(request, *args, **kwargs)
+
+        self._query_counter = QueryCounter()
+        self._authentication_queries = 0
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(self._query_counter)
+                )
+            response = super().dispatch(request, *args, **kwargs)
+
+        budget = self.get_query_budget()
+        used = self._query_counter.count - self._authentication_queries
+        if budget is not None and used > budget:
+            logger.warning(
+                "%s.%s used %d queries, budget is %d",
+                self.__class__.__name__,
+                getattr(self, "action", None) or request.method.lower(),
+                used,
+                budget,
+            )
+        return response
+
+    def perform_authentication(self, request):
+        super().perform_authentication(request)
+        counter = getattr(self, "_query_counter", None)
+        if counter is not None:
+            self._authentication_queries = counter.count
+
+
+class ConditionalGetMixin:
+    """Answers unchanged list and retrieve requests with ``304 Not Modified``.
+
+    The ``ETag`` comes from one aggregate query over the filtered queryset:
+    the latest ``updated_at`` and the row count. Objects are only loaded and
+    serialized when it does not match the request's ``If-None-Match``. No
+    ``Last-Modified`` is sent: it only has whole seconds, so a client
+    revalidating with ``If-Modified-Since`` would miss an update made in the
+    second of its previous read.
+
+    Attributes:
+        conditional_related: Relations whose ``updated_at`` is part of the
+            representation
+    """
+
+    conditional_related = ()
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_response(queryset, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            queryset = self.get_retrieve_queryset()
+        except (TypeError, ValueError, ValidationError):
+            # Malformed lookup, the handler answers with 404.
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional_response(queryset, super().retrieve, *args, **kwargs)
+
+    def get_retrieve_queryset(self):
+        """Returns the queryset holding the object a retrieve request targets."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+
+    def get_etag(self, queryset):
+        """Returns the ``ETag`` of ``queryset``, None if it is empty and a single
+        object was requested."""
+        state = queryset.order_by().aggregate(**self.get_etag_aggregates())
+        return self.make_etag(state)
+
+    async def aget_etag(self, queryset):
+        """Async counterpart of ``get_etag``."""
+        state = await queryset.order_by().aaggregate(**self.get_etag_aggregates())
+        return self.make_etag(state)
+
+    def get_etag_aggregates(self):
+        fields = ["updated_at"]
+        fields += [f"{relation}__updated_at" for relation in self.conditional_related]
+        aggregates = {f"max_{i}": Max(field) for i, field in enumerate(fields)}
+        return {"count": Count("pk"), **aggregates}
+
+    def make_etag(self, state):
+        if not state["count"] and getattr(self, "action", None) != "list":
+            return None
+        key = [self.request.get_full_path(), self.request.accepted_media_type]
+        key += [str(self.request.user.pk)] + [str(value) for value in state.values()]
+        return quote_etag(
+            hashlib.md5("|".join(key).encode(), usedforsecurity=False).hexdigest()
+        )
+
+    def conditional_response(self, queryset, handler, *args, **kwargs):
+        try:
+            etag = self.get_etag(queryset)
+        except (TypeError, ValueError, ValidationError):
+            # Malformed lookup, the handler answers with 404.
+            etag = None
+        if etag is None:
+            return handler(self.request, *args, **kwargs)
+
+        response = self.get_not_modified_response(etag)
+        if response is None:
+            response = handler(self.request, *args, **kwargs)
+        return self.add_etag(response, etag)
+
+    def get_not_modified_response(self, etag):
+        """Returns the ``304`` response if the request's ``If-None-Match``
+        matches."""
+        return get_conditional_response(self.request._request, etag=etag)
+
+    def add_etag(self, response, etag):
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class SparseFieldsetMixin:
+    """Lets read actions return a subset of the serializer fields.
+
+    ``?fields=`` keeps and ``?omit=`` drops the given comma separated field
+    names. The queryset then only loads the columns the remaining fields read.
+    Unknown names are rejected with 400 before anything is queried.
+
+    Attributes:
+        sparse_actions: Actions accepting the parameters
+        sparse_columns: Columns read by fields which are not backed by a
+            model field, keyed by field name
+        sparse_always_loaded: Columns loaded regardless of the selection,
+            e.g. the pagination key
+    """
+
+    sparse_actions = ("list", "retrieve")
+    sparse_columns = {}
+    sparse_always_loaded = ("id", "created_at")
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.sparse_fields = self.get_sparse_fields()
+
+    def get_sparse_fields(self):
+        """Returns the names of the selected fields, None if all are returned."""
+        if self.action not in self.sparse_actions:
+            return None
+        params = {
+            param: {name.strip() for name in value.split(",") if name.strip()}
+            for param in ("fields", "omit")
+            if (value := self.request.query_params.get(param))
+        }
+        if not params:
+            return None
+
+        available = set(self.get_serializer_class()().fields)
+        errors = {
+            param: [f"Unknown fields: {', '.join(sorted(names - available))}."]
+            for param, names in params.items()
+            if names - available
+        }
+        if errors:
+            raise APIValidationError(errors)
+        return params.get("fields", available) - params.get("omit", set())
+
+    def get_sparse_columns(self, fields):
+        """Returns the columns the serializer ``fields`` read."""
+        serializer_fields = self.get_serializer_class()().fields
+        columns = set(self.sparse_always_loaded)
+        for name in fields:
+            if name in self.sparse_columns:
+                columns.update(self.sparse_columns[name])
+            else:
+                columns.add(serializer_fields[name].source.replace(".", "__"))
+        return columns
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = getattr(self, "sparse_fields", None)
+        if fields is None:
+            return queryset
+
+        columns = self.get_sparse_columns(fields)
+        related = queryset.query.select_related
+        if isinstance(related, dict):
+            # Relations can't be both deferred and selected.
+            loaded = {column.split("__")[0] for column in columns if "__" in column}
+            queryset = queryset.select_related(None).select_related(
+                *(name for name in related if name in loaded)
+            )
+        return queryset.only(*columns)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = getattr(self, "sparse_fields", None)
+        if fields is not None:
+            target = getattr(serializer, "child", serializer)
+            for name in set(target.fields) - fields:
+                del target.fields[name]
+        return serializer
+
+
+class CompiledReadMixin:
+    """Serves list and retrieve from ``values()`` rows through a ``CompiledReader``.
+
+    Rows are read as dictionaries and turned into the serializer's
+    representation without creating model instances or serializers. The
+    retrieved row is read from ``get_retrieve_queryset()``, see
+    ``ConditionalGetMixin``, and its object permissions are checked against
+    its values, the ``tenant_field`` included.
+
+    Attributes:
+        compiled_reads: Whether list and retrieve use the compiled path
+        compiled_extra_lookups: Lookups loaded for pagination
+    """
+
+    compiled_reads = True
+    compiled_extra_lookups = ("id", "created_at")
+
+    def get_compiled_reader(self):
+        fields = getattr(self, "sparse_fields", None)
+        return CompiledReader.for_serializer(
+            self.get_serializer_class(),
+            None if fields is None else frozenset(fields),
+        )
+
+    def get_compiled_rows(self, queryset, reader):
+        lookups = {*reader.lookups, *self.compiled_extra_lookups}
+        if getattr(self, "tenant_field", None):
+            lookups.add(self.tenant_field)
+        return queryset.values(*lookups)
+
+    def list(self, request, *args, **kwargs):
+        if not self.compiled_reads:
+            return super().list(request, *args, **kwargs)
+
+        reader = self.get_compiled_reader()
+        rows = self.get_compiled_rows(self.filter_queryset(self.get_queryset()), reader)
+        page = self.paginate_queryset(rows)
+        data = [
+            reader.to_representation(row) for row in (rows if page is None else page)
+        ]
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.compiled_reads:
+            return super().retrieve(request, *args, **kwargs)
+
+        reader = self.get_compiled_reader()
+        try:
+            row = self.get_compiled_rows(self.get_retrieve_queryset(), reader).get()
+        except (TypeError, ValueError, ValidationError, ObjectDoesNotExist):
+            raise Http404 from None
+        self.check_object_permissions(request, SimpleNamespace(**row))
+        return Response(reader.to_representation(row))
+
+
+class AsyncReadMixin:
+    """Serves list and retrieve on the event loop with the async ORM.
+
+    Enabled by the ``ASYNC_READS`` setting, for ASGI deployments: the view is
+    then async and a worker holds many requests in flight while their queries
+    run. Actions with an async variant named ``a<action>`` (``a<method>``
+    for plain views) are awaited, the other ones run in a thread like any
+    sync view. Builds on ``ConditionalGetMixin`` and ``CompiledReadMixin``,
+    query budgets are not checked on the async path.
+
+    Attributes:
+        async_actions: Whether the view instance dispatches asynchronously
+    """
+
+    async_actions = False
+
+    @classmethod
+    def as_view(cls, *args, **initkwargs):
+        if not settings.ASYNC_READS:
+            return super().as_view(*args, **initkwargs)
+        view = super().as_view(*args, async_actions=True, **initkwargs)
+        return markcoroutinefunction(view)
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.async_actions:
+            return self.adispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        """Async counterpart of ``APIView.dispatch``."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # Authentication and permission checks may query the database.
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            method = request.method.lower()
+            if method not in self.http_method_names or not hasattr(self, method):
+                self.http_method_not_allowed(request, *args, **kwargs)
+            name = getattr(self, "action", None) or method
+            handler = getattr(self, f"a{name}", None)
+            if handler is None:
+                handler = sync_to_async(getattr(self, method))
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def apaginate_queryset(self, queryset):
+        """Async counterpart of ``GenericAPIView.paginate_queryset``."""
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(
+            queryset, self.request, view=self
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        if not self.compiled_reads:
+            return await sync_to_async(self.list)(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        etag = await self.aget_etag(queryset)
+        response = self.get_not_modified_response(etag)
+        if response is None:
+            reader = self.get_compiled_reader()
+            rows = self.get_compiled_rows(queryset, reader)
+            page = await self.apaginate_queryset(rows)
+            if page is not None:
+                data = [reader.to_representation(row) for row in page]
+                response = self.get_paginated_response(data)
+            else:
+                data = [reader.to_representation(row) async for row in rows]
+                response = Response(data)
+        return self.add_etag(response, etag)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        if not self.compiled_reads:
+            return await sync_to_async(self.retrieve)(request, *args, **kwargs)
+
+        try:
+            queryset = self.get_retrieve_queryset()
+            etag = await self.aget_etag(queryset)
+        except (TypeError, ValueError, ValidationError):
+            raise Http404 from None
+        if etag is None:
+            raise Http404
+
+        response = self.get_not_modified_response(etag)
+        if response is None:
+            reader = self.get_compiled_reader()
+            try:
+                row = await self.get_compiled_rows(queryset, reader).aget()
+            except ObjectDoesNotExist:
+                raise Http404 from None
+            self.check_object_permissions(request, SimpleNamespace(**row))
+            response = Response(reader.to_representation(row))
+        return self.add_etag(response, etag)
+
+
+class _Echo:
+    """File-like object handing written CSV lines back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+class StreamingExportMixin:
+    """Adds an ``export`` action streaming the queryset as NDJSON or CSV.
+
+    Rows are read through a server-side cursor in chunks and written out as
+    they arrive, so memory stays flat regardless of the table size. The
+    format is negotiated from ``Accept`` or the ``format`` query parameter.
+    The rows are read after ``dispatch`` returned, so query budgets and the
+    request metrics do not cover that query.
+
+    Attributes:
+        export_fields: Output columns mapped to the lookups they are read from
+        export_chunk_size: Rows fetched from the cursor per round trip
+    """
+
+    export_fields = {}
+    export_chunk_size = 2000
+
+    @action(detail=False, renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).order_by(
+            "created_at", "id"
+        )
+        # Pinned to the database routed to now, the request's routing state
+        # (apps.core.routers) has ended by the time the response streams.
+        queryset = queryset.using(queryset.db)
+        rows = queryset.values_list(*self.export_fields.values()).iterator(
+            chunk_size=self.export_chunk_size
+        )
+        renderer = request.accepted_renderer
+        header, encode = self.get_export_encoder(renderer.format)
+        if getattr(self, "async_actions", False):
+            # ASGI serves async iterators as they go, sync ones only once
+            # consumed entirely.
+            content = self._astream(header, encode, rows, self.export_chunk_size)
+        else:
+            content = self._stream(header, encode, rows)
+
+        response = StreamingHttpResponse(
+            content, content_type=f"{renderer.media_type}; charset={renderer.charset}"
+        )
+        filename = f"{self.basename}-export.{renderer.format}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    def get_export_encoder(self, format):
+        """Returns the header line of ``format`` and the function encoding a
+        row as a line."""
+        if format == CSVRenderer.format:
+            writer = csv.writer(_Echo())
+            return writer.writerow(self.export_fields), writer.writerow
+
+        columns = list(self.export_fields)
+        encoder = DjangoJSONEncoder()
+
+        def encode(row):
+            return encoder.encode(dict(zip(columns, row, strict=True))) + "\n"
+
+        return None, encode
+
+    @staticmethod
+    def _stream(header, encode, rows):
+        if header is not None:
+            yield header
+        for row in rows:
+            yield encode(row)
+
+    @staticmethod
+    async def _astream(header, encode, rows, chunk_size):
+        # The cursor is read in a thread, a chunk of rows at a time.
+        # QuerySet.aiterator() would run the query of values_list() on the
+        # event loop.
+        def read_chunk():
+            return "".join(encode(row) for row in islice(rows, chunk_size))
+
+        if header is not None:
+            yield header
+        while chunk := await sync_to_async(read_chunk)():
+            yield chunk
+
+
+class BulkWriteMixin:
+    """Adds a ``bulk`` action creating (POST) or updating (PATCH) many objects.
+
+    The request body is a list of objects, updates identify each object with
+    its ``id``. The whole batch is validated and written at once by the
+    serializer's ``BulkListSerializer`` and fails as a whole with per-item
+    errors.
+
+    Attributes:
+        bulk_max_items: Maximum number of objects accepted per request
+    """
+
+    bulk_max_items = 1000
+
+    @action(detail=False, methods=["post", "patch"])
+    def bulk(self, request, *args, **kwargs):
+        list_kwargs = {"many": True, "allow_empty": False}
+        list_kwargs["max_length"] = self.bulk_max_items
+        if request.method == "POST":
+            serializer = self.get_serializer(data=request.data, **list_kwargs)
+            serializer.is_valid(raise_exception=True)
+            self.perform_create(serializer)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+        instances = self.get_bulk_instances(request.data)
+        serializer = self.get_serializer(
+            instances, data=request.data, partial=True, **list_kwargs
+        )
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        return Response(serializer.data)
+
+    def get_bulk_instances(self, data):
+        """Fetches the objects referenced by a bulk update in one query."""
+        ids = set()
+        for item in data if isinstance(data, list) else []:
+            try:
+                ids.add(uuid.UUID(str(item.get("id"))))
+            except (AttributeError, ValueError):
+                continue
+        instances = list(self.get_queryset().filter(pk__in=ids))
+        for instance in instances:
+            self.check_object_permissions(self.request, instance)
+        return instances
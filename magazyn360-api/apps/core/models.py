@@ -1,16 +1,24 @@
 import logging
 import uuid
 
-from django.contrib.auth.models import AbstractUser, Group
+from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.translation import gettext_lazy as _
 
 from . import validators
 from .enums import AddressTypes, Countries, Role
+from .groups import get_role_group_id
 
 logger = logging.getLogger(__name__)
 
 
+def trigram_index(field, name):
+    """Returns the GIN index serving ``apps.core.search`` on ``field``."""
+    return GinIndex(OpClass(Upper(field), name="gin_trgm_ops"), name=name)
+
+
 class TimeStampedModel(models.Model):
     """Base model providing automatic timestamps.
 
@@ -79,6 +87,14 @@ class CustomUser(AbstractUser, TimeStampedModel):
         indexes = [
             models.Index(fields=["email"]),
             models.Index(fields=["role"]),
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["company", "created_at", "id"]),
+            trigram_index("username", "core_user_username_trgm"),
+            trigram_index("email", "core_user_email_trgm"),
+            trigram_index("first_name", "core_user_first_name_trgm"),
+            trigram_index("last_name", "core_user_last_name_trgm"),
+            trigram_index("phone_number", "core_user_phone_trgm"),
+            trigram_index("position", "core_user_position_trgm"),
         ]
 
     def __str__(self):
@@ -87,27 +103,27 @@ class CustomUser(AbstractUser, TimeStampedModel):
     def sync_group_with_role(self):
         """Synchronize user group with role.
         This method assigns the user to a group based on their role.
+        Group ids are served from a process-level cache.
         """
-        role_to_group = {
-            Role.ADMIN: "Admin",
-            Role.MANAGER: "Manager",
-            Role.WORKER: "Worker",
-            Role.VIEWER: "Viewer",
-            Role.OWNER: "Owner",
-        }
-
-        group_name = role_to_group.get(Role(self.role))
-        if not group_name:
+        group_id = get_role_group_id(Role(self.role))
+        if group_id is None:
             return
 
-        group, _ = Group.objects.get_or_create(name=group_name)
-        self.groups.set([group])
+        self.groups.set([group_id])
 
     @property
     def company_name(self):
         return self.company.name if self.company else None
 
 
+class CompanyQuerySet(models.QuerySet):
+    def with_addresses(self):
+        """Prefetches the addresses of all companies in one query."""
+        return self.prefetch_related(
+            models.Prefetch("addresses", queryset=Address.objects.order_by("id"))
+        )
+
+
 class Company(TimeStampedModel):
     """Company model with business details.
 
@@ -161,6 +177,8 @@ class Company(TimeStampedModel):
         help_text=_("Company owner"),
     )
 
+    objects = CompanyQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Company")
         verbose_name_plural = _("Companies")
@@ -168,6 +186,10 @@ class Company(TimeStampedModel):
             models.Index(fields=["tax_id"]),
             models.Index(fields=["email"]),
             models.Index(fields=["national_court_register"]),
+            models.Index(fields=["created_at", "id"]),
+            trigram_index("name", "core_company_name_trgm"),
+            trigram_index("tax_id", "core_company_tax_id_trgm"),
+            trigram_index("email", "core_company_email_trgm"),
         ]
         constraints = [
             models.UniqueConstraint(fields=["tax_id"], name="unique_tax_id"),
@@ -183,16 +205,26 @@ class Company(TimeStampedModel):
     @property
     def primary_address(self) -> "Address":
         """Returns the primary office address."""
-        return self.addresses.filter(type=AddressTypes.OFFICE).first()
+        return self.get_address_by_type(AddressTypes.OFFICE)
 
     @property
     def shipping_address(self) -> "Address":
         """Returns the primary billing address."""
-        return self.addresses.filter(type=AddressTypes.BILLING).first()
+        return self.get_address_by_type(AddressTypes.BILLING)
 
     def get_address_by_type(self, address_type: AddressTypes) -> "Address":
-        """Returns address by type."""
-        return self.addresses.filter(type=address_type).first()
+        """Returns address by type.
+
+        Uses prefetched addresses when available instead of querying.
+        """
+        prefetched = getattr(self, "_prefetched_objects_cache", {}).get("addresses")
+        if prefetched is None:
+            return self.addresses.filter(type=address_type).first()
+        return min(
+            (address for address in prefetched if address.type == address_type),
+            key=lambda address: address.pk,
+            default=None,
+        )
 
 
 class Address(TimeStampedModel):
@@ -241,6 +273,12 @@ class Address(TimeStampedModel):
         indexes = [
             models.Index(fields=["type"]),
             models.Index(fields=["company", "type"]),
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["company", "created_at", "id"]),
+            trigram_index("name", "core_address_name_trgm"),
+            trigram_index("street", "core_address_street_trgm"),
+            trigram_index("city", "core_address_city_trgm"),
+            trigram_index("postal_code", "core_address_postal_trgm"),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -263,3 +301,29 @@ class Address(TimeStampedModel):
             city=self.city,
             country=country_name,
         )
+
+
+class ImportCheckpoint(TimeStampedModel):
+    """Progress of a data import (see apps.core.importers), committed with
+    each batch so an interrupted import resumes after its last row.
+
+    Attributes:
+        source: Kind and absolute path of the imported file
+        imported: Rows inserted
+        rejected: Rows written to the rejects file
+        last_row: Number of the last committed row
+        seconds: Time spent importing
+    """
+
+    source = models.CharField(_("Source"), max_length=1024, unique=True)
+    imported = models.PositiveIntegerField(_("Imported Rows"), default=0)
+    rejected = models.PositiveIntegerField(_("Rejected Rows"), default=0)
+    last_row = models.PositiveIntegerField(_("Last Row"), default=0)
+    seconds = models.FloatField(_("Seconds"), default=0.0)
+
+    class Meta:
+        verbose_name = _("Import Checkpoint")
+        verbose_name_plural = _("Import Checkpoints")
+
+    def __str__(self):
+        return f"{self.source} (row {self.last_row})"
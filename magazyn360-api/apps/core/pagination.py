@@ -0,0 +1,247 @@
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections, models
+from django.db.models import Func, Value
+from django.db.models.lookups import GreaterThan, LessThan
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    LimitOffsetPagination,
+)
+from rest_framework.utils.urls import remove_query_param
+
+# Most rows a page holds, whichever pagination serves it.
+MAX_PAGE_SIZE = 500
+
+
+class Row(Func):
+    """Row constructor ``(a, b, ...)``, rows compare column by column."""
+
+    template = "(%(expressions)s)"
+    output_field = models.Field()
+
+
+class OffsetPagination(LimitOffsetPagination):
+    """``LimitOffsetPagination`` which can also load its page with the async ORM.
+
+    ``limit`` is capped like the keyset ``page_size``.
+    """
+
+    max_limit = MAX_PAGE_SIZE
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async counterpart of ``paginate_queryset``."""
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [row async for row in queryset[self.offset : self.offset + self.limit]]
+
+
+class KeysetPagination(CursorPagination):
+    """Cursor pagination keyed on ``(created_at, id)``.
+
+    Each page is selected with a row comparison against the last key seen, so
+    with a matching composite index deep pages cost the same as the first
+    one. Clients that need offsets opt in by passing ``limit`` or ``offset``.
+    Pages may hold model instances or ``values()`` rows including the key.
+
+    Attributes:
+        ordering: Key columns, all sorted in the same direction
+        offset_query_params: Query parameters switching to offset pagination
+        ranked_query_params: Query parameters ordering the results by rank,
+            which are paginated by offset in that order
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size_query_param = "page_size"
+    max_page_size = MAX_PAGE_SIZE
+    offset_query_params = {"limit", "offset"}
+    ranked_query_params = {"q"}
+    offset_pagination_class = OffsetPagination
+    position_separator = "|"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request)
+        if self.offset_pagination is not None:
+            return self.offset_pagination.paginate_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async counterpart of ``paginate_queryset``, loading the page with the
+        async ORM."""
+        queryset = self.get_page_queryset(queryset, request)
+        if self.offset_pagination is not None:
+            return await self.offset_pagination.apaginate_queryset(
+                queryset, request, view
+            )
+        if queryset is None:
+            return None
+        return self.set_page([row async for row in queryset])
+
+    def get_page_queryset(self, queryset, request):
+        """Returns the queryset selecting the requested page, without running it.
+
+        Offset paginated requests get the whole queryset in its final order, to
+        be paginated by ``self.offset_pagination``.
+        """
+        self.offset_pagination = None
+        params = request.query_params.keys()
+        if self.ranked_query_params & params:
+            # Ranked results keep their order, which has no keyset.
+            self.offset_pagination = self.offset_pagination_class()
+            return queryset
+        if self.offset_query_params & params:
+            self.offset_pagination = self.offset_pagination_class()
+            return queryset.order_by(*self.ordering)
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.cursor = self.decode_cursor(request)
+        self.position = self.decode_position(self.cursor)
+
+        ordering = self.ordering
+        if self.cursor and self.cursor.reverse:
+            ordering = [self._invert(field) for field in ordering]
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            queryset = queryset.filter(self._after(ordering, self.position))
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, results):
+        """Keeps the page out of the ``page_size + 1`` rows loaded and returns it."""
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if self.cursor and self.cursor.reverse:
+            self.page.reverse()
+            self.has_previous = has_more
+            self.has_next = True
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        if self.offset_pagination is not None:
+            return self.offset_pagination.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self):
+        if self.offset_pagination is not None:
+            return self.offset_pagination.get_html_context()
+        return super().get_html_context()
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Walked back past the newest row, the next page is the first one.
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        position = self._get_position_from_instance(self.page[-1], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            position = self.cursor.position
+        else:
+            position = self._get_position_from_instance(self.page[0], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def decode_position(self, cursor):
+        """Returns the key values encoded in the cursor position, if any."""
+        if cursor is None or cursor.position is None:
+            return None
+
+        values = cursor.position.split(self.position_separator)
+        fields = [field.lstrip("-") for field in self.ordering]
+        if len(values) != len(fields):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return [
+                self.model._meta.get_field(field).to_python(value)
+                for field, value in zip(fields, values, strict=True)
+            ]
+        except ValidationError as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip("-")
+            if isinstance(instance, dict):
+                value = instance[name]
+            else:
+                value = getattr(instance, name)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        return self.position_separator.join(str(value) for value in values)
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    def _after(self, ordering, position):
+        """Builds the row comparison selecting rows past ``position``, e.g.
+        ``(created_at, id) < (%s, %s)``."""
+        names = [field.lstrip("-") for field in ordering]
+        values = [
+            Value(value, output_field=self.model._meta.get_field(name))
+            for name, value in zip(names, position, strict=True)
+        ]
+        lookup = LessThan if ordering[0].startswith("-") else GreaterThan
+        return lookup(Row(*names), Row(*values))
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator counting large unfiltered tables from the planner statistics.
+
+    An exact ``COUNT(*)`` scans the whole table, unfiltered querysets of
+    tables with more than ``estimate_threshold`` rows use the ``reltuples``
+    estimate kept by ``ANALYZE`` instead.
+
+    Attributes:
+        estimate_threshold: Estimated rows above which the count is estimated
+    """
+
+    estimate_threshold = 100_000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is not None and not query.where and not query.distinct:
+            estimate = self.estimate_rows(self.object_list)
+            if estimate > self.estimate_threshold:
+                return estimate
+        return super().count
+
+    @staticmethod
+    def estimate_rows(queryset):
+        """Returns the planner's row estimate of the queryset's table, or -1."""
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return -1
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)",
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+        return int(row[0]) if row else -1
@@ -0,0 +1,51 @@
+"""Role permissions compiled from the apps' ``GROUP_MODEL_PERMISSIONS``."""
+
+import importlib
+
+from django.apps import apps
+
+from apps.core.cache import VersionedCache
+
+
+def iter_permission_configs():
+    """Yields ``(app_config, GROUP_MODEL_PERMISSIONS)`` for apps defining one."""
+    for app_config in apps.get_app_configs():
+        try:
+            permissions_module = importlib.import_module(
+                f"{app_config.name}.permissions_config"
+            )
+        except ModuleNotFoundError:
+            continue
+
+        model_perms = getattr(permissions_module, "GROUP_MODEL_PERMISSIONS", None)
+        if model_perms is not None:
+            yield app_config, model_perms
+
+
+def compile_permission_matrix():
+    """Returns the ``app_label.codename`` permissions granted to each role."""
+    matrix = {}
+    for app_config, model_perms in iter_permission_configs():
+        for model_name, group_map in model_perms.items():
+            try:
+                model = apps.get_model(app_config.label, model_name)
+            except LookupError:
+                continue
+
+            for role, actions in group_map.items():
+                matrix.setdefault(role, set()).update(
+                    f"{app_config.label}.{action}_{model._meta.model_name}"
+                    for action in actions
+                )
+    return {role: frozenset(perms) for role, perms in matrix.items()}
+
+
+# Bumped by the init_permissions command.
+permission_matrix = VersionedCache(
+    "core:permission-matrix:version", compile_permission_matrix
+)
+
+
+def role_has_perms(role, perms):
+    """Returns whether ``role`` is granted every permission in ``perms``."""
+    return permission_matrix.get().get(role, frozenset()).issuperset(perms)
@@ -1,14 +1,50 @@
-from rest_framework.permissions import BasePermission
+from rest_framework.permissions import BasePermission, DjangoModelPermissions
+
+from apps.core.permission_matrix import role_has_perms
+from apps.core.tenancy import get_company_id, is_unscoped
+
+
+class RoleModelPermissions(DjangoModelPermissions):
+    """
+    Model permissions answered from the compiled role permission matrix.
+
+    Permissions granted to the user's role are a dictionary lookup, anything
+    else falls back to the database backed check so per-user permissions and
+    superusers keep working.
+    """
+
+    def has_permission(self, request, view):
+        if not request.user or (
+            not request.user.is_authenticated and self.authenticated_users_only
+        ):
+            return False
+
+        # Workaround to ensure model permissions are not applied
+        # to the root view when using DefaultRouter.
+        if getattr(view, "_ignore_model_permissions", False):
+            return True
+
+        queryset = self._queryset(view)
+        perms = self.get_required_permissions(request.method, queryset.model)
+        user = request.user
+        if user.is_active and role_has_perms(user.role, perms):
+            return True
+        return user.has_perms(perms)
 
 
 class IsInUserCompany(BasePermission):
     """
     Allows access only to users who belong to the same company as the object.
+
+    Company ids are compared instead of instances, the field holding the
+    object's company id is taken from the view's ``tenant_field``.
     """
 
     def has_object_permission(self, request, view, obj):
-        return (
-            request.user.is_authenticated
-            and hasattr(request.user, "company")
-            and getattr(obj, "company", None) == request.user.company
-        )
+        if not request.user.is_authenticated:
+            return False
+        if is_unscoped(request):
+            return True
+        company_id = get_company_id(request)
+        tenant_field = getattr(view, "tenant_field", "company_id")
+        return company_id is not None and getattr(obj, tenant_field, None) == company_id
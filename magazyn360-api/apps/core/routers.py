@@ -0,0 +1,177 @@
+"""Routing of reads to the read replicas, see REPLICA_DATABASES in settings."""
+
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind the primary. It is not behind while it
+# streams from the primary and has replayed all it received (e.g. while the
+# primary is idle), or when it is no replica. Without a replayed transaction
+# (since the replica started) the lag is unknown, i.e. infinite.
+REPLICATION_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+            AND EXISTS (SELECT FROM pg_stat_wal_receiver WHERE status = 'streaming')
+        THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 'Infinity'
+        )
+    END
+"""
+
+
+@dataclass
+class RoutingState:
+    """Database routing of the current request.
+
+    Attributes:
+        use_replicas: Whether reads may use a replica
+        wrote: Whether the request used the primary for a write
+    """
+
+    use_replicas: bool = False
+    wrote: bool = False
+
+
+# Set by ReplicaRoutingMiddleware for the duration of a request.
+routing_state = ContextVar("routing_state", default=None)
+
+
+def measure_lag(alias):
+    """Returns the replication lag of ``alias`` in seconds, None if unreachable."""
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(REPLICATION_LAG_SQL)
+            (lag,) = cursor.fetchone()
+    except DatabaseError:
+        logger.warning("Replica %s is unreachable.", alias, exc_info=True)
+        connections[alias].close()
+        return None
+    return float(lag)
+
+
+class ReplicaMonitor:
+    """Replication lags of the replicas, measured at most every interval.
+
+    Measurements run in a thread of their own, requests use the last one and
+    never wait for a replica. Replicas lagging more than
+    ``REPLICA_MAX_LAG_SECONDS`` behind the primary, unreachable, not measured
+    yet or whose measurement takes longer than the interval are out of
+    rotation.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lags = {}
+        self._measured_at = {}
+        self._measurements = {}
+
+    def get_lag(self, alias):
+        """Returns the last measured lag of ``alias``, None if unknown, and
+        starts a measurement if one is due."""
+        now = time.monotonic()
+        interval = settings.REPLICA_LAG_CHECK_SECONDS
+        with self._lock:
+            measurement = self._measurements.get(alias)
+            started_at = self._measured_at.get(alias, float("-inf"))
+            if measurement is not None:
+                # A replica which does not answer within the interval is out.
+                return None if now - started_at > interval else self._lags.get(alias)
+            if now - started_at >= interval:
+                self._measured_at[alias] = now
+                measurement = threading.Thread(
+                    target=self.measure,
+                    args=(alias,),
+                    name=f"replica-lag-{alias}",
+                    daemon=True,
+                )
+                self._measurements[alias] = measurement
+                measurement.start()
+            return self._lags.get(alias)
+
+    def measure(self, alias):
+        """Measures the lag of ``alias``, then closes the connections of the
+        calling thread."""
+        lag = None
+        try:
+            lag = measure_lag(alias)
+        finally:
+            with self._lock:
+                was_available = self.is_lag_acceptable(self._lags.get(alias, 0))
+                self._lags[alias] = lag
+                del self._measurements[alias]
+            connections.close_all()
+        if was_available and not self.is_lag_acceptable(lag):
+            logger.warning("Replica %s is out of rotation, lag: %s", alias, lag)
+        elif not was_available and self.is_lag_acceptable(lag):
+            logger.info("Replica %s is back in rotation.", alias)
+
+    def wait(self):
+        """Waits for the measurements in progress."""
+        with self._lock:
+            measurements = list(self._measurements.values())
+        for measurement in measurements:
+            measurement.join()
+
+    @staticmethod
+    def is_lag_acceptable(lag):
+        return lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
+
+    def available(self):
+        """Returns the aliases of the replicas in rotation."""
+        return [
+            alias
+            for alias in settings.REPLICA_DATABASES
+            if self.is_lag_acceptable(self.get_lag(alias))
+        ]
+
+    def reset(self):
+        self.wait()
+        with self._lock:
+            self._lags.clear()
+            self._measured_at.clear()
+
+
+replica_monitor = ReplicaMonitor()
+
+
+class ReplicaRouter:
+    """Sends the reads of safe requests to a replica, everything else to default.
+
+    Once a request writes, its later reads use the primary too. Reads within
+    a transaction of the primary stay on it, reads outside requests are
+    routed as without the router.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = routing_state.get()
+        if state is None:
+            return None
+        if not state.use_replicas or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        replicas = replica_monitor.available()
+        if not replicas:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+        if state is not None:
+            state.use_replicas = False
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.REPLICA_DATABASES
@@ -0,0 +1,63 @@
+"""Trigram search over the ``UPPER(column)`` GIN indexes of the core models.
+
+Substring matches use ``icontains``, which PostgreSQL runs as
+``UPPER(column) LIKE UPPER('%term%')``, and typos are matched with word
+similarity (``UPPER(column) %> 'TERM'``). Both are served by a
+``gin_trgm_ops`` index on ``UPPER(column)`` declared with the model.
+"""
+
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import F, Q
+from django.db.models.functions import Greatest, Upper
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+# Shorter terms have no trigram to look up and would scan the table.
+MIN_TERM_LENGTH = 3
+
+
+def search_condition(fields, term):
+    """Returns the condition matching rows where any of ``fields`` contains
+    ``term`` or a word similar to it."""
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f"{field}__icontains": term})
+        condition |= TrigramWordSimilar(Upper(F(field)), term.upper())
+    return condition
+
+
+def search_rank(fields, term):
+    """Returns the expression ranking rows by their best matching field."""
+    similarities = [TrigramWordSimilarity(term.upper(), Upper(F(f))) for f in fields]
+    return Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+
+
+class TrigramSearchFilter(BaseFilterBackend):
+    """Filters the queryset with the ``?q=`` search term, best matches first.
+
+    Searches the view's ``search_fields``. Ranked results are paginated by
+    offset, see ``KeysetPagination.ranked_query_params``.
+    """
+
+    search_param = "q"
+
+    def filter_queryset(self, request, queryset, view):
+        fields = getattr(view, "search_fields", None)
+        term = request.query_params.get(self.search_param, "").strip()
+        if not fields or not term:
+            return queryset
+        if len(term) < MIN_TERM_LENGTH:
+            raise ValidationError(
+                {
+                    self.search_param: [
+                        f"Enter at least {MIN_TERM_LENGTH} characters to search."
+                    ]
+                }
+            )
+
+        return (
+            queryset.filter(search_condition(fields, term))
+            .alias(search_rank=search_rank(fields, term))
+            .order_by("-search_rank", "-created_at", "-id")
+        )
@@ -1,10 +1,197 @@
+import functools
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 
+from apps.core.enums import AddressTypes
 from apps.core.models import Address, Company, CustomUser
+from apps.core.tenancy import get_company_id
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """List serializer validating and writing a whole batch at once.
+
+    Unique field validators of the child run as one query for the batch
+    instead of one query per item and field, and objects are written with
+    batched INSERT or UPDATE statements in a single transaction. Errors are
+    reported per item, in input order.
+
+    For updates, pass the instances to change and give every item an ``id``.
+    """
+
+    batch_size = 500
+
+    def to_internal_value(self, data):
+        self._targets = []
+        self._defer_unique_validators()
+        validated = super().to_internal_value(data)
+
+        errors = [{} for _ in validated]
+        self.validate_unique_fields(validated, errors)
+        self.validate_batch(validated, errors)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return validated
+
+    def run_child_validation(self, data):
+        if self.instance is not None:
+            self.child.instance = self._get_target(data)
+        self._targets.append(self.child.instance)
+        return super().run_child_validation(data)
+
+    def validate_unique_fields(self, validated, errors):
+        """Checks unique fields against the batch and the database in one query."""
+        if not self.unique_fields:
+            return
+
+        fields = [field for field, _ in self.unique_fields.values()]
+        values = self.final_values(validated, fields)
+        conditions = Q()
+        for field in fields:
+            conditions |= Q(**{f"{field}__in": [item[field] for item in values]})
+        existing = {field: set() for field in fields}
+        rows = (
+            self.child.Meta.model.objects.filter(conditions)
+            .exclude(pk__in=[target.pk for target in self._targets if target])
+            .values_list(*existing)
+        )
+        for row in rows:
+            for field, value in zip(existing, row, strict=True):
+                existing[field].add(value)
+
+        for name, (field, message) in self.unique_fields.items():
+            for index, item in enumerate(values):
+                if item[field] in existing[field]:
+                    errors[index].setdefault(name, []).append(message)
+                existing[field].add(item[field])
+
+    def validate_batch(self, validated, errors):
+        """Hook for checks spanning the whole batch, add messages to ``errors``."""
+
+    def final_values(self, validated, fields):
+        """Returns the values of ``fields`` each item will have once written."""
+        return [
+            {field: attrs.get(field, getattr(target, field, None)) for field in fields}
+            for target, attrs in zip(self._targets, validated, strict=True)
+        ]
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        objs = [model(**attrs) for attrs in validated_data]
+        with transaction.atomic():
+            return model.objects.bulk_create(objs, batch_size=self.batch_size)
+
+    def update(self, instance, validated_data):
+        fields = {"updated_at"}
+        now = timezone.now()
+        for target, attrs in zip(self._targets, validated_data, strict=True):
+            for attr, value in attrs.items():
+                setattr(target, attr, value)
+            target.updated_at = now
+            fields.update(attrs)
+        with transaction.atomic():
+            self.child.Meta.model.objects.bulk_update(
+                self._targets, sorted(fields), batch_size=self.batch_size
+            )
+        return self._targets
+
+    def _defer_unique_validators(self):
+        self.unique_fields = {}
+        for name, field in self.child.fields.items():
+            unique = [v for v in field.validators if isinstance(v, UniqueValidator)]
+            if unique:
+                field.validators = [v for v in field.validators if v not in unique]
+                self.unique_fields[name] = (field.source, unique[0].message)
+
+    def _get_target(self, data):
+        if not hasattr(self, "_instances_by_id"):
+            self._instances_by_id = {str(obj.pk): obj for obj in self.instance}
+        pk = data.get("id") if isinstance(data, dict) else None
+        target = self._instances_by_id.get(str(pk))
+        if target is None:
+            raise serializers.ValidationError({"id": ["Object not found."]})
+        return target
+
+
+class CompiledReader:
+    """Builds a serializer's representation from ``values()`` rows.
+
+    Each readable field is compiled once into the lookup it reads and a
+    converter, so rows are neither turned into model instances nor passed
+    through per-field serializer machinery. The output is the same as the
+    serializer's. Fields reading computed values (``source="*"``, dotted
+    sources, method fields) need a lookup in the serializer's
+    ``compiled_lookups``.
+
+    Attributes:
+        lookups: Lookups to pass to ``values()``
+    """
+
+    # to_representation() returns the database value unchanged.
+    identity_fields = (
+        serializers.BooleanField,
+        serializers.CharField,
+        serializers.IntegerField,
+    )
+
+    def __init__(self, serializer_class, fields=None):
+        compiled_lookups = getattr(serializer_class, "compiled_lookups", {})
+        self.columns = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only or (fields is not None and name not in fields):
+                continue
+            lookup = compiled_lookups.get(name, field.source)
+            if lookup == "*" or "." in lookup:
+                raise ImproperlyConfigured(
+                    f"{serializer_class.__name__}.{name} needs a compiled lookup."
+                )
+            self.columns.append((name, lookup, self._get_converter(field)))
+        self.lookups = [lookup for _, lookup, _ in self.columns]
+
+    @classmethod
+    @functools.cache
+    def for_serializer(cls, serializer_class, fields=None):
+        """Returns the cached reader of ``serializer_class`` and frozenset ``fields``."""
+        return cls(serializer_class, fields)
+
+    def _get_converter(self, field):
+        if isinstance(field, serializers.SerializerMethodField):
+            return None
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            return None if field.pk_field is None else field.pk_field.to_representation
+        if (
+            isinstance(field, serializers.UUIDField)
+            and field.uuid_format == "hex_verbose"
+        ):
+            return str
+        if isinstance(field, serializers.ChoiceField) and not isinstance(
+            field, serializers.MultipleChoiceField
+        ):
+            if all(isinstance(key, str) for key in field.choices):
+                return None
+        if isinstance(field, self.identity_fields):
+            return None
+        return field.to_representation
+
+    def to_representation(self, row):
+        """Returns the representation of a ``values()`` row."""
+        return {
+            name: (
+                value
+                if (value := row[lookup]) is None or convert is None
+                else convert(value)
+            )
+            for name, lookup, convert in self.columns
+        }
 
 
 class UserListSerializer(serializers.ModelSerializer):
     company_name = serializers.SerializerMethodField()
+    compiled_lookups = {"company_name": "company__name"}
 
     class Meta:
         model = CustomUser
@@ -43,18 +230,22 @@ class UserCreateUpdateSerializer(serializers.ModelSerializer):
         password = validated_data.pop("password")
         user = CustomUser(**validated_data)
         user.set_password(password)
+        # The group is assigned by the post_save signal.
         user.save()
-        user.sync_group_with_role()
         return user
 
     def update(self, instance, validated_data):
         password = validated_data.pop("password", None)
+        role_changed = (
+            "role" in validated_data and validated_data["role"] != instance.role
+        )
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         if password:
             instance.set_password(password)
         instance.save()
-        instance.sync_group_with_role()
+        if role_changed:
+            instance.sync_group_with_role()
         return instance
 
 
@@ -73,6 +264,36 @@ class CompanySerializer(serializers.ModelSerializer):
             "owner",
         ]
         read_only_fields = ["id", "owner"]
+        list_serializer_class = BulkListSerializer
+
+
+class AddressListSerializer(BulkListSerializer):
+    def validate_batch(self, validated, errors):
+        """Enforces the ``unique_billing_address`` constraint with one query."""
+        company_id = get_company_id(self.context["request"])
+        values = self.final_values(validated, ["company_id", "type"])
+        billing = [
+            (index, item["company_id"] or company_id)
+            for index, item in enumerate(values)
+            if item["type"] == AddressTypes.BILLING
+        ]
+        if not billing:
+            return
+
+        taken = set(
+            Address.objects.filter(
+                type=AddressTypes.BILLING,
+                company_id__in={company for _, company in billing},
+            )
+            .exclude(pk__in=[target.pk for target in self._targets if target])
+            .values_list("company_id", flat=True)
+        )
+        for index, company in billing:
+            if company in taken:
+                errors[index].setdefault("type", []).append(
+                    "The company already has a billing address."
+                )
+            taken.add(company)
 
 
 class AddressSerializer(serializers.ModelSerializer):
@@ -89,3 +310,4 @@ class AddressSerializer(serializers.ModelSerializer):
             "country",
         ]
         read_only_fields = ["id", "company"]
+        list_serializer_class = AddressListSerializer
@@ -1,6 +1,12 @@
-from django.db.models.signals import post_save
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from apps.core.authentication import revoke_auth_stamp, update_auth_stamp
+from apps.core.groups import role_group_ids
+from apps.core.metrics import count_request_query
 from apps.core.models import CustomUser
 
 
@@ -8,3 +14,25 @@ from apps.core.models import CustomUser
 def assign_group_on_create(sender, instance: CustomUser, created, **kwargs):
     if created:
         instance.sync_group_with_role()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_role_group_ids(sender, **kwargs):
+    transaction.on_commit(role_group_ids.invalidate)
+
+
+@receiver(post_save, sender=CustomUser)
+def refresh_auth_stamp(sender, instance: CustomUser, **kwargs):
+    update_auth_stamp(instance)
+
+
+@receiver(post_delete, sender=CustomUser)
+def revoke_deleted_user_tokens(sender, instance: CustomUser, **kwargs):
+    revoke_auth_stamp(instance.pk)
+
+
+@receiver(connection_created)
+def count_request_queries(sender, connection, **kwargs):
+    if count_request_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_request_query)
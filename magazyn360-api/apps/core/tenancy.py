@@ -0,0 +1,58 @@
+"""Resolution of the company (tenant) a request acts on behalf of."""
+
+_COMPANY_ID_ATTR = "_tenant_company_id"
+
+
+def _http_request(request):
+    # DRF requests wrap the Django request, cache on the latter so the value is
+    # shared by middleware and every view handling the request.
+    return getattr(request, "_request", request)
+
+
+def get_company_id(request):
+    """Returns the company id of the requesting user, resolved once per request."""
+    http_request = _http_request(request)
+    try:
+        return getattr(http_request, _COMPANY_ID_ATTR)
+    except AttributeError:
+        company_id = getattr(request.user, "company_id", None)
+        setattr(http_request, _COMPANY_ID_ATTR, company_id)
+        return company_id
+
+
+def is_unscoped(request):
+    """Returns whether the request may access the data of every company."""
+    return bool(request.user.is_superuser)
+
+
+def scope_queryset(queryset, request, tenant_field="company_id"):
+    """Limits the queryset to rows of the requesting user's company.
+
+    Args:
+        queryset: Queryset to scope
+        request: Current request
+        tenant_field: Field holding the company id of a row
+    """
+    if is_unscoped(request):
+        return queryset
+    company_id = get_company_id(request)
+    if company_id is None:
+        return queryset.none()
+    return queryset.filter(**{tenant_field: company_id})
+
+
+class TenantScopedMixin:
+    """Scopes the view queryset to the requesting user's company.
+
+    Attributes:
+        tenant_field: Field holding the company id of a row, also used by
+            ``IsInUserCompany`` for object checks
+    """
+
+    tenant_field = "company_id"
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            # Schema generation (apps.core.docs) has no request to scope by.
+            return super().get_queryset().none()
+        return scope_queryset(super().get_queryset(), self.request, self.tenant_field)
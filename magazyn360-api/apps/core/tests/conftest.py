@@ -1,12 +1,28 @@
 from unittest.mock import Mock
 
 import pytest
+from django.contrib.auth.models import Permission
+from rest_framework.test import APIClient
 
-from apps.core.enums import AddressTypes, Countries
+from apps.core.enums import AddressTypes, Countries, Role
+from apps.core.groups import role_group_ids
 from apps.core.models import Address, Company, CustomUser
 from apps.core.permissions import IsInUserCompany
 
 
+@pytest.fixture(autouse=True)
+def reset_role_group_ids():
+    yield
+    # Groups cached during a test are rolled back with it.
+    role_group_ids.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def no_replicas(settings):
+    # A replica configured in .env does not replicate the test database.
+    settings.REPLICA_DATABASES = []
+
+
 @pytest.fixture
 def permission():
     return IsInUserCompany()
@@ -14,14 +30,14 @@ def permission():
 
 @pytest.fixture
 def mock_request():
-    request = Mock()
-    request.user = Mock()
+    request = Mock(spec=["user"])
+    request.user = Mock(is_superuser=False)
     return request
 
 
 @pytest.fixture
 def mock_view():
-    return Mock()
+    return Mock(tenant_field="company_id")
 
 
 @pytest.fixture
@@ -66,3 +82,36 @@ def office_address(company):
         postal_code="00-000",
         country=Countries.POLAND,
     )
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def tenant_user(company):
+    return CustomUser.objects.create(
+        username="manager",
+        email="manager@company.com",
+        role=Role.MANAGER,
+        company=company,
+    )
+
+
+@pytest.fixture
+def tenant_client(api_client, tenant_user):
+    """API client authenticated as ``tenant_user``."""
+    api_client.force_authenticate(tenant_user)
+    return api_client
+
+
+@pytest.fixture
+def grant():
+    def grant_permissions(user, *codenames):
+        user.user_permissions.add(*Permission.objects.filter(codename__in=codenames))
+        # Drop the permission cache of the in-memory user.
+        for attr in ("_perm_cache", "_user_perm_cache", "_group_perm_cache"):
+            user.__dict__.pop(attr, None)
+
+    return grant_permissions
@@ -1,10 +1,14 @@
 from unittest.mock import Mock, patch
 
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
 from apps.core.admin import CompanyAdmin, CustomUserAdmin
-from apps.core.models import Company, CustomUser
+from apps.core.enums import AddressTypes
+from apps.core.models import Address, Company, CustomUser
 
 
 class TestCustomUserAdmin(TestCase):
@@ -27,7 +31,7 @@ class TestCustomUserAdmin(TestCase):
         mock_sync.assert_called_once()
 
     @patch("apps.core.models.CustomUser.save")
-    def test_save_related_calls_save(self, mock_save):
+    def test_save_related_does_not_save_again(self, mock_save):
         form = Mock()
         form.instance = self.user
         formsets = []
@@ -35,7 +39,16 @@ class TestCustomUserAdmin(TestCase):
 
         self.user_admin.save_related(self.request, form, formsets, change)
 
-        mock_save.assert_called_once()
+        mock_save.assert_not_called()
+
+    @patch("apps.core.models.CustomUser.sync_group_with_role")
+    def test_save_related_skips_sync_for_new_users(self, mock_sync):
+        form = Mock()
+        form.instance = self.user
+
+        self.user_admin.save_related(self.request, form, [], False)
+
+        mock_sync.assert_not_called()
 
     @patch("django.contrib.auth.admin.UserAdmin.save_related")
     def test_save_related_calls_super(self, mock_super):
@@ -68,3 +81,44 @@ class TestCompanyAdmin(TestCase):
 
         result = self.company_admin.primary_address_city(mock_company)
         self.assertIsNone(result)
+
+    def test_changelist_query_count_does_not_grow_with_rows(self):
+        admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="password"
+        )
+        self.client.force_login(admin)
+
+        def create_companies(start, stop):
+            for i in range(start, stop):
+                company = Company.objects.create(
+                    name=f"Company {i}",
+                    tax_id=f"{i:010d}",
+                    statistical_number="123456789",
+                    national_court_register=f"{i:010d}",
+                    email=f"company{i}@test.com",
+                    phone="123456789",
+                    owner=get_user_model().objects.create(
+                        username=f"owner{i}", email=f"owner{i}@test.com"
+                    ),
+                )
+                Address.objects.create(
+                    company=company,
+                    type=AddressTypes.OFFICE,
+                    name=f"Office {i}",
+                    street="Test Street",
+                    city=f"City {i}",
+                    postal_code="00-000",
+                )
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(reverse("admin:core_company_changelist"))
+            self.assertEqual(response.status_code, 200)
+            return len(context)
+
+        create_companies(0, 1)
+        few = count_queries()
+        create_companies(1, 10)
+        many = count_queries()
+
+        self.assertEqual(few, many)
@@ -0,0 +1,172 @@
+import pytest
+from django.contrib.admin.sites import site
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.core.admin_filters import CompanyInputFilter, InputFilter
+from apps.core.enums import AddressTypes, Countries
+from apps.core.models import Address, Company, CustomUser
+from apps.core.pagination import EstimatedCountPaginator
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def client(client, owner):
+    owner.is_superuser = owner.is_staff = True
+    owner.save()
+    client.force_login(owner)
+    return client
+
+
+@pytest.fixture
+def other_company(owner):
+    company = Company.objects.create(
+        name="Other Company",
+        tax_id="0987654321",
+        statistical_number="123456789",
+        national_court_register="0000654321",
+        email="other@company.com",
+        phone="123456789",
+        owner=owner,
+    )
+    Address.objects.create(
+        company=company,
+        type=AddressTypes.WAREHOUSE,
+        name="Warehouse",
+        street="Test Street 3",
+        city="Krakow",
+        postal_code="00-000",
+        country=Countries.GERMANY,
+    )
+    return company
+
+
+def results(response):
+    return list(response.context["cl"].result_list)
+
+
+@pytest.mark.django_db
+class TestChangelistFilters:
+    def test_addresses_are_filtered_by_city_text(
+        self, client, billing_address, other_company
+    ):
+        url = reverse("admin:core_address_changelist")
+
+        response = client.get(url, {"city": "krak"})
+
+        assert response.status_code == 200
+        assert [a.city for a in results(response)] == ["Krakow"]
+        assert 'name="city" value="krak"' in response.content.decode()
+
+    def test_users_are_filtered_by_company_name_or_id(
+        self, client, tenant_user, other_company
+    ):
+        url = reverse("admin:core_customuser_changelist")
+
+        by_name = client.get(url, {"company": "test comp"})
+        by_id = client.get(url, {"company": str(tenant_user.company_id)})
+
+        assert results(by_name) == [tenant_user]
+        assert results(by_id) == [tenant_user]
+
+    def test_company_name_is_matched_in_a_subquery(self, tenant_user):
+        request = RequestFactory().get("/")
+        model_admin = site._registry[CustomUser]
+        company_filter = CompanyInputFilter(
+            request, {"company": ["test comp"]}, CustomUser, model_admin
+        )
+
+        queryset = company_filter.queryset(request, CustomUser.objects.all())
+
+        assert list(queryset) == [tenant_user]
+        assert "JOIN" not in str(queryset.query)
+
+    def test_input_filters_must_implement_filter(self):
+        class NameFilter(InputFilter):
+            title = "name"
+            parameter_name = "name"
+
+        request = RequestFactory().get("/")
+        name_filter = NameFilter(
+            request, {"name": ["x"]}, CustomUser, site._registry[CustomUser]
+        )
+
+        with pytest.raises(NotImplementedError):
+            name_filter.queryset(request, CustomUser.objects.all())
+
+    def test_companies_are_filtered_by_address_without_duplicates(
+        self, client, company, billing_address, office_address, other_company
+    ):
+        url = reverse("admin:core_company_changelist")
+
+        by_city = client.get(url, {"address_city": "test city"})
+        by_country = client.get(url, {"address_country": Countries.GERMANY})
+
+        assert results(by_city) == [company]
+        assert results(by_country) == [other_company]
+
+    def test_choice_counts_are_cached(self, client, billing_address, office_address):
+        url = reverse("admin:core_address_changelist")
+
+        client.get(url)
+        Address.objects.filter(pk=office_address.pk).update(type=AddressTypes.SHIPPING)
+        response = client.get(url)
+
+        content = response.content.decode()
+        assert "Office (1)" in content
+        assert "Shipping (0)" in content
+
+    def test_sidebar_queries_do_not_grow_with_companies(self, client, owner):
+        url = reverse("admin:core_address_changelist")
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as context:
+                assert client.get(url).status_code == 200
+            return len(context)
+
+        few = count_queries()
+        for i in range(5):
+            CustomUser.objects.create(
+                username=f"user{i}", email=f"user{i}@test.com", company=None
+            )
+            Company.objects.create(
+                name=f"Company {i}",
+                tax_id=f"{i:010d}",
+                statistical_number="123456789",
+                national_court_register=f"{i:010d}",
+                email=f"company{i}@test.com",
+                phone="123456789",
+                owner=owner,
+            )
+        cache.clear()
+
+        assert count_queries() == few
+
+
+@pytest.mark.django_db
+class TestEstimatedCountPaginator:
+    def test_large_unfiltered_tables_are_estimated(self, monkeypatch, company):
+        monkeypatch.setattr(
+            EstimatedCountPaginator, "estimate_rows", staticmethod(lambda qs: 10**6)
+        )
+
+        assert EstimatedCountPaginator(Company.objects.all(), 10).count == 10**6
+        assert (
+            EstimatedCountPaginator(Company.objects.filter(pk=company.pk), 10).count
+            == 1
+        )
+
+    def test_small_tables_are_counted(self, company):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE core_company")
+
+        assert EstimatedCountPaginator(Company.objects.all(), 10).count == 1
@@ -0,0 +1,223 @@
+import asyncio
+import io
+import re
+import sys
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import path, reverse
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.core.authentication import ClaimsTokenObtainPairSerializer
+from apps.core.pagination import KeysetPagination
+from apps.core.views import AddressViewSet, CompanyViewSet, MeView, UserViewSet
+
+VIEWSETS = {"user": UserViewSet, "address": AddressViewSet, "company": CompanyViewSet}
+LIST = {"get": "list", "post": "create"}
+DETAIL = {"get": "retrieve", "patch": "partial_update"}
+
+
+def async_view(view_class, actions=None, **initkwargs):
+    with override_settings(ASYNC_READS=True):
+        if actions:
+            view = view_class.as_view(actions, **initkwargs)
+        else:
+            view = view_class.as_view(**initkwargs)
+    assert iscoroutinefunction(view)
+    return view
+
+
+def call(view, user, method, url, data=None, headers=None, **kwargs):
+    request = getattr(APIRequestFactory(), method)(
+        url, data, format="json" if method != "get" else None, headers=headers
+    )
+    if user is not None:
+        force_authenticate(request, user)
+    response = async_to_sync(view)(request, **kwargs)
+    return response.render() if hasattr(response, "render") else response
+
+
+@pytest.fixture
+def user(owner, company, billing_address, office_address):
+    owner.is_superuser = True
+    owner.save()
+    return owner
+
+
+@pytest.fixture
+def client(api_client, user):
+    api_client.force_authenticate(user)
+    return api_client
+
+
+@pytest.mark.django_db
+class TestAsyncReads:
+    @pytest.mark.parametrize("basename", ["user", "address", "company"])
+    @pytest.mark.parametrize("params", [{}, {"limit": 1}, {"fields": "id"}])
+    def test_list_matches_the_sync_view(self, client, user, basename, params):
+        url = reverse(f"{basename}-list")
+        view = async_view(VIEWSETS[basename], LIST)
+
+        expected = client.get(url, params)
+        response = call(view, user, "get", url, params)
+
+        assert response.status_code == 200
+        assert response.content == expected.content
+        assert response["ETag"] == expected["ETag"]
+
+    def test_cursor_pages_match_the_sync_view(self, client, user):
+        url = reverse("address-list")
+        view = async_view(AddressViewSet, LIST)
+        first = client.get(url, {"page_size": 1})
+
+        expected = client.get(first.data["next"])
+        response = call(view, user, "get", first.data["next"])
+
+        assert response.content == expected.content
+
+    def test_unpaginated_list_matches_the_sync_view(self, client, user, monkeypatch):
+        # API_PAGE_SIZE=0 turns the pagination off.
+        monkeypatch.setattr(KeysetPagination, "page_size", 0)
+        url = reverse("address-list")
+        view = async_view(AddressViewSet, LIST)
+
+        expected = client.get(url)
+        response = call(view, user, "get", url)
+
+        assert isinstance(expected.data, list)
+        assert response.content == expected.content
+
+    def test_retrieve_matches_the_sync_view(self, client, user, billing_address):
+        url = reverse("address-detail", args=[billing_address.pk])
+        view = async_view(AddressViewSet, DETAIL)
+
+        expected = client.get(url)
+        response = call(view, user, "get", url, pk=str(billing_address.pk))
+
+        assert response.content == expected.content
+
+    def test_me_matches_the_sync_view(self, client, user):
+        url = reverse("me")
+
+        expected = client.get(url)
+        response = call(async_view(MeView), user, "get", url)
+
+        assert response.content == expected.content
+
+    def test_unchanged_list_is_not_modified(self, user):
+        url = reverse("company-list")
+        view = async_view(CompanyViewSet, LIST)
+        etag = call(view, user, "get", url)["ETag"]
+
+        response = call(view, user, "get", url, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+
+    def test_other_tenant_and_malformed_ids_are_not_found(self, tenant_user, owner):
+        url = reverse("user-detail", args=[owner.pk])
+        view = async_view(UserViewSet, DETAIL)
+
+        assert call(view, tenant_user, "get", url, pk=str(owner.pk)).status_code == 404
+        assert call(view, tenant_user, "get", url, pk="x").status_code == 404
+
+    def test_anonymous_requests_are_rejected(self):
+        view = async_view(CompanyViewSet, LIST)
+
+        assert call(view, None, "get", reverse("company-list")).status_code == 401
+
+    def test_writes_run_in_a_thread(self, user, billing_address):
+        url = reverse("address-detail", args=[billing_address.pk])
+        view = async_view(AddressViewSet, DETAIL)
+
+        response = call(
+            view, user, "patch", url, {"city": "Gdansk"}, pk=str(billing_address.pk)
+        )
+
+        assert response.status_code == 200
+        billing_address.refresh_from_db()
+        assert billing_address.city == "Gdansk"
+
+
+def asgi_get(path, headers):
+    """Runs a GET request through the ASGI handler, returns the sent messages."""
+    messages = []
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("127.0.0.1", 1024),
+        "server": ("testserver", 80),
+    }
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        # The client stays connected until the response is sent.
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    async_to_sync(ASGIHandler())(scope, receive, send)
+    return messages
+
+
+@pytest.mark.django_db(transaction=True)
+def test_export_streams_through_the_asgi_handler(
+    settings, monkeypatch, recwarn, tenant_user, billing_address, office_address
+):
+    view = async_view(
+        AddressViewSet,
+        {"get": "export"},
+        basename="address",
+        detail=False,
+        **AddressViewSet.export.kwargs,
+    )
+    monkeypatch.setattr(
+        sys.modules[__name__], "urlpatterns", [path("export/", view)], raising=False
+    )
+    settings.ROOT_URLCONF = __name__
+    monkeypatch.setattr(AddressViewSet, "export_chunk_size", 1)
+    token = ClaimsTokenObtainPairSerializer.get_token(tenant_user).access_token
+
+    messages = asgi_get("/export/", {"Authorization": f"Bearer {token}"})
+
+    assert messages[0]["status"] == 200
+    bodies = [message["body"] for message in messages[1:] if message.get("body")]
+    assert len(bodies) == 2
+    assert str(billing_address.pk).encode() in bodies[0]
+    assert str(office_address.pk).encode() in bodies[1]
+    # Sync iterators would be consumed entirely before the first byte is sent.
+    assert not [w for w in recwarn if "synchronous iterators" in str(w.message)]
+
+
+def test_views_are_sync_by_default():
+    assert not iscoroutinefunction(CompanyViewSet.as_view(LIST))
+    assert not iscoroutinefunction(MeView.as_view())
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_load_command(live_server, owner):
+    out = io.StringIO()
+
+    call_command(
+        "benchmark_load",
+        live_server.url,
+        username=owner.username,
+        requests=4,
+        concurrency=2,
+        stdout=out,
+    )
+
+    assert re.search(r"errors\s+0\n", out.getvalue())
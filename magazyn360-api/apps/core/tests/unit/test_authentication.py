@@ -0,0 +1,124 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.core.authentication import ClaimsUser, add_user_claims
+from apps.core.enums import Role
+
+PASSWORD = "s3cret-Passw0rd"
+
+
+@pytest.fixture
+def login(api_client, tenant_user):
+    tenant_user.set_password(PASSWORD)
+    tenant_user.save()
+
+    def obtain_tokens():
+        response = api_client.post(
+            reverse("token_obtain_pair"),
+            {"username": tenant_user.username, "password": PASSWORD},
+        )
+        assert response.status_code == 200
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        return response.data
+
+    return obtain_tokens
+
+
+@pytest.mark.django_db
+def test_access_token_carries_user_claims(login, tenant_user):
+    tokens = login()
+
+    claims = AccessToken(tokens["access"])
+    assert claims["role"] == Role.MANAGER
+    assert claims["company_id"] == str(tenant_user.company_id)
+    assert claims["is_superuser"] is False
+    assert claims["stamp"]
+
+
+@pytest.mark.django_db
+def test_authenticated_request_skips_user_query(
+    api_client, login, tenant_user, billing_address
+):
+    login()
+    api_client.get(reverse("address-list"))  # Warm up permission caches.
+
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.get(reverse("address-list"))
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.data["results"]] == [
+        str(billing_address.pk)
+    ]
+    assert not any('"core_customuser"' in q["sql"] for q in context.captured_queries)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda user: setattr(user, "is_active", False),
+        lambda user: user.set_password("an0ther-Passw0rd"),
+        lambda user: setattr(user, "role", Role.VIEWER),
+    ],
+    ids=["deactivated", "password", "role"],
+)
+def test_changing_user_revokes_token(api_client, login, tenant_user, change):
+    login()
+    change(tenant_user)
+    tenant_user.save()
+
+    response = api_client.get(reverse("address-list"))
+
+    assert response.status_code == 401
+    assert response.data["code"] == "token_revoked"
+
+
+@pytest.mark.django_db
+def test_deleting_user_revokes_token(api_client, login, tenant_user):
+    login()
+    tenant_user.delete()
+
+    assert api_client.get(reverse("address-list")).status_code == 401
+
+
+@pytest.mark.django_db
+def test_token_stamped_while_inactive_is_rejected(api_client, tenant_user):
+    tenant_user.is_active = False
+    tenant_user.save()
+    token = add_user_claims(AccessToken.for_user(tenant_user), tenant_user)
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    response = api_client.get(reverse("address-list"))
+
+    assert response.status_code == 401
+    assert response.data["code"] == "token_revoked"
+
+
+@pytest.mark.django_db
+def test_refresh_restamps_claims(api_client, login, tenant_user):
+    tokens = login()
+    tenant_user.role = Role.VIEWER
+    tenant_user.save()
+
+    response = api_client.post(reverse("token_refresh"), {"refresh": tokens["refresh"]})
+
+    assert response.status_code == 200
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+    assert api_client.get(reverse("address-list")).status_code == 200
+
+
+@pytest.mark.django_db
+def test_claims_user_loads_row_lazily(login, tenant_user, django_assert_num_queries):
+    user = ClaimsUser(AccessToken(login()["access"]))
+
+    with django_assert_num_queries(0):
+        assert user.pk == tenant_user.pk
+        assert user.company_id == tenant_user.company_id
+        assert user.role == Role.MANAGER
+    with django_assert_num_queries(1):
+        assert user.email == tenant_user.email
+        assert user.username == tenant_user.username
+    assert user == tenant_user
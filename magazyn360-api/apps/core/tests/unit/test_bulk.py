@@ -0,0 +1,155 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.core.enums import AddressTypes
+from apps.core.models import Address, Company
+from apps.core.validators import NIPValidator
+
+
+def address_payload(name, type=AddressTypes.WAREHOUSE):
+    return {
+        "type": type,
+        "name": name,
+        "street": "Test Street",
+        "city": "Test City",
+        "postal_code": "00-000",
+    }
+
+
+def nip(index):
+    digits = f"1{index:08d}"
+    return f"{digits}{NIPValidator().check_digit(digits)}"
+
+
+def company_payload(index):
+    return {
+        "name": f"Company {index}",
+        "tax_id": nip(index),
+        "statistical_number": "123456785",
+        "national_court_register": f"{index:010d}",
+        "email": f"company{index}@test.com",
+        "phone": "+48123456789",
+    }
+
+
+@pytest.fixture
+def bulk_client(tenant_client, tenant_user, grant):
+    grant(tenant_user, "add_address", "change_address", "add_company")
+    return tenant_client
+
+
+@pytest.mark.django_db
+def test_bulk_create_addresses_in_constant_queries(bulk_client, company):
+    url = reverse("address-bulk")
+    bulk_client.post(url, [address_payload("Warm up")], format="json")
+    with CaptureQueriesContext(connection) as few:
+        bulk_client.post(url, [address_payload("A")], format="json")
+    with CaptureQueriesContext(connection) as many:
+        response = bulk_client.post(
+            url, [address_payload(f"B{i}") for i in range(50)], format="json"
+        )
+
+    assert response.status_code == 201
+    assert len(response.json()) == 50
+    assert company.addresses.count() == 52
+    assert len(few) == len(many)
+
+
+@pytest.mark.django_db
+def test_bulk_create_reports_billing_conflicts_per_item(
+    bulk_client, company, billing_address
+):
+    response = bulk_client.post(
+        reverse("address-bulk"),
+        [
+            address_payload("Warehouse"),
+            address_payload("Billing", AddressTypes.BILLING),
+            {"name": "Incomplete"},
+        ],
+        format="json",
+    )
+
+    assert response.status_code == 400
+    errors = response.json()
+    assert errors[0] == {}
+    assert "street" in errors[2]
+    assert company.addresses.count() == 1
+
+
+@pytest.mark.django_db
+def test_bulk_create_rejects_duplicate_billing_in_batch(bulk_client, company):
+    response = bulk_client.post(
+        reverse("address-bulk"),
+        [
+            address_payload("First", AddressTypes.BILLING),
+            address_payload("Second", AddressTypes.BILLING),
+        ],
+        format="json",
+    )
+
+    assert response.status_code == 400
+    assert response.json() == [
+        {},
+        {"type": ["The company already has a billing address."]},
+    ]
+
+
+@pytest.mark.django_db
+def test_bulk_update_addresses(bulk_client, company, billing_address, office_address):
+    response = bulk_client.patch(
+        reverse("address-bulk"),
+        [
+            {"id": str(billing_address.pk), "city": "Gdansk"},
+            {"id": str(office_address.pk), "name": "HQ"},
+        ],
+        format="json",
+    )
+
+    assert response.status_code == 200
+    billing_address.refresh_from_db()
+    office_address.refresh_from_db()
+    assert billing_address.city == "Gdansk"
+    assert office_address.name == "HQ"
+    assert office_address.updated_at > office_address.created_at
+
+
+@pytest.mark.django_db
+def test_bulk_update_unknown_id(bulk_client, billing_address):
+    response = bulk_client.patch(
+        reverse("address-bulk"),
+        [{"id": "00000000-0000-0000-0000-000000000000", "city": "Gdansk"}],
+        format="json",
+    )
+
+    assert response.status_code == 400
+    assert response.json() == [{"id": ["Object not found."]}]
+
+
+@pytest.mark.django_db
+def test_bulk_create_companies_checks_uniqueness_once(bulk_client, company):
+    payload = [company_payload(1), company_payload(2), company_payload(1)]
+    payload[1]["email"] = company.email
+
+    response = bulk_client.post(reverse("company-bulk"), payload, format="json")
+
+    assert response.status_code == 400
+    errors = response.json()
+    assert errors[0] == {}
+    assert list(errors[1]) == ["email"]
+    assert set(errors[2]) == {"tax_id", "national_court_register", "email"}
+    assert Company.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_bulk_create_companies(bulk_client, tenant_user):
+    response = bulk_client.post(
+        reverse("company-bulk"),
+        [company_payload(1), company_payload(2)],
+        format="json",
+    )
+
+    assert response.status_code == 201
+    assert Company.objects.filter(owner=tenant_user).count() == 2
+    assert not Address.objects.exists()
@@ -0,0 +1,84 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import serializers
+
+from apps.core.models import CustomUser
+from apps.core.serializers import CompiledReader
+from apps.core.views import AddressViewSet, CompanyViewSet, UserViewSet
+
+VIEWSETS = {"user": UserViewSet, "address": AddressViewSet, "company": CompanyViewSet}
+
+
+def get_both(client, monkeypatch, basename, url, params=None):
+    responses = []
+    for compiled in (False, True):
+        monkeypatch.setattr(VIEWSETS[basename], "compiled_reads", compiled)
+        responses.append(client.get(url, params))
+    return responses
+
+
+@pytest.fixture
+def client(api_client, owner, company, billing_address, office_address):
+    owner.is_superuser = True
+    owner.save()
+    api_client.force_authenticate(owner)
+    return api_client
+
+
+@pytest.mark.django_db
+class TestCompiledReads:
+    @pytest.mark.parametrize("basename", ["user", "address", "company"])
+    def test_list_output_is_identical(self, client, monkeypatch, basename):
+        url = reverse(f"{basename}-list")
+
+        plain, compiled = get_both(client, monkeypatch, basename, url)
+
+        assert compiled.status_code == 200
+        assert compiled.content == plain.content
+
+    def test_null_values_are_identical(self, client, monkeypatch, owner):
+        # The owner has no company, its company_name is null.
+        url = reverse("user-detail", args=[owner.pk])
+
+        plain, compiled = get_both(client, monkeypatch, "user", url)
+
+        assert compiled.data["company_name"] is None
+        assert compiled.content == plain.content
+
+    def test_sparse_pages_are_identical(self, client, monkeypatch):
+        url = reverse("address-list")
+        params = {"fields": "id,company,type", "page_size": 1}
+
+        plain, compiled = get_both(client, monkeypatch, "address", url, params)
+
+        assert compiled.content == plain.content
+        assert client.get(compiled.data["next"]).status_code == 200
+
+    def test_other_tenant_object_is_not_found(self, api_client, tenant_user, owner):
+        api_client.force_authenticate(tenant_user)
+
+        url = reverse("user-detail", args=[owner.pk])
+
+        assert api_client.get(url).status_code == 404
+        assert api_client.get(reverse("user-detail", args=["x"])).status_code == 404
+
+
+def test_computed_fields_need_a_compiled_lookup():
+    class Serializer(serializers.ModelSerializer):
+        label = serializers.SerializerMethodField()
+
+        class Meta:
+            model = CustomUser
+            fields = ("id", "label")
+
+    with pytest.raises(ImproperlyConfigured):
+        CompiledReader(Serializer)
+
+
+@pytest.mark.django_db
+def test_benchmark_reads_command():
+    call_command("benchmark_reads", rows=20, repeat=1)
+
+    assert not CustomUser.objects.filter(username__startswith="bench-").exists()
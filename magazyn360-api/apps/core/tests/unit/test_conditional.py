@@ -0,0 +1,91 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+
+
+def revalidate(client, url, **headers):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, **headers)
+    return response, len(context)
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    def test_unchanged_list_is_not_modified(self, tenant_client, billing_address):
+        url = reverse("address-list")
+        etag = tenant_client.get(url)["ETag"]
+
+        response, queries = revalidate(tenant_client, url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+        assert not response.content
+        assert queries == 1
+
+    def test_changed_row_invalidates_list(self, tenant_client, billing_address):
+        url = reverse("address-list")
+        etag = tenant_client.get(url)["ETag"]
+        billing_address.name = "Renamed"
+        billing_address.save()
+
+        response, _ = revalidate(tenant_client, url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_deleted_row_invalidates_list(
+        self, tenant_client, billing_address, office_address
+    ):
+        url = reverse("address-list")
+        etag = tenant_client.get(url)["ETag"]
+        billing_address.delete()
+
+        assert tenant_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_etag_depends_on_query_string(self, tenant_client, billing_address):
+        url = reverse("address-list")
+
+        assert (
+            tenant_client.get(url)["ETag"]
+            != tenant_client.get(url, {"page_size": 1})["ETag"]
+        )
+
+    def test_retrieve_is_revalidated_by_etag(self, tenant_client, billing_address):
+        url = reverse("address-detail", args=[billing_address.pk])
+        etag = tenant_client.get(url)["ETag"]
+
+        response, queries = revalidate(tenant_client, url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert queries == 1
+
+    def test_if_modified_since_is_ignored(self, tenant_client, billing_address):
+        # Last-Modified has whole seconds, an update in the second of the
+        # previous read would be missed.
+        url = reverse("address-detail", args=[billing_address.pk])
+        response = tenant_client.get(url)
+        billing_address.name = "Renamed"
+        billing_address.save()
+
+        assert "Last-Modified" not in response
+        response = tenant_client.get(url, HTTP_IF_MODIFIED_SINCE=http_date())
+        assert response.status_code == 200
+        assert response.json()["name"] == "Renamed"
+
+    def test_missing_object_is_not_found(self, tenant_client, company):
+        url = reverse("address-detail", args=[company.pk])
+
+        assert tenant_client.get(url, HTTP_IF_NONE_MATCH="*").status_code == 404
+
+    def test_me_tracks_company_changes(self, tenant_client, company):
+        url = reverse("me")
+        etag = tenant_client.get(url)["ETag"]
+
+        assert tenant_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        company.name = "Renamed Company"
+        company.save()
+
+        assert tenant_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
@@ -0,0 +1,53 @@
+import io
+import re
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from apps.core.db import close_pools, get_pool, pool_stats
+
+
+def test_default_database_is_pooled(settings):
+    pool = get_pool("default")
+
+    assert pool is not None
+    assert pool.max_size == settings.DATABASES["default"]["OPTIONS"]["pool"]["max_size"]
+    assert pool._check is not None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_released_connections_return_to_the_pool():
+    close_pools()
+
+    for _ in range(3):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        connection.close()
+
+    stats = pool_stats()["default"]
+    assert stats["checkouts"] == 3
+    assert stats["opened"] == stats["size"]
+    assert stats["timeouts"] == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_close_pools_closes_connections():
+    connection.ensure_connection()
+    pool = get_pool("default")
+
+    close_pools()
+
+    assert connection.connection is None
+    assert pool.closed
+    assert get_pool("default") is not pool
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_connections_command():
+    out = io.StringIO()
+
+    call_command("benchmark_connections", requests=20, threads=2, stdout=out)
+
+    assert re.search(r"checkouts\s+20\n", out.getvalue())
+    assert re.search(r"timeouts\s+0\n", out.getvalue())
@@ -0,0 +1,120 @@
+import io
+import json
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.urls import reverse
+
+from apps.core import docs
+
+
+@pytest.fixture(autouse=True)
+def schema(settings, tmp_path, monkeypatch):
+    settings.OPENAPI_SCHEMA_DIR = tmp_path
+    settings.BUILD_VERSION = "1.2.0"
+    generations = []
+
+    def generate():
+        generations.append(1)
+        return generate_schemas()
+
+    generate_schemas = docs.generate_schemas
+    monkeypatch.setattr(docs, "generate_schemas", generate)
+    docs.get_code_version.cache_clear()
+    docs.get_schema_documents.cache_clear()
+    yield generations
+    docs.get_code_version.cache_clear()
+    docs.get_schema_documents.cache_clear()
+
+
+class TestSchemaView:
+    def test_schema_is_generated_once(self, client, schema):
+        first = client.get(reverse("schema-json"))
+        second = client.get(reverse("schema-json"))
+
+        assert first.status_code == 200
+        assert first["Content-Type"] == "application/json"
+        assert json.loads(first.content)["info"]["version"] == "v1"
+        assert "/core/companies/" in json.loads(first.content)["paths"]
+        assert second.content == first.content
+        assert second["ETag"] == first["ETag"]
+        assert len(schema) == 1
+
+    def test_unchanged_schema_is_not_modified(self, client):
+        etag = client.get(reverse("schema-json"))["ETag"]
+
+        response = client.get(reverse("schema-json"), HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+        assert not response.content
+
+    def test_yaml(self, client):
+        response = client.get(reverse("schema-yaml"))
+
+        assert response["Content-Type"] == "application/yaml"
+        assert response.content.startswith(b"swagger: '2.0'")
+
+    def test_build_artifacts_are_served(self, client, schema, tmp_path):
+        call_command("generate_schema", stdout=io.StringIO())
+        path = tmp_path / "schema-1.2.0.json"
+        path.write_bytes(b'{"swagger": "2.0"}')
+        schema.clear()
+
+        response = client.get(reverse("schema-json"))
+
+        assert response.content == b'{"swagger": "2.0"}'
+        assert not schema
+
+    def test_artifacts_of_other_versions_are_ignored(self, client, schema, settings):
+        call_command("generate_schema", stdout=io.StringIO())
+        settings.BUILD_VERSION = "1.3.0"
+        docs.get_code_version.cache_clear()
+        schema.clear()
+
+        client.get(reverse("schema-json"))
+
+        assert len(schema) == 1
+
+    def test_source_digest_without_build_version(self, settings):
+        settings.BUILD_VERSION = ""
+
+        assert len(docs.get_code_version()) == 32
+
+
+class TestDocsView:
+    @pytest.mark.parametrize("name", ["schema-swagger-ui", "schema-redoc"])
+    def test_pages_load_the_cached_schema(self, client, schema, name):
+        response = client.get(reverse(name))
+
+        assert response.status_code == 200
+        assert "Magazyn360 API" in response.content.decode()
+        assert reverse("schema-json") in response.content.decode()
+        assert not schema
+
+    def test_drf_yasg_schema_url(self, client):
+        response = client.get(reverse("schema-swagger-ui"), {"format": "openapi"})
+
+        assert response["Content-Type"] == "application/json"
+        assert response["ETag"] == client.get(reverse("schema-json"))["ETag"]
+
+
+def test_url_conf_does_not_import_drf_yasg():
+    code = (
+        "import sys, django; django.setup(); "
+        "from django.urls import get_resolver; get_resolver()._populate(); "
+        "print(sorted(m for m in sys.modules if m.startswith('drf_yasg.')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        check=True,
+        cwd=settings.BASE_DIR,
+        env={"DJANGO_SETTINGS_MODULE": "magazyn360.settings", "PATH": ""},
+        text=True,
+    )
+
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,48 @@
+import csv
+import json
+
+import pytest
+from django.urls import reverse
+
+
+def read(response):
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+def test_export_streams_ndjson(
+    tenant_client, billing_address, office_address, django_assert_num_queries
+):
+    response = tenant_client.get(reverse("address-export"))
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response["Content-Type"] == "application/x-ndjson; charset=utf-8"
+    # The rows are only read while the response streams.
+    with django_assert_num_queries(1):
+        content = read(response)
+    rows = [json.loads(line) for line in content.splitlines()]
+    assert [row["id"] for row in rows] == [
+        str(billing_address.pk),
+        str(office_address.pk),
+    ]
+    assert rows[0]["company"] == str(billing_address.company_id)
+
+
+@pytest.mark.django_db
+def test_export_streams_csv(tenant_client, tenant_user, company):
+    response = tenant_client.get(reverse("user-export"), HTTP_ACCEPT="text/csv")
+
+    assert response.status_code == 200
+    assert 'filename="user-export.csv"' in response["Content-Disposition"]
+    header, row = csv.reader(read(response).splitlines())
+    assert header[:3] == ["id", "username", "email"]
+    assert row[1] == tenant_user.username
+    assert row[header.index("company_name")] == company.name
+
+
+@pytest.mark.django_db
+def test_export_rejects_unknown_format(tenant_client):
+    response = tenant_client.get(reverse("company-export"), {"format": "xml"})
+
+    assert response.status_code == 404
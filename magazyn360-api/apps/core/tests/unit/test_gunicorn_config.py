@@ -0,0 +1,168 @@
+import json
+
+import pytest
+from gunicorn.config import Config
+from gunicorn.glogging import Logger
+
+from apps.core.groups import role_group_ids
+from apps.core.serializers import AddressSerializer, CompiledReader
+from apps.core.warmup import warm_serializers, warm_up
+from magazyn360 import gunicorn_config
+from magazyn360.gunicorn_config import available_cpus, get_profile, memory_limit
+from magazyn360.workers import ConcurrencyLimitedUvicornWorker
+
+GiB = 1024**3
+
+
+@pytest.fixture
+def cgroup(tmp_path):
+    def write(**files):
+        for name, content in files.items():
+            path = tmp_path / name.replace("__", "/")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(f"{content}\n")
+        return tmp_path
+
+    return write
+
+
+@pytest.fixture(autouse=True)
+def cpus(monkeypatch):
+    monkeypatch.setattr(gunicorn_config.os, "sched_getaffinity", lambda pid: range(8))
+    for name in (
+        "ASYNC_READS",
+        "GUNICORN_WORKERS",
+        "GUNICORN_THREADS",
+        "GUNICORN_ASYNC_CONCURRENCY",
+    ):
+        monkeypatch.delenv(name, raising=False)
+
+
+@pytest.mark.parametrize(
+    "files,expected",
+    [
+        ({}, 8),
+        ({"cpu.max": "max 100000"}, 8),
+        ({"cpu.max": "150000 100000"}, 2),
+        ({"cpu.max": "50000 100000"}, 1),
+        ({"cpu__cpu.cfs_quota_us": "-1", "cpu__cpu.cfs_period_us": "100000"}, 8),
+        ({"cpu__cpu.cfs_quota_us": "300000", "cpu__cpu.cfs_period_us": "100000"}, 3),
+        ({"cpu.max": "2000000 100000"}, 8),
+    ],
+)
+def test_cpus_follow_the_cgroup_quota(cgroup, files, expected):
+    assert available_cpus(cgroup(**files)) == expected
+
+
+@pytest.mark.parametrize(
+    "files,expected",
+    [
+        ({}, None),
+        ({"memory.max": "max"}, None),
+        ({"memory.max": str(GiB)}, GiB),
+        ({"memory__memory.limit_in_bytes": "9223372036854771712"}, None),
+        ({"memory__memory.limit_in_bytes": str(GiB)}, GiB),
+    ],
+)
+def test_memory_limit(cgroup, files, expected):
+    assert memory_limit(cgroup(**files)) == expected
+
+
+def test_threaded_workers_per_cpu(cgroup):
+    profile = get_profile(cgroup(**{"cpu.max": "200000 100000"}))
+
+    assert profile.worker_class == "gthread"
+    assert (profile.workers, profile.threads) == (5, 4)
+    assert profile.worker_concurrency == 4
+    assert profile.wsgi_app == "magazyn360.wsgi:application"
+
+
+def test_uvicorn_worker_per_cpu(cgroup, monkeypatch):
+    monkeypatch.setenv("ASYNC_READS", "True")
+
+    profile = get_profile(cgroup(**{"cpu.max": "200000 100000"}))
+
+    assert profile.worker_class == (
+        "magazyn360.workers.ConcurrencyLimitedUvicornWorker"
+    )
+    assert (profile.workers, profile.threads) == (2, 1)
+    assert profile.worker_concurrency == 16
+    assert profile.wsgi_app == "magazyn360.asgi:application"
+
+
+def test_async_concurrency_override(cgroup, monkeypatch):
+    monkeypatch.setenv("ASYNC_READS", "True")
+    monkeypatch.setenv("GUNICORN_ASYNC_CONCURRENCY", "32")
+
+    profile = get_profile(cgroup(**{"cpu.max": "200000 100000"}))
+
+    assert profile.worker_concurrency == 32
+    assert json.loads(profile.describe())["concurrency"] == 64
+
+
+def test_worker_concurrency_is_exported_to_the_settings():
+    assert gunicorn_config.os.environ["GUNICORN_WORKER_CONCURRENCY"] == str(
+        gunicorn_config.profile.worker_concurrency
+    )
+
+
+def test_uvicorn_worker_limits_its_concurrency(monkeypatch):
+    monkeypatch.setenv("GUNICORN_WORKER_CONCURRENCY", "24")
+    config = Config()
+
+    worker = ConcurrencyLimitedUvicornWorker(0, 1, [], None, 30, config, Logger(config))
+
+    assert worker.config.limit_concurrency == 24
+
+
+@pytest.mark.parametrize("limit,expected", [(512, 3), (1024, 7), (128, 1)])
+def test_workers_fit_the_memory_limit(cgroup, limit, expected):
+    profile = get_profile(cgroup(**{"memory.max": limit * 1024 * 1024}))
+
+    assert profile.workers == expected
+
+
+def test_environment_overrides(cgroup, monkeypatch):
+    monkeypatch.setenv("GUNICORN_WORKERS", "2")
+    monkeypatch.setenv("GUNICORN_THREADS", "1")
+
+    profile = get_profile(cgroup())
+
+    assert (profile.worker_class, profile.workers, profile.threads) == ("sync", 2, 1)
+    assert json.loads(profile.describe())["concurrency"] == 2
+
+
+def test_app_is_preloaded_and_recycled():
+    assert gunicorn_config.preload_app
+    assert gunicorn_config.max_requests_jitter > 0
+
+
+def test_startup_phases(monkeypatch):
+    monkeypatch.setattr(gunicorn_config, "config_loaded_at", 100.0)
+
+    assert gunicorn_config.startup_phases(101.5, 102.0, started_at=99.0) == {
+        "before gunicorn": 1.0,
+        "application load": 1.5,
+        "warm-up": 0.5,
+        "total": 3.0,
+    }
+    assert list(gunicorn_config.startup_phases(101.5, 102.0)) == [
+        "application load",
+        "warm-up",
+        "total",
+    ]
+
+
+@pytest.mark.django_db
+def test_warm_up_loads_readers_and_role_groups(mocker, django_assert_num_queries):
+    close_pools = mocker.patch("apps.core.warmup.close_pools")
+    CompiledReader.for_serializer.cache_clear()
+    role_group_ids.invalidate()
+
+    assert warm_serializers() == 3
+    assert CompiledReader.for_serializer(AddressSerializer) is not None
+    warm_up()
+
+    close_pools.assert_called_once()
+    with django_assert_num_queries(0):
+        role_group_ids.get()
@@ -0,0 +1,189 @@
+import csv
+import io
+import json
+
+import orjson
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from apps.core.enums import AddressTypes
+from apps.core.importers import AddressImporter, CompanyImporter, read_rows
+from apps.core.models import Address, Company, ImportCheckpoint
+from apps.core.validators import NIPValidator
+
+
+def nip(index):
+    digits = f"1{index:08d}"
+    return f"{digits}{NIPValidator().check_digit(digits)}"
+
+
+def company_row(i, **values):
+    return {
+        "name": f"Company {i}",
+        "tax_id": nip(i),
+        "statistical_number": "123456785",
+        "national_court_register": f"{i:010d}",
+        "email": f"company{i}@example.com",
+        "phone": "+48123456789",
+        "owner": "owner@test.com",
+        **values,
+    }
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
+
+
+def read_rejects(path):
+    with open(path, "rb") as file:
+        return [orjson.loads(line) for line in file]
+
+
+@pytest.mark.django_db
+class TestImportData:
+    def test_imports_valid_rows_and_rejects_the_rest(self, tmp_path, owner):
+        path = write_csv(
+            tmp_path / "companies.csv",
+            [
+                company_row(1),
+                company_row(2, tax_id="12-34"),
+                company_row(3, owner="nobody@test.com"),
+                company_row(4, email="company1@example.com"),
+                company_row(5),
+            ],
+        )
+        out = io.StringIO()
+
+        call_command("import_data", "companies", path, batch_size=2, stdout=out)
+
+        assert set(Company.objects.values_list("name", flat=True)) == {
+            "Company 1",
+            "Company 5",
+        }
+        rejects = read_rejects(f"{path}.rejects.jsonl")
+        assert [(r["row"], list(r["errors"])) for r in rejects] == [
+            (2, ["tax_id"]),
+            (3, ["owner"]),
+            (4, ["email"]),
+        ]
+        assert "Imported 2 companies, rejected 3 rows" in out.getvalue()
+        assert not ImportCheckpoint.objects.exists()
+
+    def test_addresses_reference_companies_by_tax_id(self, tmp_path, company):
+        path = tmp_path / "addresses.jsonl"
+        rows = [
+            {"company": company.tax_id, "type": "billing", "name": "HQ"},
+            {"company": company.tax_id, "type": "billing", "name": "Second"},
+            {
+                "company": company.tax_id,
+                "type": "office",
+                "name": "Office",
+                "postal_code": "0000",
+            },
+        ]
+        defaults = {"street": "Street 1", "city": "Warszawa", "postal_code": "00-950"}
+        lines = [json.dumps(defaults | row) for row in rows] + ["not json"]
+        path.write_text("\n".join(lines) + "\n")
+
+        call_command("import_data", "addresses", str(path), stdout=io.StringIO())
+
+        assert list(Address.objects.values_list("name", "type")) == [
+            ("HQ", AddressTypes.BILLING)
+        ]
+        rejects = read_rejects(f"{path}.rejects.jsonl")
+        assert [(r["row"], list(r["errors"])) for r in rejects] == [
+            (2, ["type"]),
+            (3, ["postal_code"]),
+            (4, ["__all__"]),
+        ]
+
+    def test_resumes_after_the_last_checkpoint(self, tmp_path, owner, monkeypatch):
+        path = write_csv(tmp_path / "companies.csv", [company_row(i) for i in range(6)])
+        batches = []
+
+        def failing_batch(self, batch, record=None):
+            if len(batches) == 1:
+                raise KeyboardInterrupt
+            batches.append(batch)
+            return original(self, batch, record)
+
+        original = CompanyImporter.import_batch
+        monkeypatch.setattr(CompanyImporter, "import_batch", failing_batch)
+        with pytest.raises(KeyboardInterrupt):
+            call_command("import_data", "companies", path, batch_size=2)
+        monkeypatch.setattr(CompanyImporter, "import_batch", original)
+
+        assert Company.objects.count() == 2
+        out = io.StringIO()
+        call_command("import_data", "companies", path, resume=True, stdout=out)
+
+        assert Company.objects.count() == 6
+        assert "Imported 6 companies, rejected 0 rows" in out.getvalue()
+
+    def test_rows_committed_before_an_interruption_are_not_reinserted(
+        self, tmp_path, company, monkeypatch
+    ):
+        path = tmp_path / "addresses.jsonl"
+        row = {
+            "company": company.tax_id,
+            "type": "office",
+            "street": "Street 1",
+            "city": "Warszawa",
+            "postal_code": "00-950",
+        }
+        lines = [json.dumps(row | {"name": f"Office {i}"}) for i in range(6)]
+        path.write_text("\n".join(lines) + "\n")
+        batches = []
+
+        def interrupted_batch(self, batch, record=None):
+            def interrupted_record(*args):
+                record(*args)
+                if len(batches) == 2:
+                    # Interrupted before the batch commits.
+                    raise KeyboardInterrupt
+
+            batches.append(batch)
+            return original(self, batch, interrupted_record)
+
+        original = AddressImporter.import_batch
+        monkeypatch.setattr(AddressImporter, "import_batch", interrupted_batch)
+        with pytest.raises(KeyboardInterrupt):
+            call_command("import_data", "addresses", str(path), batch_size=2)
+        monkeypatch.setattr(AddressImporter, "import_batch", original)
+
+        assert Address.objects.count() == 2
+        assert ImportCheckpoint.objects.get().last_row == 2
+        call_command(
+            "import_data", "addresses", str(path), resume=True, stdout=io.StringIO()
+        )
+
+        assert Address.objects.count() == 6
+        assert not ImportCheckpoint.objects.exists()
+
+    def test_json_array_is_refused(self, tmp_path):
+        path = tmp_path / "companies.json"
+        path.write_text(json.dumps([company_row(1)]))
+
+        with pytest.raises(CommandError, match="JSON array"):
+            call_command("import_data", "companies", str(path))
+
+    def test_unknown_format_is_an_error(self, tmp_path):
+        path = tmp_path / "companies.xml"
+        path.write_text("<companies/>")
+
+        with pytest.raises(CommandError):
+            call_command("import_data", "companies", str(path))
+
+
+def test_csv_rows_are_numbered_from_one(tmp_path):
+    path = write_csv(tmp_path / "rows.csv", [{"a": "1"}, {"a": "2"}])
+
+    assert list(read_rows(path, "csv")) == [
+        (1, {"a": "1"}, None),
+        (2, {"a": "2"}, None),
+    ]
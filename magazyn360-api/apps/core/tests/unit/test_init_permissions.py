@@ -0,0 +1,104 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import Group, Permission
+from django.core.management import CommandError, call_command
+
+
+def run(*args):
+    out = StringIO()
+    call_command("init_permissions", *args, stdout=out)
+    return out.getvalue()
+
+
+def group_perms(name):
+    return set(
+        Group.objects.get(name=name).permissions.values_list("codename", flat=True)
+    )
+
+
+@pytest.mark.django_db
+class TestInitPermissions:
+    def test_grants_configured_permissions(self):
+        run()
+
+        assert group_perms("Viewer") == {
+            "view_company",
+            "view_address",
+            "view_customuser",
+        }
+        assert group_perms("Manager") == {
+            "view_company",
+            "change_company",
+            "add_address",
+            "change_address",
+            "view_address",
+            "add_customuser",
+            "change_customuser",
+            "view_customuser",
+        }
+
+    def test_is_idempotent_with_constant_queries(self, django_assert_max_num_queries):
+        run()
+
+        with django_assert_max_num_queries(4):
+            output = run()
+
+        assert "up to date" in output
+
+    def test_lists_unconfigured_permissions_without_removing_them(self):
+        run()
+        Group.objects.get(name="Viewer").permissions.add(
+            Permission.objects.get(codename="delete_company")
+        )
+
+        output = run("--check")
+
+        assert " ? Viewer: core.delete_company (not configured, kept)" in output
+        assert "up to date" in output
+        assert "delete_company" in group_perms("Viewer")
+
+    def test_prune_removes_stale_managed_permissions_only(self):
+        run()
+        viewer = Group.objects.get(name="Viewer")
+        viewer.permissions.add(
+            Permission.objects.get(codename="delete_company"),
+            Permission.objects.get(codename="view_group"),
+        )
+        with pytest.raises(CommandError):
+            run("--prune", "--check")
+
+        run("--prune")
+
+        assert "delete_company" not in group_perms("Viewer")
+        assert "view_group" in group_perms("Viewer")
+
+    def test_check_fails_on_drift(self):
+        with pytest.raises(CommandError):
+            run("--check")
+        assert not Group.objects.filter(name="Viewer").exists()
+
+        run()
+
+        assert "up to date" in run("--check")
+
+    def test_warns_that_workers_are_not_told_without_a_shared_cache(
+        self, settings, tmp_path
+    ):
+        assert "running workers keep the previous permissions" in run()
+
+        settings.CACHES = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": str(tmp_path),
+            }
+        }
+        Group.objects.get(name="Viewer").permissions.clear()
+
+        assert "running workers" not in run()
+
+    def test_dry_run_prints_diff_without_applying(self):
+        output = run("--dry-run")
+
+        assert " + Viewer: core.view_company" in output
+        assert not Group.objects.exists()
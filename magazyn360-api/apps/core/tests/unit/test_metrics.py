@@ -0,0 +1,155 @@
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from apps.core.checks import check_metrics_token
+from apps.core.metrics import get_labels, get_registry
+from apps.core.middleware import MetricsMiddleware
+from apps.core.models import Company
+from magazyn360 import gunicorn_config
+
+METRICS = (
+    "magazyn360_http_request_duration_seconds_count",
+    "magazyn360_http_request_queries_sum",
+    "magazyn360_http_request_db_duration_seconds_sum",
+    "magazyn360_http_response_size_bytes_sum",
+)
+
+
+def measure(view, action, status=200, registry=REGISTRY):
+    """Returns the current values of the request metrics of a view action."""
+    labels = {"view": view, "action": action}
+    values = [registry.get_sample_value(name, labels) or 0 for name in METRICS]
+    status_labels = {**labels, "status": str(status)}
+    responses = registry.get_sample_value(
+        "magazyn360_http_responses_total", status_labels
+    )
+    return [*values, responses or 0]
+
+
+def difference(before, after):
+    return [value - before[i] for i, value in enumerate(after)]
+
+
+@pytest.mark.django_db
+class TestMetricsMiddleware:
+    def test_requests_are_recorded_by_view_and_action(
+        self, tenant_client, billing_address
+    ):
+        before = measure("address-list", "list")
+
+        response = tenant_client.get(reverse("address-list"))
+
+        requests, queries, db_duration, size, responses = difference(
+            before, measure("address-list", "list")
+        )
+        assert requests == 1
+        assert queries >= 1
+        assert db_duration > 0
+        assert size == len(response.content)
+        assert responses == 1
+
+    def test_status_codes(self, tenant_client):
+        url = reverse("address-detail", args=[0])
+        before = measure("address-detail", "partial_update", status=404)
+
+        tenant_client.patch(url, {"name": "Renamed"}, format="json")
+
+        after = measure("address-detail", "partial_update", status=404)
+        assert difference(before, after)[-1] == 1
+
+    def test_unresolved_requests(self, tenant_client):
+        before = measure("unresolved", "get", status=404)
+
+        tenant_client.get("/missing/")
+
+        assert difference(before, measure("unresolved", "get", status=404))[-1] == 1
+
+    def test_async_requests(self, company):
+        async def view(request):
+            await Company.objects.acount()
+            return HttpResponse("counted")
+
+        request = RequestFactory().get("/")
+        request.resolver_match = None
+        before = measure("unresolved", "get")
+
+        async_to_sync(MetricsMiddleware(view))(request)
+
+        requests, queries, _, size, _ = difference(before, measure("unresolved", "get"))
+        assert (requests, queries, size) == (1, 1, 7)
+
+
+def test_unknown_methods_share_a_label():
+    request = RequestFactory().generic("BREW", "/")
+    request.resolver_match = None
+
+    assert get_labels(request) == ("unresolved", "other")
+
+
+class TestMetricsView:
+    def test_metrics_are_served_in_debug(self, api_client, settings):
+        settings.DEBUG = True
+
+        response = api_client.get(reverse("metrics"))
+
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain")
+        assert b"magazyn360_http_request_duration_seconds_bucket" in response.content
+
+    def test_not_served_without_a_token_outside_of_debug(self, api_client, settings):
+        settings.DEBUG = False
+
+        assert api_client.get(reverse("metrics")).status_code == 404
+        assert [error.id for error in check_metrics_token(None)] == ["core.W001"]
+
+    def test_token(self, api_client, settings):
+        settings.METRICS_TOKEN = "scraper"
+
+        assert api_client.get(reverse("metrics")).status_code == 403
+        response = api_client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer scraper"
+        )
+        assert response.status_code == 200
+
+
+def test_metrics_of_workers_are_summed(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    stale = tmp_path / "counter_1.db"
+    stale.write_bytes(b"")
+    gunicorn_config.on_starting(server=None)
+    assert not stale.exists()
+
+    worker = (
+        "from apps.core.metrics import responses; "
+        "responses.labels('company-list', 'list', 200).inc()"
+    )
+    pids = []
+    for _ in range(3):
+        process = subprocess.Popen(
+            [sys.executable, "-c", worker],
+            cwd=settings.BASE_DIR,
+            env={"PROMETHEUS_MULTIPROC_DIR": str(tmp_path), "PATH": ""},
+        )
+        assert process.wait() == 0
+        pids.append(process.pid)
+
+    assert measure("company-list", "list", registry=get_registry())[-1] == 3
+
+    # Exited workers are folded into the archive file, counts included.
+    for pid in pids[:2]:
+        gunicorn_config.child_exit(None, SimpleNamespace(pid=pid))
+
+    assert measure("company-list", "list", registry=get_registry())[-1] == 3
+    assert {path.name for path in tmp_path.iterdir()} == {
+        "counter_archive.db",
+        f"counter_{pids[2]}.db",
+    }
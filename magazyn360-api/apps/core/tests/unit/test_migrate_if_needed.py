@@ -0,0 +1,47 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+from apps.core.management.commands.migrate_if_needed import Command
+
+
+@pytest.mark.django_db
+def test_current_schema_is_not_migrated(mocker, django_assert_max_num_queries):
+    migrate = mocker.patch(
+        "apps.core.management.commands.migrate_if_needed.call_command"
+    )
+    out = io.StringIO()
+
+    with django_assert_max_num_queries(2):
+        call_command("migrate_if_needed", stdout=out)
+
+    assert out.getvalue().startswith("Database schema is current")
+    migrate.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_unapplied_migrations_are_applied(mocker):
+    migrate = mocker.patch(
+        "apps.core.management.commands.migrate_if_needed.call_command"
+    )
+    mocker.patch.object(Command, "get_plan", side_effect=[["0042"], ["0042"]])
+    out = io.StringIO()
+
+    call_command("migrate_if_needed", stdout=out, no_color=True)
+
+    assert "Database schema migrated" in out.getvalue()
+    assert migrate.call_args.args == ("migrate",)
+    assert migrate.call_args.kwargs["interactive"] is False
+
+
+@pytest.mark.django_db
+def test_schema_migrated_meanwhile_is_not_migrated_again(mocker):
+    migrate = mocker.patch(
+        "apps.core.management.commands.migrate_if_needed.call_command"
+    )
+    mocker.patch.object(Command, "get_plan", side_effect=[["0042"], []])
+
+    call_command("migrate_if_needed", stdout=io.StringIO())
+
+    migrate.assert_not_called()
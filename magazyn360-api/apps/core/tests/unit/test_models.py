@@ -1,7 +1,12 @@
+import time
+
 import pytest
+from django.contrib.auth.models import Group
+from django.db import connection
 
 from apps.core.enums import AddressTypes, Role
-from apps.core.models import CustomUser
+from apps.core.groups import get_role_group_id, role_group_ids
+from apps.core.models import Company, CustomUser
 
 
 @pytest.mark.django_db
@@ -74,9 +79,62 @@ class TestCompany:
     def test_shipping_address_no_billing(self, company):
         assert company.shipping_address is None
 
+    def test_address_accessors_use_prefetched_addresses(
+        self, company, billing_address, office_address, django_assert_num_queries
+    ):
+        company = Company.objects.with_addresses().get(pk=company.pk)
+        with django_assert_num_queries(0):
+            assert company.primary_address == office_address
+            assert company.shipping_address == billing_address
+            assert company.get_address_by_type(AddressTypes.SHIPPING) is None
+
 
 @pytest.mark.django_db
 class TestAddress:
     def test_full_address(self, billing_address):
         expected = "Test Street 1\n00-000 Test City\nPoland"
         assert billing_address.full_address == expected
+
+
+@pytest.mark.django_db
+class TestRoleGroupCache:
+    def test_user_create_syncs_group_once(
+        self, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            CustomUser.objects.create(
+                username="warm_up", email="warm@test.com", role=Role.WORKER
+            )
+        get_role_group_id(Role.WORKER)
+        # INSERT user, SELECT current groups, INSERT membership
+        with django_assert_num_queries(3):
+            user = CustomUser.objects.create(
+                username="cached", email="cached@test.com", role=Role.WORKER
+            )
+        assert list(user.groups.values_list("name", flat=True)) == ["Worker"]
+
+    def test_deleted_group_is_recreated(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            CustomUser.objects.create(username="first", email="first@test.com")
+        assert Role.VIEWER in role_group_ids.get()
+        with django_capture_on_commit_callbacks(execute=True):
+            Group.objects.filter(name="Viewer").delete()
+
+        user = CustomUser.objects.create(username="second", email="second@test.com")
+
+        assert user.groups.get().name == "Viewer"
+        connection.check_constraints()
+
+    def test_group_deleted_by_another_worker_expires(self, monkeypatch):
+        group_id = Group.objects.create(name="Viewer").pk
+        assert role_group_ids.get()[Role.VIEWER] == group_id
+        # Uncommitted, the deletion leaves the cached id in place, like one
+        # made through another worker with a per-process cache.
+        Group.objects.filter(pk=group_id).delete()
+        expired = time.monotonic() + role_group_ids.timeout
+        monkeypatch.setattr("apps.core.cache.time.monotonic", lambda: expired)
+
+        user = CustomUser.objects.create(username="second", email="second@test.com")
+
+        assert user.groups.get().pk != group_id
+        connection.check_constraints()
@@ -0,0 +1,101 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.core.enums import AddressTypes
+from apps.core.models import Address
+from apps.core.pagination import KeysetPagination, OffsetPagination
+
+
+@pytest.fixture
+def addresses(company):
+    Address.objects.bulk_create(
+        Address(
+            company=company,
+            type=AddressTypes.WAREHOUSE,
+            name=f"Warehouse {i}",
+            street="Test Street",
+            city="Test City",
+            postal_code="00-000",
+        )
+        for i in range(7)
+    )
+    # Rows sharing a timestamp must still be ordered by id.
+    Address.objects.filter(name__in=["Warehouse 2", "Warehouse 3"]).update(
+        created_at=timezone.now()
+    )
+    return [
+        str(pk)
+        for pk in Address.objects.order_by("-created_at", "-id").values_list(
+            "id", flat=True
+        )
+    ]
+
+
+@pytest.mark.django_db
+def test_cursor_pages_walk_forward_and_back(tenant_client, addresses):
+    url = reverse("address-list") + "?page_size=3"
+    seen = []
+    pages = []
+    while url:
+        data = tenant_client.get(url).json()
+        pages.append(data)
+        seen.extend(item["id"] for item in data["results"])
+        url = data["next"]
+
+    assert seen == addresses
+    assert len(pages) == 3
+    assert pages[0]["previous"] is None
+
+    back = tenant_client.get(pages[-1]["previous"]).json()
+    assert [item["id"] for item in back["results"]] == addresses[3:6]
+    back = tenant_client.get(back["previous"]).json()
+    assert [item["id"] for item in back["results"]] == addresses[:3]
+    assert back["previous"] is None
+
+
+@pytest.mark.django_db
+def test_pages_are_selected_by_row_comparison(tenant_client, addresses):
+    first = tenant_client.get(reverse("address-list"), {"page_size": 3}).json()
+
+    with CaptureQueriesContext(connection) as context:
+        tenant_client.get(first["next"])
+
+    condition = '("core_address"."created_at", "core_address"."id") < ('
+    assert any(condition in query["sql"] for query in context.captured_queries)
+
+
+@pytest.mark.django_db
+def test_invalid_cursor_returns_not_found(tenant_client, addresses):
+    response = tenant_client.get(reverse("address-list") + "?cursor=cD1ub3QtYS1kYXRl")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_limit_offset_is_opt_in(tenant_client, addresses):
+    data = tenant_client.get(reverse("address-list") + "?limit=2&offset=2").json()
+
+    assert data["count"] == len(addresses)
+    assert [item["id"] for item in data["results"]] == addresses[2:4]
+
+
+@pytest.mark.django_db
+def test_oversized_limit_is_clamped(tenant_client, addresses, monkeypatch):
+    assert OffsetPagination.max_limit == KeysetPagination.max_page_size
+    monkeypatch.setattr(OffsetPagination, "max_limit", 3)
+
+    data = tenant_client.get(reverse("address-list"), {"limit": 100_000}).json()
+    assert [item["id"] for item in data["results"]] == addresses[:3]
+
+    request = Request(APIRequestFactory().get("/", {"limit": 100_000}))
+    queryset = Address.objects.order_by("-created_at", "-id").values_list(
+        "id", flat=True
+    )
+    page = async_to_sync(OffsetPagination().apaginate_queryset)(queryset, request)
+    assert [str(pk) for pk in page] == addresses[:3]
@@ -1,13 +1,20 @@
 from unittest.mock import Mock
 
+import pytest
+
+from apps.core.enums import Role
+from apps.core.models import Address
+from apps.core.permission_matrix import compile_permission_matrix, permission_matrix
+from apps.core.permissions import RoleModelPermissions
+
 
 def test_has_object_permission_authenticated_user_same_company(
     permission, mock_request, mock_view
 ):
     mock_request.user.is_authenticated = True
-    mock_request.user.company = "company1"
+    mock_request.user.company_id = "company1"
     obj = Mock()
-    obj.company = "company1"
+    obj.company_id = "company1"
 
     assert permission.has_object_permission(mock_request, mock_view, obj) is True
 
@@ -16,9 +23,9 @@ def test_has_object_permission_unauthenticated_user(
     permission, mock_request, mock_view
 ):
     mock_request.user.is_authenticated = False
-    mock_request.user.company = "company1"
+    mock_request.user.company_id = "company1"
     obj = Mock()
-    obj.company = "company1"
+    obj.company_id = "company1"
 
     assert permission.has_object_permission(mock_request, mock_view, obj) is False
 
@@ -27,17 +34,120 @@ def test_has_object_permission_no_company_attribute(
     permission, mock_request, mock_view
 ):
     mock_request.user.is_authenticated = True
-    delattr(mock_request.user, "company")
+    delattr(mock_request.user, "company_id")
     obj = Mock()
-    obj.company = "company1"
+    obj.company_id = "company1"
 
     assert permission.has_object_permission(mock_request, mock_view, obj) is False
 
 
 def test_has_object_permission_different_company(permission, mock_request, mock_view):
     mock_request.user.is_authenticated = True
-    mock_request.user.company = "company1"
+    mock_request.user.company_id = "company1"
     obj = Mock()
-    obj.company = "company2"
+    obj.company_id = "company2"
 
     assert permission.has_object_permission(mock_request, mock_view, obj) is False
+
+
+def test_has_object_permission_company_object(permission, mock_request, mock_view):
+    mock_request.user.is_authenticated = True
+    mock_request.user.company_id = "company1"
+    mock_view.tenant_field = "id"
+    obj = Mock()
+    obj.id = "company1"
+
+    assert permission.has_object_permission(mock_request, mock_view, obj) is True
+
+
+def test_has_object_permission_superuser(permission, mock_request, mock_view):
+    mock_request.user.is_authenticated = True
+    mock_request.user.is_superuser = True
+    mock_request.user.company_id = None
+    obj = Mock()
+    obj.company_id = "company2"
+
+    assert permission.has_object_permission(mock_request, mock_view, obj) is True
+
+
+def test_company_id_is_resolved_once_per_request(permission, mock_request, mock_view):
+    mock_request.user.is_authenticated = True
+    mock_request.user.company_id = "company1"
+    obj = Mock()
+    obj.company_id = "company1"
+    permission.has_object_permission(mock_request, mock_view, obj)
+
+    mock_request.user.company_id = "company2"
+
+    assert permission.has_object_permission(mock_request, mock_view, obj) is True
+
+
+@pytest.fixture
+def role_permission():
+    return RoleModelPermissions()
+
+
+@pytest.fixture
+def address_view():
+    view = Mock(spec=["queryset"])
+    view.queryset = Address.objects.all()
+    return view
+
+
+@pytest.mark.django_db
+def test_role_permission_granted_by_matrix(
+    role_permission, tenant_user, address_view, django_assert_num_queries
+):
+    request = Mock(method="POST", user=tenant_user)
+
+    with django_assert_num_queries(0):
+        assert role_permission.has_permission(request, address_view) is True
+
+
+@pytest.mark.django_db
+def test_role_permission_denied(role_permission, tenant_user, address_view):
+    request = Mock(method="DELETE", user=tenant_user)
+
+    assert role_permission.has_permission(request, address_view) is False
+
+
+@pytest.mark.django_db
+def test_role_permission_falls_back_to_user_permissions(
+    role_permission, tenant_user, address_view, grant
+):
+    grant(tenant_user, "delete_address")
+    request = Mock(method="DELETE", user=tenant_user)
+
+    assert role_permission.has_permission(request, address_view) is True
+
+
+@pytest.mark.django_db
+def test_role_permission_inactive_user(role_permission, tenant_user, address_view):
+    tenant_user.is_active = False
+    request = Mock(method="POST", user=tenant_user)
+
+    assert role_permission.has_permission(request, address_view) is False
+
+
+def test_permission_matrix_compiled_from_config():
+    matrix = compile_permission_matrix()
+
+    assert "core.delete_company" in matrix[Role.ADMIN]
+    assert "core.delete_company" not in matrix[Role.OWNER]
+    assert matrix[Role.VIEWER] == {
+        "core.view_company",
+        "core.view_address",
+        "core.view_customuser",
+    }
+
+
+def test_permission_matrix_reloads_on_invalidation(monkeypatch):
+    permission_matrix.get()
+    monkeypatch.setattr(permission_matrix, "loader", dict)
+    assert permission_matrix.get() != {}
+
+    permission_matrix.invalidate()
+
+    assert permission_matrix.get() == {}
+    monkeypatch.undo()
+    permission_matrix.invalidate()
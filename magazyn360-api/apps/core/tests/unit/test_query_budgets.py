@@ -0,0 +1,152 @@
+import logging
+import uuid
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.core.enums import AddressTypes
+from apps.core.models import Address, Company, CustomUser
+from apps.core.views import AddressViewSet, CompanyViewSet, MeView, UserViewSet
+
+
+def create_users(company, count):
+    names = [uuid.uuid4().hex for _ in range(count)]
+    CustomUser.objects.bulk_create(
+        CustomUser(username=name, email=f"{name}@test.com", company=company)
+        for name in names
+    )
+
+
+def create_addresses(company, count):
+    Address.objects.bulk_create(
+        Address(
+            company=company,
+            type=AddressTypes.WAREHOUSE,
+            name=f"Warehouse {i}",
+            street="Test Street",
+            city="Test City",
+            postal_code="00-000",
+        )
+        for i in range(count)
+    )
+
+
+def create_companies(owner, count):
+    Company.objects.bulk_create(
+        Company(
+            name=f"Company {i}",
+            tax_id=f"{i:010d}",
+            statistical_number="123456789",
+            national_court_register=f"{i:010d}",
+            email=f"company{i}@test.com",
+            phone="123456789",
+            owner=owner,
+        )
+        for i in range(count)
+    )
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url_name,viewset,create_rows",
+    [
+        ("user-list", UserViewSet, create_users),
+        ("address-list", AddressViewSet, create_addresses),
+    ],
+)
+def test_tenant_list_query_count_is_constant(
+    tenant_client, company, url_name, viewset, create_rows
+):
+    url = reverse(url_name)
+
+    create_rows(company, 1)
+    few = count_queries(tenant_client, url)
+    create_rows(company, 25)
+    many = count_queries(tenant_client, url)
+
+    assert few == many
+    assert many <= viewset.query_budgets["list"]
+
+
+@pytest.mark.django_db
+def test_company_list_query_count_is_constant(api_client, owner):
+    owner.is_superuser = True
+    owner.save()
+    api_client.force_authenticate(owner)
+    url = reverse("company-list")
+
+    create_companies(owner, 1)
+    few = count_queries(api_client, url)
+    Company.objects.all().delete()
+    create_companies(owner, 25)
+    many = count_queries(api_client, url)
+
+    assert few == many
+    assert many <= CompanyViewSet.query_budgets["list"]
+
+
+@pytest.mark.django_db
+def test_me_query_budget(tenant_client):
+    queries = count_queries(tenant_client, reverse("me"))
+
+    assert queries <= MeView.query_budgets["get"]
+
+
+@pytest.mark.django_db
+def test_exceeded_budget_is_logged(
+    tenant_client, company, settings, monkeypatch, caplog
+):
+    settings.QUERY_BUDGET_ENFORCE = True
+    monkeypatch.setattr(UserViewSet, "query_budgets", {"list": 0})
+    with caplog.at_level(logging.WARNING, logger="apps.core.mixins"):
+        tenant_client.get(reverse("user-list"))
+
+    assert "UserViewSet.list used 2 queries, budget is 0" in caplog.text
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url_name,viewset,get_object",
+    [
+        ("user-detail", UserViewSet, lambda company, user: user),
+        (
+            "address-detail",
+            AddressViewSet,
+            lambda company, user: company.addresses.get(),
+        ),
+        ("company-detail", CompanyViewSet, lambda company, user: company),
+    ],
+)
+def test_tenant_retrieve_query_budget(
+    tenant_client, tenant_user, company, billing_address, url_name, viewset, get_object
+):
+    url = reverse(url_name, args=[get_object(company, tenant_user).pk])
+
+    assert count_queries(tenant_client, url) <= viewset.query_budgets["retrieve"]
+
+
+@pytest.mark.django_db
+def test_other_tenant_rows_are_not_listed(tenant_client, company, owner):
+    other = Company.objects.create(
+        name="Other",
+        tax_id="0987654321",
+        statistical_number="123456789",
+        national_court_register="0000654321",
+        email="other@company.com",
+        phone="123456789",
+        owner=owner,
+    )
+    create_addresses(other, 3)
+    create_addresses(company, 2)
+    data = tenant_client.get(reverse("address-list")).json()
+
+    assert len(data["results"]) == 2
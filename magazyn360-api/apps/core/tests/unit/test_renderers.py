@@ -0,0 +1,90 @@
+import datetime
+import decimal
+import io
+import uuid
+
+import pytest
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from apps.core.parsers import ORJSONParser
+from apps.core.renderers import MessagePackRenderer, ORJSONRenderer
+
+PAYLOAD = ReturnDict(
+    {
+        "id": uuid.UUID("0b8e1c6e-64a5-4bd5-a0d6-c8a1bf7e2a51"),
+        "created_at": datetime.datetime(
+            2025, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.UTC
+        ),
+        "date": datetime.date(2025, 1, 2),
+        "amount": decimal.Decimal("12.50"),
+        "name": "Zażółć gęślą jaźń\u2028\u2029",
+        "label": gettext_lazy("Owner"),
+        "errors": [ErrorDetail("Invalid.", code="invalid")],
+        "nested": {1: None, "flag": True},
+    },
+    serializer=None,
+)
+
+
+def test_orjson_output_matches_json_renderer():
+    assert ORJSONRenderer().render(PAYLOAD) == JSONRenderer().render(PAYLOAD)
+
+
+def test_orjson_indented_output_matches_json_renderer():
+    media_type = "application/json; indent=4"
+
+    assert ORJSONRenderer().render(PAYLOAD, media_type) == JSONRenderer().render(
+        PAYLOAD, media_type
+    )
+
+
+def test_orjson_falls_back_on_unsupported_values():
+    data = {"big": 2**70}
+
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_msgpack_renders_drf_formatted_values():
+    msgpack = pytest.importorskip("msgpack")
+    data = msgpack.unpackb(MessagePackRenderer().render(PAYLOAD), strict_map_key=False)
+
+    assert data["id"] == "0b8e1c6e-64a5-4bd5-a0d6-c8a1bf7e2a51"
+    assert data["created_at"] == "2025-01-02T03:04:05.678901Z"
+    assert data["label"] == "Owner"
+
+
+def test_orjson_parser_rejects_invalid_json():
+    parser = ORJSONParser()
+
+    assert parser.parse(io.BytesIO(b'{"a": [1, "\xc5\xbc"]}')) == {"a": [1, "ż"]}
+    with pytest.raises(ParseError):
+        parser.parse(io.BytesIO(b'{"a": NaN}'))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "accept,media_type",
+    [
+        ("application/json", "application/json"),
+        ("application/msgpack", "application/msgpack"),
+    ],
+)
+def test_format_is_negotiated_from_accept(
+    api_client, tenant_user, billing_address, accept, media_type
+):
+    if media_type == "application/msgpack":
+        pytest.importorskip("msgpack")
+    api_client.force_authenticate(tenant_user)
+
+    url = reverse("address-detail", args=[billing_address.pk])
+    response = api_client.get(url, HTTP_ACCEPT=accept)
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == media_type
+    if media_type == "application/msgpack":
+        msgpack = pytest.importorskip("msgpack")
+        assert msgpack.unpackb(response.content)["id"] == str(billing_address.pk)
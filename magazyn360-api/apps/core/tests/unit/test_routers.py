@@ -0,0 +1,214 @@
+import io
+import math
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from apps.core.checks import check_replica_pin_cache
+from apps.core.middleware import ReplicaRoutingMiddleware
+from apps.core.models import Company
+from apps.core.routers import (
+    ReplicaRouter,
+    RoutingState,
+    measure_lag,
+    replica_monitor,
+    routing_state,
+)
+
+AUTHORIZATION = {"Authorization": "Bearer token"}
+
+
+@pytest.fixture
+def replica(settings, monkeypatch):
+    settings.REPLICA_DATABASES = ["replica"]
+    settings.REPLICA_MAX_LAG_SECONDS = 5
+    settings.REPLICA_LAG_CHECK_SECONDS = 60
+    replica = SimpleNamespace(lag=0.0, measurements=0)
+
+    def measure(alias):
+        replica.measurements += 1
+        return replica.lag
+
+    monkeypatch.setattr("apps.core.routers.measure_lag", measure)
+    replica_monitor.reset()
+    yield replica
+    replica_monitor.reset()
+    cache.clear()
+
+
+def measure():
+    """Measures the lags, which the first request starts in the background."""
+    replica_monitor.available()
+    replica_monitor.wait()
+
+
+def route(state, write=False):
+    token = routing_state.set(state)
+    try:
+        if write:
+            ReplicaRouter().db_for_write(Company)
+        return ReplicaRouter().db_for_read(Company)
+    finally:
+        routing_state.reset(token)
+
+
+class TestReplicaRouter:
+    def test_reads_outside_requests_are_not_routed(self, replica):
+        assert ReplicaRouter().db_for_read(Company) is None
+
+    def test_safe_requests_read_from_replicas(self, replica):
+        measure()
+
+        assert route(RoutingState(use_replicas=True)) == "replica"
+        assert route(RoutingState()) == "default"
+
+    def test_reads_after_a_write_use_the_primary(self, replica):
+        measure()
+        state = RoutingState(use_replicas=True)
+
+        assert route(state, write=True) == "default"
+        assert state.wrote
+
+    @pytest.mark.parametrize("lag", [5.1, math.inf, None])
+    def test_lagging_replicas_are_out_of_rotation(self, replica, lag):
+        replica.lag = lag
+        measure()
+
+        assert route(RoutingState(use_replicas=True)) == "default"
+
+    def test_lag_is_measured_once_per_interval(self, replica, settings):
+        for _ in range(3):
+            route(RoutingState(use_replicas=True))
+            replica_monitor.wait()
+        assert replica.measurements == 1
+
+        settings.REPLICA_LAG_CHECK_SECONDS = 0
+        replica.lag = 10.0
+        measure()
+        assert route(RoutingState(use_replicas=True)) == "default"
+        replica_monitor.wait()
+        replica.lag = 1.0
+        measure()
+        assert route(RoutingState(use_replicas=True)) == "replica"
+
+    def test_requests_do_not_wait_for_the_measurement(self, replica):
+        # Until the first measurement the lag is unknown.
+        assert route(RoutingState(use_replicas=True)) == "default"
+        replica_monitor.wait()
+
+        assert route(RoutingState(use_replicas=True)) == "replica"
+        assert replica.measurements == 1
+
+    def test_replica_not_answering_within_the_interval_is_out(
+        self, replica, settings, monkeypatch
+    ):
+        settings.REPLICA_LAG_CHECK_SECONDS = 0.05
+        measure()
+        answered = threading.Event()
+        monkeypatch.setattr(
+            "apps.core.routers.measure_lag", lambda alias: answered.wait() and 0.0
+        )
+        time.sleep(0.05)
+
+        # The measurement now started takes longer than the interval.
+        assert route(RoutingState(use_replicas=True)) == "replica"
+        time.sleep(0.06)
+        assert route(RoutingState(use_replicas=True)) == "default"
+
+        answered.set()
+        replica_monitor.wait()
+        assert route(RoutingState(use_replicas=True)) == "replica"
+
+    def test_replicas_are_not_migrated(self, replica):
+        assert not ReplicaRouter().allow_migrate("replica", "core")
+        assert ReplicaRouter().allow_migrate("default", "core")
+
+    @pytest.mark.django_db
+    def test_transactions_stay_on_the_primary(self, replica):
+        measure()
+        # Tests run in a transaction of the primary.
+        assert route(RoutingState(use_replicas=True)) == "default"
+
+
+def run_middleware(method, headers=None, write=False, run=async_to_sync):
+    states = []
+
+    def view(request):
+        states.append(RoutingState(**vars(routing_state.get())))
+        if write:
+            ReplicaRouter().db_for_write(Company)
+        return HttpResponse()
+
+    async def async_view(request):
+        return view(request)
+
+    request = getattr(RequestFactory(), method)("/", headers=headers)
+    if run is None:
+        ReplicaRoutingMiddleware(view)(request)
+    else:
+        run(ReplicaRoutingMiddleware(async_view))(request)
+    assert routing_state.get() is None
+    return states[0]
+
+
+@pytest.mark.parametrize("run", [None, async_to_sync], ids=["sync", "async"])
+class TestReplicaRoutingMiddleware:
+    def test_safe_requests_may_use_replicas(self, replica, run):
+        assert run_middleware("get", AUTHORIZATION, run=run).use_replicas
+        assert not run_middleware("post", AUTHORIZATION, run=run).use_replicas
+
+    def test_writers_are_pinned_to_the_primary(self, replica, run):
+        run_middleware("patch", AUTHORIZATION, write=True, run=run)
+
+        assert not run_middleware("get", AUTHORIZATION, run=run).use_replicas
+        assert run_middleware(
+            "get", {"Authorization": "Bearer x"}, run=run
+        ).use_replicas
+        assert run_middleware("get", run=run).use_replicas
+
+    def test_requests_which_did_not_write_are_not_pinned(self, replica, run):
+        run_middleware("post", AUTHORIZATION, run=run)
+
+        assert run_middleware("get", AUTHORIZATION, run=run).use_replicas
+
+    def test_without_replicas_reads_use_the_primary(self, replica, run, settings):
+        settings.REPLICA_DATABASES = []
+
+        assert not run_middleware("get", AUTHORIZATION, run=run).use_replicas
+
+
+@pytest.mark.django_db
+def test_primary_has_no_lag():
+    assert measure_lag("default") == 0.0
+
+
+@pytest.mark.django_db
+def test_replica_status_command(settings):
+    settings.REPLICA_DATABASES = ["default"]
+    out = io.StringIO()
+
+    call_command("replica_status", stdout=out, no_color=True)
+
+    assert out.getvalue() == "default: 0.0s behind, in rotation\n"
+
+
+def test_replicas_need_a_shared_cache(settings, tmp_path):
+    assert check_replica_pin_cache(None) == []
+
+    settings.REPLICA_DATABASES = ["replica"]
+    assert [warning.id for warning in check_replica_pin_cache(None)] == ["core.W002"]
+
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path),
+        }
+    }
+    assert check_replica_pin_cache(None) == []
@@ -0,0 +1,120 @@
+import logging
+
+import pytest
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.test import RequestFactory
+from django.urls import reverse
+
+from apps.core.admin import CompanyAdmin
+from apps.core.enums import AddressTypes
+from apps.core.models import Address, Company
+from apps.core.search import search_condition
+
+
+@pytest.fixture
+def warehouses(company):
+    return Address.objects.bulk_create(
+        Address(
+            company=company,
+            type=AddressTypes.WAREHOUSE,
+            name=name,
+            street="Test Street",
+            city=city,
+            postal_code="00-000",
+        )
+        for name, city in [
+            ("North", "Warszawa"),
+            ("Warszawa Central", "Warszawa"),
+            ("South", "Krakow"),
+        ]
+    )
+
+
+def names(response):
+    return [item["name"] for item in response.data["results"]]
+
+
+@pytest.mark.django_db
+class TestApiSearch:
+    def test_matches_substrings_case_insensitively(self, tenant_client, warehouses):
+        response = tenant_client.get(reverse("address-list"), {"q": "kraK"})
+
+        assert response.status_code == 200
+        assert names(response) == ["South"]
+
+    def test_tolerates_typos(self, tenant_client, warehouses):
+        response = tenant_client.get(reverse("address-list"), {"q": "Warszwa"})
+
+        assert set(names(response)) == {"North", "Warszawa Central"}
+
+    def test_best_matches_come_first(self, tenant_client, warehouses):
+        response = tenant_client.get(reverse("address-list"), {"q": "Warszawa Cent"})
+
+        assert names(response)[0] == "Warszawa Central"
+
+    def test_ranked_results_are_paginated_by_offset(self, tenant_client, warehouses):
+        response = tenant_client.get(
+            reverse("address-list"), {"q": "Warszawa", "limit": 1}
+        )
+
+        assert response.data["count"] == 2
+        assert "offset=1" in response.data["next"]
+
+    @pytest.mark.parametrize("params", [{"q": "Warszawa"}, {"limit": 1}])
+    def test_ranked_and_offset_pages_keep_their_budget(
+        self, tenant_client, warehouses, settings, caplog, params
+    ):
+        settings.QUERY_BUDGET_ENFORCE = True
+
+        with caplog.at_level(logging.WARNING, logger="apps.core.mixins"):
+            response = tenant_client.get(reverse("address-list"), params)
+
+        assert response.status_code == 200
+        assert "budget" not in caplog.text
+
+    def test_short_terms_are_rejected(self, tenant_client, warehouses):
+        response = tenant_client.get(reverse("address-list"), {"q": "Wa"})
+
+        assert response.status_code == 400
+        assert "q" in response.data
+
+    def test_search_is_tenant_scoped(self, tenant_client, owner, warehouses):
+        Company.objects.create(
+            name="Warszawa Logistics",
+            tax_id="0987654321",
+            statistical_number="123456789",
+            national_court_register="0000654321",
+            email="other@company.com",
+            phone="123456789",
+            owner=owner,
+        )
+
+        response = tenant_client.get(reverse("company-list"), {"q": "Warszawa"})
+
+        assert response.data["results"] == []
+
+
+@pytest.mark.django_db
+def test_search_uses_trigram_indexes(warehouses):
+    queryset = Address.objects.filter(search_condition(["name", "city"], "Warszawa"))
+
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = queryset.explain()
+
+    assert "core_address_name_trgm" in plan
+    assert "core_address_city_trgm" in plan
+
+
+@pytest.mark.django_db
+def test_admin_search_spans_relations_and_typos(company, warehouses):
+    model_admin = CompanyAdmin(Company, site)
+    request = RequestFactory().get("/admin")
+
+    queryset, may_have_duplicates = model_admin.get_search_results(
+        request, Company.objects.all(), "Krakw"
+    )
+
+    assert list(queryset.distinct()) == [company]
+    assert may_have_duplicates
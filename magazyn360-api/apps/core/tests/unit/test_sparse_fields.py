@@ -0,0 +1,79 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+def get_with_sql(client, url, params):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, params)
+    return response, context.captured_queries[-1]["sql"]
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+    def test_fields_trims_output_and_columns(self, tenant_client, billing_address):
+        response, sql = get_with_sql(
+            tenant_client, reverse("address-list"), {"fields": "id,name,type"}
+        )
+
+        assert response.status_code == 200
+        assert response.data["results"] == [
+            {
+                "id": str(billing_address.pk),
+                "type": billing_address.type,
+                "name": billing_address.name,
+            }
+        ]
+        assert '"core_address"."street"' not in sql
+
+    def test_omit_drops_fields(self, tenant_client, billing_address):
+        url = reverse("address-detail", args=[billing_address.pk])
+
+        response = tenant_client.get(url, {"omit": "street,postal_code"})
+
+        assert "street" not in response.data
+        assert "postal_code" not in response.data
+        assert response.data["city"] == billing_address.city
+
+    def test_unknown_fields_are_rejected(self, tenant_client, billing_address):
+        response = tenant_client.get(reverse("address-list"), {"omit": "name,nope"})
+
+        assert response.status_code == 400
+        assert response.data == {"omit": ["Unknown fields: nope."]}
+
+    def test_users_keep_company_name(self, tenant_client, tenant_user, company):
+        response, sql = get_with_sql(
+            tenant_client, reverse("user-list"), {"fields": "id,username,company_name"}
+        )
+
+        assert response.data["results"] == [
+            {
+                "id": str(tenant_user.pk),
+                "username": tenant_user.username,
+                "company_name": company.name,
+            }
+        ]
+        assert '"core_company"."email"' not in sql
+
+    def test_users_without_company_name_skip_join(self, tenant_client, tenant_user):
+        response, sql = get_with_sql(
+            tenant_client, reverse("user-list"), {"fields": "id,username,role"}
+        )
+
+        assert response.data["results"][0]["role"] == tenant_user.role
+        assert "core_company" not in sql
+
+    def test_pagination_works_with_sparse_fields(self, tenant_client, company, owner):
+        tenant_client.force_authenticate(owner)
+        owner.company = company
+        owner.save()
+
+        response = tenant_client.get(
+            reverse("user-list"), {"fields": "id", "page_size": 1}
+        )
+        next_page = tenant_client.get(response.data["next"])
+
+        assert next_page.status_code == 200
+        assert len(next_page.data["results"]) == 1
+        assert next_page.data["results"][0] != response.data["results"][0]
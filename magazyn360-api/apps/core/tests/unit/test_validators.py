@@ -0,0 +1,70 @@
+import io
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+
+from apps.core.validators import KRSValidator, NIPValidator, REGONValidator
+
+VALID = [
+    (NIPValidator(), "1234563218"),
+    (NIPValidator(), "5260250274"),
+    (REGONValidator(), "123456785"),
+    (REGONValidator(), "12345678512347"),
+]
+
+INVALID = [
+    (NIPValidator(), "1234567890"),
+    (NIPValidator(), "1234563219"),
+    (NIPValidator(), "123456321"),
+    (NIPValidator(), "1234563218\n"),
+    (NIPValidator(), "12345632١8"),
+    (REGONValidator(), "123456789"),
+    (REGONValidator(), "12345678512340"),
+    (REGONValidator(), "1234567851"),
+]
+
+
+@pytest.mark.parametrize("validator,value", VALID)
+def test_valid_check_digits_are_accepted(validator, value):
+    validator(value)
+
+
+@pytest.mark.parametrize("validator,value", INVALID)
+def test_invalid_numbers_are_rejected(validator, value):
+    with pytest.raises(ValidationError) as error:
+        validator(value)
+
+    assert error.value.code == validator.code
+
+
+def test_remainder_of_ten():
+    # The last weight of both is 7, 7 * 3 = 21 leaves a remainder of 10.
+    assert NIPValidator().check_digit("000000003") is None
+    assert REGONValidator().check_digit("00000003") == 0
+
+
+def test_batch_matches_single_values():
+    for validator in (NIPValidator(), REGONValidator()):
+        values = [value for v, value in VALID + INVALID if type(v) is type(validator)]
+        expected = []
+        for value in values:
+            try:
+                validator(value)
+            except ValidationError:
+                expected.append(False)
+            else:
+                expected.append(True)
+
+        assert validator.validate_many(values + [None, 1234563218]) == expected + [
+            False,
+            isinstance(validator, NIPValidator),
+        ]
+
+
+def test_krs_has_no_checksum():
+    KRSValidator()("0000000001")
+
+
+def test_benchmark_validators_command():
+    call_command("benchmark_validators", count=100, stdout=io.StringIO())
@@ -1,6 +1,12 @@
+from operator import mul
+
+from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
 from django.utils.translation import gettext_lazy as _
 
+# Maps ASCII digits to their values, see ChecksumValidator.check_digit.
+DIGIT_VALUES = bytes.maketrans(b"0123456789", bytes(range(10)))
+
 
 class PolishPhoneNumberValidator(RegexValidator):
     regex = r"^\+?48?\d{9}$"
@@ -8,19 +14,67 @@ class PolishPhoneNumberValidator(RegexValidator):
     code = "invalid_phone_number"
 
 
-class NIPValidator(RegexValidator):
-    regex = r"^\d{10}$"
-    message = _("Enter a valid NIP number (10 digits)")
+class ChecksumValidator(RegexValidator):
+    """Regex validator also verifying the weighted modulo 11 check digit.
+
+    Attributes:
+        weights: Weights of the leading digits, by length of the number
+        remainder_ten: Check digit of a remainder of 10, None if such numbers
+            are never issued
+    """
+
+    weights = {}
+    remainder_ten = None
+
+    def __call__(self, value):
+        super().__call__(value)
+        if not self.has_valid_checksum(str(value)):
+            raise ValidationError(self.message, code=self.code, params={"value": value})
+
+    def check_digit(self, digits):
+        """Returns the check digit completing ``digits``, or None if there is none."""
+        weights = self.weights[len(digits) + 1]
+        values = digits.encode().translate(DIGIT_VALUES)
+        remainder = sum(map(mul, values, weights)) % 11
+        return self.remainder_ten if remainder == 10 else remainder
+
+    def has_valid_checksum(self, value):
+        """Returns whether the last digit of ``value`` is its check digit."""
+        return self.check_digit(value[:-1]) == ord(value[-1]) - 48
+
+    def validate_many(self, values):
+        """Returns whether each of ``values`` is valid, in order.
+
+        Validates a whole column at once without raising, for imports.
+        """
+        match = self.regex.search
+        check_digit = self.check_digit
+        return [
+            match(value) is not None and check_digit(value[:-1]) == ord(value[-1]) - 48
+            for value in map(str, values)
+        ]
+
+
+class NIPValidator(ChecksumValidator):
+    regex = r"^[0-9]{10}\Z"
+    message = _("Enter a valid NIP number (10 digits with a valid check digit)")
     code = "invalid_nip"
+    weights = {10: (6, 5, 7, 2, 3, 4, 5, 6, 7)}
 
 
-class REGONValidator(RegexValidator):
-    regex = r"^\d{9}(\d{5})?$"
-    message = _("Enter a valid REGON number (9 or 14 digits)")
+class REGONValidator(ChecksumValidator):
+    regex = r"^[0-9]{9}([0-9]{5})?\Z"
+    message = _("Enter a valid REGON number (9 or 14 digits with a valid check digit)")
     code = "invalid_regon"
+    weights = {
+        9: (8, 9, 2, 3, 4, 5, 6, 7),
+        14: (2, 4, 8, 5, 0, 9, 7, 3, 6, 1, 2, 4, 8),
+    }
+    remainder_ten = 0
 
 
 class KRSValidator(RegexValidator):
+    # KRS numbers are sequential and carry no check digit.
     regex = r"^\d{10}$"
     message = _("Enter a valid KRS number (10 digits)")
     code = "invalid_krs"
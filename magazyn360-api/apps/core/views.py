@@ -1,73 +1,149 @@
 from rest_framework.generics import RetrieveAPIView
-from rest_framework.permissions import DjangoModelPermissions, IsAuthenticated
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.viewsets import ModelViewSet
 
+from apps.core.mixins import (
+    AsyncReadMixin,
+    BulkWriteMixin,
+    CompiledReadMixin,
+    ConditionalGetMixin,
+    QueryBudgetMixin,
+    SparseFieldsetMixin,
+    StreamingExportMixin,
+)
 from apps.core.models import Address, Company, CustomUser
-from apps.core.permissions import IsInUserCompany
+from apps.core.permissions import IsInUserCompany, RoleModelPermissions
+from apps.core.search import TrigramSearchFilter
 from apps.core.serializers import (
     AddressSerializer,
     CompanySerializer,
     UserCreateUpdateSerializer,
     UserListSerializer,
 )
+from apps.core.tenancy import TenantScopedMixin, get_company_id
 
 
-class MeView(RetrieveAPIView):
+class MeView(
+    AsyncReadMixin,
+    QueryBudgetMixin,
+    ConditionalGetMixin,
+    CompiledReadMixin,
+    RetrieveAPIView,
+):
     serializer_class = UserListSerializer
     permission_classes = [IsAuthenticated]
+    query_budgets = {"get": 2}
+    conditional_related = ("company",)
 
-    def get_object(self):
-        return self.request.user
+    async def aget(self, request, *args, **kwargs):
+        return await self.aretrieve(request, *args, **kwargs)
 
+    def get_retrieve_queryset(self):
+        return CustomUser.objects.filter(pk=self.request.user.pk)
 
-class CompanyViewSet(ModelViewSet):
+    def get_object(self):
+        return CustomUser.objects.select_related("company").get(pk=self.request.user.pk)
+
+
+class CompanyViewSet(
+    AsyncReadMixin,
+    TenantScopedMixin,
+    QueryBudgetMixin,
+    ConditionalGetMixin,
+    CompiledReadMixin,
+    SparseFieldsetMixin,
+    StreamingExportMixin,
+    BulkWriteMixin,
+    ModelViewSet,
+):
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
-    permission_classes = [IsAuthenticated, DjangoModelPermissions, IsInUserCompany]
-
-    def get_queryset(self):
-        user = self.request.user
-        if user.is_superuser:
-            return Company.objects.all()
-        if user.company:
-            return Company.objects.filter(id=user.company_id)
-        return Company.objects.none()
+    permission_classes = [IsAuthenticated, RoleModelPermissions, IsInUserCompany]
+    query_budgets = {"list": 2, "offset_list": 3, "retrieve": 2, "bulk": 3}
+    tenant_field = "id"
+    filter_backends = [TrigramSearchFilter]
+    search_fields = ("name", "tax_id", "email")
+    export_fields = {
+        "id": "id",
+        "name": "name",
+        "tax_id": "tax_id",
+        "statistical_number": "statistical_number",
+        "national_court_register": "national_court_register",
+        "email": "email",
+        "phone": "phone",
+        "website": "website",
+        "owner": "owner_id",
+    }
 
     def perform_create(self, serializer):
-        serializer.save(owner=self.request.user)
-
-
-class AddressViewSet(ModelViewSet):
+        serializer.save(owner_id=self.request.user.pk)
+
+
+class AddressViewSet(
+    AsyncReadMixin,
+    TenantScopedMixin,
+    QueryBudgetMixin,
+    ConditionalGetMixin,
+    CompiledReadMixin,
+    SparseFieldsetMixin,
+    StreamingExportMixin,
+    BulkWriteMixin,
+    ModelViewSet,
+):
     queryset = Address.objects.all()
     serializer_class = AddressSerializer
-    permission_classes = [IsAuthenticated, DjangoModelPermissions, IsInUserCompany]
-
-    def get_queryset(self):
-        user = self.request.user
-        if user.is_superuser:
-            return Address.objects.all()
-        if user.company:
-            return Address.objects.filter(company=user.company)
-        return Address.objects.none()
+    permission_classes = [IsAuthenticated, RoleModelPermissions, IsInUserCompany]
+    query_budgets = {"list": 2, "offset_list": 3, "retrieve": 2, "bulk": 3}
+    filter_backends = [TrigramSearchFilter]
+    search_fields = ("name", "street", "city", "postal_code")
+    export_fields = {
+        "id": "id",
+        "type": "type",
+        "company": "company_id",
+        "name": "name",
+        "street": "street",
+        "city": "city",
+        "postal_code": "postal_code",
+        "country": "country",
+    }
 
     def perform_create(self, serializer):
-        serializer.save(company=self.request.user.company)
-
-
-class UserViewSet(ModelViewSet):
-    queryset = CustomUser.objects.all()
-    permission_classes = [IsAuthenticated, DjangoModelPermissions, IsInUserCompany]
-
-    def get_queryset(self):
-        user = self.request.user
-        if user.is_superuser:
-            return CustomUser.objects.all()
-        return CustomUser.objects.filter(company=user.company)
+        serializer.save(company_id=get_company_id(self.request))
+
+
+class UserViewSet(
+    AsyncReadMixin,
+    TenantScopedMixin,
+    QueryBudgetMixin,
+    ConditionalGetMixin,
+    CompiledReadMixin,
+    SparseFieldsetMixin,
+    StreamingExportMixin,
+    ModelViewSet,
+):
+    queryset = CustomUser.objects.select_related("company")
+    permission_classes = [IsAuthenticated, RoleModelPermissions, IsInUserCompany]
+    query_budgets = {"list": 2, "offset_list": 3, "retrieve": 2}
+    conditional_related = ("company",)
+    filter_backends = [TrigramSearchFilter]
+    search_fields = ("username", "email", "first_name", "last_name", "position")
+    sparse_columns = {"company_name": ("company", "company__name")}
+    export_fields = {
+        "id": "id",
+        "username": "username",
+        "email": "email",
+        "first_name": "first_name",
+        "last_name": "last_name",
+        "role": "role",
+        "company_name": "company__name",
+        "position": "position",
+        "department": "department",
+    }
 
     def get_serializer_class(self):
-        if self.action in ["list", "retrieve"]:
+        if self.action in ["list", "retrieve", "export"]:
             return UserListSerializer
         return UserCreateUpdateSerializer
 
     def perform_create(self, serializer):
-        serializer.save(company=self.request.user.company)
+        serializer.save(company_id=get_company_id(self.request))
@@ -0,0 +1,73 @@
+"""Loading done once in the Gunicorn master, before the workers are forked."""
+
+import logging
+
+from django.db import DatabaseError
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from apps.core.db import close_pools
+from apps.core.groups import role_group_ids
+from apps.core.mixins import CompiledReadMixin
+from apps.core.permission_matrix import permission_matrix
+from apps.core.serializers import CompiledReader
+
+logger = logging.getLogger(__name__)
+
+
+def iter_views(patterns=None):
+    """Yields ``(view_class, actions)`` of the DRF views in the URLconf."""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_views(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            view_class = getattr(pattern.callback, "cls", None)
+            if view_class is not None:
+                yield view_class, getattr(pattern.callback, "actions", None) or {}
+
+
+def warm_serializers():
+    """Builds the serializers of every view action and their compiled readers.
+
+    Returns the number of compiled readers.
+    """
+    readers = set()
+    seen = set()
+    for view_class, actions in iter_views():
+        for action in set(actions.values()) or {None}:
+            if (view_class, action) in seen:
+                continue
+            seen.add((view_class, action))
+            view = view_class(action=action, request=None, format_kwarg=None)
+            try:
+                serializer_class = view.get_serializer_class()
+            except (AssertionError, AttributeError):
+                continue
+            serializer_class().get_fields()
+            if issubclass(view_class, CompiledReadMixin) and action in (
+                "list",
+                "retrieve",
+                None,
+            ):
+                readers.add(CompiledReader.for_serializer(serializer_class))
+    return len(readers)
+
+
+def warm_up():
+    """Populates the URL resolver, serializers and permission data.
+
+    Forked workers inherit them instead of loading them on their first
+    requests. Database connections and pools opened meanwhile are closed, so
+    no worker shares the master's.
+    """
+    get_resolver()._populate()
+    readers = warm_serializers()
+    permission_matrix.get()
+    try:
+        role_group_ids.get()
+    except DatabaseError:
+        logger.warning("Role groups not loaded, workers will load them.")
+    finally:
+        close_pools()
+    logger.info("Warmed up %d compiled readers.", readers)
@@ -0,0 +1,30 @@
+#!/bin/bash
+
+# Compares the concurrent read throughput of the WSGI deployment (threaded
+# workers) with the ASGI one (Uvicorn workers serving the async reads).
+# Both run the serving profile of magazyn360/gunicorn_config.py against the
+# database configured in .env, with the same number of workers. Usage: bin/benchmark_load.sh USERNAME [benchmark_load options]
+
+set -e
+
+DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" >/dev/null 2>&1 && pwd )"
+cd "$DIR/.."
+
+USERNAME=${1:?Usage: $0 USERNAME [benchmark_load options]}
+shift
+WORKERS=${WORKERS:-2}
+WSGI_PORT=${WSGI_PORT:-8001}
+ASGI_PORT=${ASGI_PORT:-8002}
+
+export GUNICORN_WORKERS=$WORKERS
+ASYNC_READS=False GUNICORN_BIND="127.0.0.1:$WSGI_PORT" \
+    gunicorn --config python:magazyn360.gunicorn_config --log-level warning &
+WSGI_PID=$!
+ASYNC_READS=True GUNICORN_BIND="127.0.0.1:$ASGI_PORT" \
+    gunicorn --config python:magazyn360.gunicorn_config --log-level warning &
+ASGI_PID=$!
+trap 'kill $WSGI_PID $ASGI_PID 2>/dev/null' EXIT
+
+sleep "${STARTUP_SECONDS:-3}"
+python manage.py benchmark_load "http://127.0.0.1:$WSGI_PORT" \
+    "http://127.0.0.1:$ASGI_PORT" --username "$USERNAME" "$@"
@@ -2,14 +2,22 @@
 
 set -e
 
+# Gunicorn logs the startup time breakdown from here on, see when_ready in
+# magazyn360/gunicorn_config.py.
+export STARTUP_STARTED_AT=$(date +%s.%N)
+
 source /var/www/magazyn360/app/magazyn360_env/bin/activate
 cd /var/www/magazyn360/app/magazyn360-api/
 
-echo "> Running migrations..."
-python manage.py migrate
+# Static files and the API schema are built into the image, see the
+# Dockerfile. Migrations are only applied when some are unapplied.
+echo "> Checking migrations..."
+python manage.py migrate_if_needed
 
-echo "> Collecting static files..."
-python manage.py collectstatic --noinput
+# Workers write their request metrics to files in this directory, which
+# /metrics sums up, see apps/core/metrics.py.
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/magazyn360-metrics}
 
+# Workers are sized from the container, see magazyn360/gunicorn_config.py.
 echo "> Starting Gunicorn..."
-exec gunicorn magazyn360.wsgi:application --bind 0.0.0.0:8000
+exec gunicorn --config python:magazyn360.gunicorn_config
@@ -0,0 +1,28 @@
+#!/bin/bash
+
+# Starts a streaming replica of the local Postgres configured in .env, for
+# trying out the read replica routing (apps/core/routers.py) locally. The
+# primary must accept replication connections (see pg_hba.conf), which a
+# default local installation does. Then set in .env:
+#   POSTGRES_REPLICA_HOST=localhost
+#   POSTGRES_REPLICA_PORT=5433
+# and check the replica with: python manage.py replica_status
+# Pause the replay to see it go out of rotation once it lags:
+#   psql -p 5433 -c "SELECT pg_wal_replay_pause()"
+# Usage: bin/start_local_replica.sh DATA_DIR [PORT]
+
+set -e
+
+DATA_DIR=${1:?Usage: $0 DATA_DIR [PORT]}
+PORT=${2:-5433}
+
+if [[ ! -d "$DATA_DIR" ]]; then
+    echo "> Copying the primary into $DATA_DIR..."
+    pg_basebackup --pgdata "$DATA_DIR" --write-recovery-conf --checkpoint fast \
+        --host "${POSTGRES_HOST:-localhost}" --port "${POSTGRES_PORT:-5432}" \
+        --username "${POSTGRES_USER:-postgres}"
+fi
+
+echo "> Starting the replica on port $PORT..."
+pg_ctl --pgdata "$DATA_DIR" --log "$DATA_DIR/replica.log" \
+    --options "-p $PORT -c hot_standby_feedback=on" start
@@ -0,0 +1,231 @@
+"""
+Gunicorn serving profile of magazyn360, see bin/magazyn360_start_gunicorn.sh.
+
+Workers and threads are sized from the CPUs and the memory limit of the
+container (its cgroup), unless set through the GUNICORN_* variables. The
+application is preloaded and warmed up in the master, then forked, and the
+workers are recycled after a jittered number of requests. Print the profile
+chosen for the current container with ``python -m magazyn360.gunicorn_config``.
+"""
+
+import json
+import math
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import environ
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+# cgroup v1 reports an unlimited memory as a page-aligned maximal value.
+UNLIMITED_MEMORY = 1 << 60
+
+MiB = 1024 * 1024
+
+env = environ.Env()
+environ.Env.read_env(Path(__file__).resolve().parent.parent / ".env")
+
+
+def read_cgroup(root, *names):
+    """Returns the stripped content of the first existing ``names`` file."""
+    for name in names:
+        try:
+            return (root / name).read_text().strip()
+        except OSError:
+            continue
+    return None
+
+
+def available_cpus(root=CGROUP_ROOT):
+    """Returns the CPUs the process may use, the cgroup quota rounded up."""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+
+    quota, period = None, None
+    if (cpu_max := read_cgroup(root, "cpu.max")) is not None:
+        quota, period = cpu_max.split()
+    elif (cfs_quota := read_cgroup(root, "cpu/cpu.cfs_quota_us")) is not None:
+        quota, period = cfs_quota, read_cgroup(root, "cpu/cpu.cfs_period_us")
+    if quota not in (None, "max", "-1") and period:
+        cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    return max(cpus, 1)
+
+
+def memory_limit(root=CGROUP_ROOT):
+    """Returns the cgroup memory limit in bytes, or None if unlimited."""
+    limit = read_cgroup(root, "memory.max", "memory/memory.limit_in_bytes")
+    if limit is None or limit == "max" or int(limit) >= UNLIMITED_MEMORY:
+        return None
+    return int(limit)
+
+
+@dataclass(frozen=True)
+class ServingProfile:
+    """Workers serving the application in one container.
+
+    Attributes:
+        cpus: CPUs available to the container
+        memory_limit: Memory limit of the container in bytes, None if unlimited
+        async_reads: Whether the ASGI application is served, see ASYNC_READS
+        worker_class: Gunicorn worker class
+        workers: Number of worker processes
+        threads: Request threads of each worker
+        worker_concurrency: Requests each worker serves at once, each holding
+            a connection of its database pool while it runs queries
+    """
+
+    cpus: int
+    memory_limit: int | None
+    async_reads: bool
+    worker_class: str
+    workers: int
+    threads: int
+    worker_concurrency: int
+
+    @property
+    def concurrency(self):
+        """Requests served at once by all workers."""
+        return self.workers * self.worker_concurrency
+
+    @property
+    def wsgi_app(self):
+        if self.async_reads:
+            return "magazyn360.asgi:application"
+        return "magazyn360.wsgi:application"
+
+    def describe(self):
+        return json.dumps({**asdict(self), "concurrency": self.concurrency})
+
+
+def get_profile(root=CGROUP_ROOT):
+    """Returns the serving profile of the container.
+
+    Sync workers get ``2 * cpus + 1`` processes of GUNICORN_THREADS threads,
+    their database waits overlapping. Uvicorn workers run one event loop per
+    CPU. Their ``limit_concurrency`` caps them at GUNICORN_ASYNC_CONCURRENCY
+    requests at once, answering 503 beyond it (see magazyn360/workers.py).
+    Processes are capped so that GUNICORN_WORKER_MEMORY_MB each, plus one for
+    the master, fit the memory limit.
+    """
+    cpus = available_cpus(root)
+    limit = memory_limit(root)
+    async_reads = env.bool("ASYNC_READS", default=False)
+
+    if async_reads:
+        worker_class = "magazyn360.workers.ConcurrencyLimitedUvicornWorker"
+        workers, threads = cpus, 1
+        # Each request runs its queries in its own thread and connection.
+        worker_concurrency = env.int("GUNICORN_ASYNC_CONCURRENCY", default=16)
+    else:
+        workers = 2 * cpus + 1
+        threads = env.int("GUNICORN_THREADS", default=4)
+        worker_class = "gthread" if threads > 1 else "sync"
+        worker_concurrency = threads
+
+    if limit is not None:
+        worker_memory = env.int("GUNICORN_WORKER_MEMORY_MB", default=128) * MiB
+        workers = min(workers, limit // worker_memory - 1)
+
+    workers = max(env.int("GUNICORN_WORKERS", default=workers), 1)
+    return ServingProfile(
+        cpus, limit, async_reads, worker_class, workers, threads, worker_concurrency
+    )
+
+
+profile = get_profile()
+
+# Sizes the database pool of each worker (DB_POOL_MAX_SIZE in settings), the
+# settings being loaded after this file.
+os.environ["GUNICORN_WORKER_CONCURRENCY"] = str(profile.worker_concurrency)
+
+bind = env.str("GUNICORN_BIND", default="0.0.0.0:8000")
+wsgi_app = profile.wsgi_app
+worker_class = profile.worker_class
+workers = profile.workers
+threads = profile.threads
+preload_app = True
+
+# Recycled workers return the memory they grew, the jitter keeps them from
+# restarting at once.
+max_requests = env.int("GUNICORN_MAX_REQUESTS", default=1000)
+max_requests_jitter = env.int(
+    "GUNICORN_MAX_REQUESTS_JITTER", default=max_requests // 10
+)
+
+timeout = env.int("GUNICORN_TIMEOUT", default=30)
+graceful_timeout = env.int("GUNICORN_GRACEFUL_TIMEOUT", default=30)
+keepalive = env.int("GUNICORN_KEEPALIVE", default=5)
+
+
+# Startup phases are timed from here, the application is preloaded next.
+config_loaded_at = time.time()
+
+
+def startup_phases(loaded_at, ready_at, started_at=None):
+    """Returns the seconds each startup phase took.
+
+    Args:
+        loaded_at: Time the application was loaded at
+        ready_at: Time it was warmed up at
+        started_at: Time the container started at, if known
+    """
+    phases = {}
+    if started_at is not None:
+        phases["before gunicorn"] = config_loaded_at - started_at
+    phases["application load"] = loaded_at - config_loaded_at
+    phases["warm-up"] = ready_at - loaded_at
+    phases["total"] = ready_at - (
+        config_loaded_at if started_at is None else started_at
+    )
+    return phases
+
+
+def on_starting(server):
+    """Empties the metrics directory of the workers (PROMETHEUS_MULTIPROC_DIR,
+    see apps/core/metrics.py) from a previous run."""
+    metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        Path(metrics_dir).mkdir(parents=True, exist_ok=True)
+        for path in Path(metrics_dir).glob("*.db"):
+            path.unlink()
+
+
+def child_exit(server, worker):
+    """Archives the metrics files of exited workers, which recycled workers
+    would otherwise leave behind in the metrics directory."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from apps.core.metrics import archive_worker_metrics
+
+        archive_worker_metrics(worker.pid)
+
+
+def when_ready(server):
+    """Warms up the preloaded application before the workers are forked, then
+    logs how long the startup took."""
+    from apps.core.warmup import warm_up
+
+    loaded_at = time.time()
+    warm_up()
+    phases = startup_phases(
+        loaded_at, time.time(), env.float("STARTUP_STARTED_AT", default=None)
+    )
+    server.log.info("Serving profile: %s", profile.describe())
+    server.log.info(
+        "Startup: %s",
+        ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in phases.items()),
+    )
+
+
+def worker_exit(server, worker):
+    """Logs the database pool statistics of recycled and stopped workers."""
+    from apps.core.db import pool_stats
+
+    server.log.info("Worker %s database pools: %s", worker.pid, pool_stats())
+
+
+if __name__ == "__main__":
+    print(profile.describe())
@@ -2,6 +2,7 @@
 Django settings for magazyn360 project.
 """
 
+import importlib.util
 import os
 from datetime import timedelta
 from pathlib import Path
@@ -35,6 +36,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 ]
 
 
@@ -44,7 +46,9 @@ INSTALLED_APPS += [
 ]
 
 MIDDLEWARE = [
+    "apps.core.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "apps.core.middleware.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -75,6 +79,14 @@ WSGI_APPLICATION = "magazyn360.wsgi.application"
 
 
 # Database
+# Each worker process keeps a pool of at most DB_POOL_MAX_SIZE connections,
+# checked before being handed out. The maximum defaults to the requests a
+# worker serves at once, exported by magazyn360/gunicorn_config.py: its
+# threads, or GUNICORN_ASYNC_CONCURRENCY with ASYNC_READS. Without a pool,
+# connections are reused for CONN_MAX_AGE seconds and checked before their
+# reuse. Pool statistics: apps.core.db.
+
+DB_POOL = env.bool("DB_POOL", default=True)
 
 DATABASES = {
     "default": {
@@ -84,7 +96,66 @@ DATABASES = {
         "PASSWORD": env("POSTGRES_PASSWORD", default="password"),
         "HOST": env("POSTGRES_HOST", default="localhost"),
         "PORT": env("POSTGRES_PORT", default="5432"),
+        "CONN_MAX_AGE": 0 if DB_POOL else env.int("CONN_MAX_AGE", default=60),
+        "CONN_HEALTH_CHECKS": True,
+    }
+}
+
+if DB_POOL:
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": env.int("DB_POOL_MIN_SIZE", default=1),
+            "max_size": env.int(
+                "DB_POOL_MAX_SIZE",
+                default=env.int("GUNICORN_WORKER_CONCURRENCY", default=4),
+            ),
+            "timeout": env.float("DB_POOL_TIMEOUT", default=10.0),
+            "max_idle": env.float("DB_POOL_MAX_IDLE", default=300.0),
+        }
     }
+
+# Read replica, see apps.core.routers. Safe requests read from replicas
+# lagging at most REPLICA_MAX_LAG_SECONDS behind the primary, measured every
+# REPLICA_LAG_CHECK_SECONDS in the background. Clients which wrote read from
+# the primary for READ_YOUR_WRITES_SECONDS, pinned through the default cache,
+# which must be shared by the workers (check core.W002).
+
+REPLICA_DATABASES = []
+if env("POSTGRES_REPLICA_HOST", default=""):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": env("POSTGRES_REPLICA_HOST"),
+        "PORT": env("POSTGRES_REPLICA_PORT", default=DATABASES["default"]["PORT"]),
+        "OPTIONS": {
+            **DATABASES["default"].get("OPTIONS", {}),
+            # An unreachable replica is out of rotation after this many seconds.
+            "connect_timeout": env.int("REPLICA_CONNECT_TIMEOUT", default=2),
+        },
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append("replica")
+
+DATABASE_ROUTERS = ["apps.core.routers.ReplicaRouter"]
+REPLICA_MAX_LAG_SECONDS = env.float("REPLICA_MAX_LAG_SECONDS", default=5.0)
+REPLICA_LAG_CHECK_SECONDS = env.float("REPLICA_LAG_CHECK_SECONDS", default=5.0)
+READ_YOUR_WRITES_SECONDS = env.int("READ_YOUR_WRITES_SECONDS", default=10)
+
+
+# Cache
+# Shared across workers when pointed at e.g. redis://, versioned in-process
+# caches (role groups) are invalidated through it and clients which wrote
+# are pinned to the primary database through it.
+
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+    # Per-process cache of JWT auth stamps, see apps.core.authentication. Other
+    # workers accept the tokens of a changed user for up to TIMEOUT seconds.
+    "auth": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "auth-stamps",
+        "TIMEOUT": env.int("JWT_STAMP_CACHE_SECONDS", default=60),
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
 }
 
 
@@ -115,13 +186,43 @@ INSTALLED_APPS += [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        (
+            "apps.core.authentication.ClaimsJWTAuthentication"
+            if env.bool("JWT_CLAIMS_AUTHENTICATION", default=True)
+            else "rest_framework_simplejwt.authentication.JWTAuthentication"
+        ),
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "apps.core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+        *(
+            ["apps.core.renderers.MessagePackRenderer"]
+            if importlib.util.find_spec("msgpack")
+            else []
+        ),
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "apps.core.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    "DEFAULT_PAGINATION_CLASS": "apps.core.pagination.KeysetPagination",
+    "PAGE_SIZE": env.int("API_PAGE_SIZE", default=50),
 }
 
+# Log API actions issuing more SQL queries than their declared budget
+QUERY_BUDGET_ENFORCE = env.bool("QUERY_BUDGET_ENFORCE", default=DEBUG)
+
+# Serve the list and retrieve actions with async views, for ASGI deployments.
+# Uvicorn workers serve GUNICORN_ASYNC_CONCURRENCY requests at once, enforced
+# by their limit_concurrency (see magazyn360/workers.py), each with its own
+# database connection, so the pool of each worker grows to that size (see
+# DATABASES above).
+ASYNC_READS = env.bool("ASYNC_READS", default=False)
+
 # JWT Settings
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(
@@ -133,7 +234,10 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": env.bool("JWT_ROTATE_REFRESH_TOKENS", default=True),
     "BLACKLIST_AFTER_ROTATION": env.bool("JWT_BLACKLIST_AFTER_ROTATION", default=True),
     "AUTH_HEADER_TYPES": ("Bearer",),
+    "TOKEN_OBTAIN_SERIALIZER": "apps.core.authentication.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "apps.core.authentication.ClaimsTokenRefreshSerializer",
 }
+JWT_STAMP_CACHE = "auth"
 
 # Swagger and API documentation
 INSTALLED_APPS += [
@@ -150,7 +254,33 @@ SWAGGER_SETTINGS = {
         }
     },
     "USE_SESSION_AUTH": False,
+    "SPEC_URL": "schema-json",
+}
+REDOC_SETTINGS = {
+    "SPEC_URL": "schema-json",
 }
+# The schema is generated per code version (see apps.core.docs): the image
+# build passes BUILD_VERSION and writes the schema to OPENAPI_SCHEMA_DIR.
+BUILD_VERSION = env("BUILD_VERSION", default="")
+OPENAPI_SCHEMA_DIR = os.path.join(BASE_DIR, "openapi")
+
+# Monitoring
+# Request metrics of every worker are served at /metrics in the Prometheus
+# format, to scrapers sending "Authorization: Bearer <METRICS_TOKEN>". Without
+# a token they are only served in DEBUG.
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+
+# Errors (and a sample of the transactions) are reported to Sentry if set.
+SENTRY_DSN = env("SENTRY_DSN", default="")
+if SENTRY_DSN:
+    import sentry_sdk
+
+    sentry_sdk.init(
+        dsn=SENTRY_DSN,
+        environment=env("SENTRY_ENVIRONMENT", default="production"),
+        release=BUILD_VERSION or None,
+        traces_sample_rate=env.float("SENTRY_TRACES_SAMPLE_RATE", default=0.0),
+    )
 
 # Internationalization
 
@@ -168,6 +298,23 @@ USE_TZ = True
 STATIC_URL = "static/"
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 
+# The image collects the static files at build time, with STATIC_MANIFEST
+# their names carry a content hash and WhiteNoise serves them compressed and
+# cached forever. The manifest must exist then, so it is off by default.
+STATIC_MANIFEST = env.bool("STATIC_MANIFEST", default=False)
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": (
+            "whitenoise.storage.CompressedManifestStaticFilesStorage"
+            if STATIC_MANIFEST
+            else "django.contrib.staticfiles.storage.StaticFilesStorage"
+        ),
+    },
+}
+
 # Default primary key field type
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -1,34 +1,18 @@
 from django.contrib import admin
 from django.urls import include, path
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Magazyn360 API",
-        default_version="v1",
-        description="Dokumentacja API Magazyn360",
-    ),
-    public=True,
-    permission_classes=[permissions.AllowAny],
-)
-
+from apps.core.docs import docs_view, schema_view
+from apps.core.metrics import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("api/core/", include("apps.core.api_urls")),
-    path(
-        "swagger/",
-        schema_view.with_ui("swagger", cache_timeout=0),
-        name="schema-swagger-ui",
-    ),
-    path(
-        "redoc/",
-        schema_view.with_ui("redoc", cache_timeout=0),
-        name="schema-redoc",
-    ),
+    path("swagger/", docs_view, {"ui": "swagger"}, name="schema-swagger-ui"),
+    path("redoc/", docs_view, {"ui": "redoc"}, name="schema-redoc"),
+    path("swagger.json", schema_view, {"format": "json"}, name="schema-json"),
+    path("swagger.yaml", schema_view, {"format": "yaml"}, name="schema-yaml"),
+    path("metrics", metrics_view, name="metrics"),
 ]
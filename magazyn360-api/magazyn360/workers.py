@@ -0,0 +1,25 @@
+"""Gunicorn worker classes, see magazyn360/gunicorn_config.py."""
+
+import environ
+from uvicorn_worker import UvicornWorker
+
+env = environ.Env()
+
+
+class ConcurrencyLimitedUvicornWorker(UvicornWorker):
+    """Uvicorn worker serving at most GUNICORN_WORKER_CONCURRENCY requests.
+
+    Each request runs its queries in a thread of its own, holding a connection
+    of the worker's database pool, which is sized to the same number (see
+    DB_POOL_MAX_SIZE in settings). Uvicorn answers ``503 Service Unavailable``
+    beyond the limit instead of letting requests wait DB_POOL_TIMEOUT for a
+    connection. Open keep-alive connections count towards it too.
+    """
+
+    def __init__(self, *args, **kwargs):
+        # The limit is exported by gunicorn_config.py, read once per worker.
+        self.CONFIG_KWARGS = {
+            **self.CONFIG_KWARGS,
+            "limit_concurrency": env.int("GUNICORN_WORKER_CONCURRENCY", default=16),
+        }
+        super().__init__(*args, **kwargs)